@@ -1,7 +1,20 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routes import users, clients, reservations, tables, menu, orders, payments, inventory, auth
+from .database import engine, replica_engine, recent_writers, AsyncSessionLocal
+from .services.partitioning import ensure_partitions
+from .services.kitchen_queue import load_kitchen_queue, run_reconciliation
+from .services.availability import load_availability, run_availability_refresh
+from .services.menu_search import load_menu_search
+from .services.menu_snapshot import menu_snapshot
+from .utils.pagination import NEXT_CURSOR_HEADER
+from .utils.db_stats import SQL_DEBUG_HEADERS, instrument_engine, start_request_stats, finish_request_stats
+
+from .routes import users, clients, reservations, tables, menu, orders, payments, inventory, auth, internal
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Restaurant Management API",
@@ -16,8 +29,92 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers only let scripts read listed headers; list endpoints page through this one
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Per-request SQL instrumentation
+instrument_engine(engine)
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+
+@app.middleware("http")
+async def instrument_db_usage(request: Request, call_next):
+    stats = start_request_stats()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    route_path = f"{request.method} {route.path if route else '<unmatched>'}"
+    finish_request_stats(route_path, stats)
+    if SQL_DEBUG_HEADERS:
+        response.headers.update(stats.headers())
+    logger.debug(
+        "%s: %d round trips (%d statements, %d commits, %d rollbacks, %.2f ms in DB)",
+        route_path, stats.round_trips, stats.statements,
+        stats.commits, stats.rollbacks, stats.db_time * 1000
+    )
+    return response
+
+# Pin callers to the primary database for a short window after they write
+@app.middleware("http")
+async def track_primary_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        recent_writers.mark(request)
+    return response
+
+# Keep the next months' order/payment partitions ready (no-op outside Postgres)
+@app.on_event("startup")
+async def prepare_partitions():
+    try:
+        async with engine.begin() as conn:
+            await ensure_partitions(conn)
+    except Exception:
+        logger.exception("Could not create upcoming partitions")
+
+# Kitchen queue: loaded once, then kept current by order writes and periodic reconciliation
+@app.on_event("startup")
+async def start_kitchen_queue():
+    try:
+        async with AsyncSessionLocal() as db:
+            await load_kitchen_queue(db)
+    except Exception:
+        # get_kitchen_orders falls back to querying until the queue is loaded
+        logger.exception("Could not load the kitchen queue")
+    app.state.kitchen_reconciler = asyncio.create_task(run_reconciliation(AsyncSessionLocal))
+
+# Build the menu snapshot and search index before the first guest scan
+@app.on_event("startup")
+async def warm_menu_snapshot():
+    try:
+        await menu_snapshot.current()
+    except Exception:
+        # Retried by the first GET /menu/
+        logger.exception("Could not build the menu snapshot")
+    try:
+        async with AsyncSessionLocal() as db:
+            await load_menu_search(db)
+    except Exception:
+        # Loaded by the first GET /menu/search instead
+        logger.exception("Could not load the menu search index")
+
+# Portions per product from stock: loaded once, updated by stock adjustments, refreshed periodically
+@app.on_event("startup")
+async def start_availability_engine():
+    try:
+        async with AsyncSessionLocal() as db:
+            await load_availability(db)
+    except Exception:
+        # Loaded on first use instead
+        logger.exception("Could not load the availability engine")
+    app.state.availability_refresh = asyncio.create_task(run_availability_refresh(AsyncSessionLocal))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for name in ("kitchen_reconciler", "availability_refresh"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -28,6 +125,7 @@ app.include_router(menu.router)
 app.include_router(orders.router)
 app.include_router(payments.router)
 app.include_router(inventory.router)
+app.include_router(internal.router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,55 @@
+"""
+Database maintenance commands
+
+    python -m app.maintenance partitions --months-ahead 3
+    python -m app.maintenance archive --older-than 12
+    python -m app.maintenance report
+
+``partitions`` creates the monthly partitions of orders, order_items and
+payments up to N months ahead (run it from cron; the API also does it at
+startup). ``archive`` moves months older than N months to the
+<table>_archive tables, oldest first, stopping at the first month with an
+open order; a month whose orders were paid in the next month goes together
+with that month. Both are no-ops outside Postgres.
+"""
+import argparse
+import asyncio
+import json
+
+from .database import engine
+from .services.partitioning import (
+    ARCHIVE_AFTER_MONTHS,
+    PARTITION_MONTHS_AHEAD,
+    archive_partitions,
+    ensure_partitions,
+    partition_report,
+)
+
+
+async def _run(args) -> dict:
+    try:
+        async with engine.begin() as conn:
+            if args.command == "partitions":
+                return {"created": await ensure_partitions(conn, months_ahead=args.months_ahead)}
+            if args.command == "archive":
+                return await archive_partitions(conn, older_than_months=args.older_than)
+            return await partition_report(conn)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    partitions = commands.add_parser("partitions", help="create upcoming monthly partitions")
+    partitions.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    archive = commands.add_parser("archive", help="move old closed months to the archive tables")
+    archive.add_argument("--older-than", type=int, default=ARCHIVE_AFTER_MONTHS, help="months")
+    commands.add_parser("report", help="list live and archived partitions")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(_run(args)), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, JSON, DateTime, Uuid
+from sqlalchemy.sql import func
+from app.database import Base
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of (endpoint, caller, Idempotency-Key header)
+    key = Column(String(64), primary_key=True)
+    endpoint = Column(String(100), nullable=False)
+    user_id = Column(Uuid(as_uuid=True))
+    # sha256 of the request body, to reject a key reused for a different request
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer)
+    response_body = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -2,6 +2,9 @@ from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
+from sqlalchemy import Column, String, Float, Boolean, Uuid
+from app.database import Base
+from app.utils.ids import uuid7
 
 class IngredientBase(BaseModel):
     name: str
@@ -24,4 +27,16 @@ class IngredientUpdate(BaseModel):
     name: Optional[str] = None
     unit_of_measure: Optional[str] = None
     minimum_stock: Optional[float] = None
-    cost_per_unit: Optional[float] = None
\ No newline at end of file
+    cost_per_unit: Optional[float] = None
+
+
+class Ingredient(Base):
+    __tablename__ = "ingredients"
+
+    ingredient_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    name = Column(String(100), nullable=False, index=True)
+    unit_of_measure = Column(String(20))
+    current_stock = Column(Float, nullable=False, default=0)
+    minimum_stock = Column(Float)
+    cost_per_unit = Column(Float)
+    is_active = Column(Boolean, nullable=False, default=True)
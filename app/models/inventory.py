@@ -3,6 +3,11 @@ from typing import Optional
 from uuid import UUID
 from enum import Enum
 from datetime import datetime
+from sqlalchemy import Column, String, Float, DateTime, Uuid, ForeignKey
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy.sql import func
+from app.database import Base
+from app.utils.ids import uuid7
 
 class TransactionType(str, Enum):
     ADD = "add"
@@ -28,4 +33,19 @@ class InventoryTransactionResponse(InventoryTransactionBase):
 class StockAdjustment(BaseModel):
     quantity: float
     transaction_type: TransactionType
-    notes: Optional[str] = None
\ No newline at end of file
+    notes: Optional[str] = None
+
+
+class InventoryTransaction(Base):
+    __tablename__ = "inventory_transactions"
+
+    transaction_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    ingredient_id = Column(Uuid(as_uuid=True), ForeignKey("ingredients.ingredient_id"), nullable=False, index=True)
+    quantity = Column(Float, nullable=False)
+    transaction_type = Column(
+        SAEnum(TransactionType, name="transaction_type", values_callable=lambda types: [t.value for t in types]),
+        nullable=False
+    )
+    transaction_time = Column(DateTime, server_default=func.now())
+    reference = Column(String(255))
+    staff_id = Column(Uuid(as_uuid=True), ForeignKey("users.user_id"))
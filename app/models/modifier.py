@@ -1,6 +1,11 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from uuid import UUID
+from datetime import datetime
+from sqlalchemy import Column, String, Numeric, DateTime, Uuid
+from sqlalchemy.sql import func
+from app.database import Base
+from app.utils.ids import uuid7
 
 class ModifierBase(BaseModel):
     name: str
@@ -11,9 +16,18 @@ class ModifierCreate(ModifierBase):
 
 class ModifierResponse(ModifierBase):
     modifier_id: UUID
-    created_at: str
+    created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
 class ModifierUpdate(BaseModel):
     name: Optional[str] = None
-    additional_cost: Optional[float] = None
\ No newline at end of file
+    additional_cost: Optional[float] = None
+
+
+class Modifier(Base):
+    __tablename__ = "modifiers"
+
+    modifier_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    name = Column(String(100), nullable=False)
+    additional_cost = Column(Numeric(10, 2, asdecimal=False), nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
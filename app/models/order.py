@@ -3,7 +3,13 @@ from typing import Optional, List
 from uuid import UUID
 from enum import Enum
 from datetime import datetime
-from .order_item import OrderItemResponse, OrderItemCreate
+from sqlalchemy import Column, String, Text, Numeric, DateTime, Uuid, ForeignKey, Index
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+from app.utils.ids import uuid7
+from .order_item import OrderItemResponse, OrderItemCreate, OrderItemModifierCreate
 
 class OrderStatus(str, Enum):
     PENDING = "pending"
@@ -22,6 +28,7 @@ class OrderCreate(OrderBase):
 
 class OrderResponse(OrderBase):
     order_id: UUID
+    order_number: Optional[str] = None
     server_id: UUID
     order_time: datetime
     status: OrderStatus
@@ -34,4 +41,41 @@ class OrderResponse(OrderBase):
 
 class OrderUpdate(BaseModel):
     client_id: Optional[UUID] = None
-    notes: Optional[str] = None
\ No newline at end of file
+    notes: Optional[str] = None
+
+class Order(Base):
+    __tablename__ = "orders"
+
+    # Monthly RANGE partitions on order_time (services/partitioning.py); the partition
+    # key has to be part of the primary key
+    order_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    order_time = Column(DateTime, primary_key=True, default=datetime.now)
+    order_number = Column(String(32), index=True)
+    table_id = Column(Uuid(as_uuid=True), ForeignKey("tables.table_id"), nullable=False)
+    client_id = Column(Uuid(as_uuid=True), ForeignKey("clients.client_id"))
+    server_id = Column(Uuid(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+    status = Column(
+        SAEnum(OrderStatus, name="order_status", values_callable=lambda statuses: [s.value for s in statuses]),
+        nullable=False,
+        default=OrderStatus.PENDING
+    )
+    total_amount = Column(Numeric(10, 2, asdecimal=False), nullable=False, default=0)
+    payment_status = Column(String(20), nullable=False, default="unpaid")
+    notes = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # Items live in the order_items partition of the same month. Partitioned tables
+    # reference each other without foreign keys, so a month can be detached on its own.
+    items = relationship(
+        "OrderItem",
+        primaryjoin="Order.order_id == foreign(OrderItem.order_id)",
+        order_by="OrderItem.item_id",
+        viewonly=True
+    )
+
+    __table_args__ = (
+        # Keyset pagination of GET /orders (newest first); the primary key leads with order_id
+        Index("ix_orders_order_time_order_id", "order_time", "order_id"),
+        {"postgresql_partition_by": "RANGE (order_time)"},
+    )
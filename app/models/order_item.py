@@ -1,6 +1,10 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from uuid import UUID
+from sqlalchemy import Column, Integer, Text, Numeric, DateTime, Uuid, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database import Base
+from app.utils.ids import uuid7
 from .modifier import ModifierResponse
 
 class OrderItemBase(BaseModel):
@@ -11,9 +15,45 @@ class OrderItemCreate(OrderItemBase):
     notes: Optional[str] = None
     modifiers: Optional[List[UUID]] = []
 
+class OrderItemModifierCreate(BaseModel):
+    modifier_id: UUID
+
 class OrderItemResponse(OrderItemBase):
     item_id: UUID
     unit_price: float
     notes: Optional[str]
     modifiers: List[ModifierResponse] = []
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+
+    # Carries its order's order_time: the partition key, so an order and its items share a month
+    item_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    order_time = Column(DateTime, primary_key=True)
+    order_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
+    product_id = Column(Uuid(as_uuid=True), ForeignKey("menu_products.product_id"), nullable=False)
+    quantity = Column(Integer, nullable=False, default=1)
+    # Menu price when the item was ordered
+    unit_price = Column(Numeric(10, 2, asdecimal=False), nullable=False)
+    notes = Column(Text)
+
+    modifiers = relationship(
+        "Modifier",
+        secondary="order_item_modifiers",
+        primaryjoin="OrderItem.item_id == foreign(OrderItemModifier.item_id)",
+        secondaryjoin="Modifier.modifier_id == foreign(OrderItemModifier.modifier_id)",
+        viewonly=True
+    )
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (order_time)"}
+
+
+class OrderItemModifier(Base):
+    __tablename__ = "order_item_modifiers"
+
+    item_id = Column(Uuid(as_uuid=True), primary_key=True)
+    modifier_id = Column(Uuid(as_uuid=True), ForeignKey("modifiers.modifier_id"), primary_key=True)
+    # Modifier price when it was added to the item
+    additional_cost = Column(Numeric(10, 2, asdecimal=False), nullable=False, default=0)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Integer, Date
+from app.database import Base
+
+class OrderNumberCounter(Base):
+    __tablename__ = "order_number_counters"
+
+    # One row per business day and location; numbers restart every day
+    business_date = Column(Date, primary_key=True)
+    location = Column(String(20), primary_key=True)
+    # High-water mark: every number below it has been handed out to some worker
+    next_value = Column(Integer, nullable=False, default=0)
@@ -3,6 +3,10 @@ from typing import Optional
 from uuid import UUID
 from enum import Enum
 from datetime import datetime
+from sqlalchemy import Column, String, Text, Boolean, Numeric, DateTime, Uuid, ForeignKey
+from sqlalchemy import Enum as SAEnum
+from app.database import Base
+from app.utils.ids import uuid7
 
 class PaymentMethod(str, Enum):
     CASH = "cash"
@@ -26,8 +30,35 @@ class PaymentResponse(PaymentBase):
     transaction_reference: Optional[str]
     notes: Optional[str]
     is_refunded: bool = False
+    refunded_amount: float = 0.0
     model_config = ConfigDict(from_attributes=True)
 
+class PaymentUpdate(BaseModel):
+    transaction_reference: Optional[str] = None
+    notes: Optional[str] = None
+
 class RefundRequest(BaseModel):
     amount: float
-    reason: str
\ No newline at end of file
+    reason: str
+
+
+class Payment(Base):
+    __tablename__ = "payments"
+
+    # Monthly RANGE partitions on transaction_time (services/partitioning.py)
+    payment_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    transaction_time = Column(DateTime, primary_key=True, default=datetime.now)
+    # No foreign key: orders is partitioned and keyed by (order_id, order_time)
+    order_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
+    amount = Column(Numeric(10, 2, asdecimal=False), nullable=False)
+    payment_method = Column(
+        SAEnum(PaymentMethod, name="payment_method", values_callable=lambda methods: [m.value for m in methods]),
+        nullable=False
+    )
+    staff_id = Column(Uuid(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+    transaction_reference = Column(String(100))
+    notes = Column(Text)
+    is_refunded = Column(Boolean, nullable=False, default=False)
+    refunded_amount = Column(Numeric(10, 2, asdecimal=False), nullable=False, default=0)
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (transaction_time)"}
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Float, Uuid, CheckConstraint
+from app.database import Base
+from app.utils.ids import uuid7
+
+class RecipeComponent(Base):
+    __tablename__ = "recipe_components"
+
+    # Bill-of-materials lines that product_ingredients can't express: a sub-recipe
+    # (a sauce or dough, itself a menu product with its own recipe) used by a
+    # product, or what a modifier adds to a dish
+    line_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    # Owner: exactly one of product_id / modifier_id
+    product_id = Column(Uuid(as_uuid=True), index=True)
+    modifier_id = Column(Uuid(as_uuid=True), index=True)
+    # Component: exactly one of sub_recipe_id (a product) / ingredient_id
+    sub_recipe_id = Column(Uuid(as_uuid=True), index=True)
+    ingredient_id = Column(Uuid(as_uuid=True))
+    # Portions of the sub-recipe, or units of the ingredient, per portion of the owner
+    quantity = Column(Float, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("(product_id IS NULL) <> (modifier_id IS NULL)", name="ck_recipe_components_owner"),
+        CheckConstraint("(sub_recipe_id IS NULL) <> (ingredient_id IS NULL)", name="ck_recipe_components_component"),
+        CheckConstraint("quantity > 0", name="ck_recipe_components_quantity"),
+    )
@@ -2,6 +2,10 @@ from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
+from sqlalchemy import Column, Integer, Text, DateTime, Uuid, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+from app.utils.ids import uuid7
 
 class ReservationBase(BaseModel):
     client_id: UUID
@@ -23,4 +27,28 @@ class ReservationUpdate(BaseModel):
     table_id: Optional[UUID] = None
     reservation_time: Optional[datetime] = None
     duration_minutes: Optional[int] = None
-    notes: Optional[str] = None
\ No newline at end of file
+    notes: Optional[str] = None
+class ReservationQuery(BaseModel):
+    date: Optional[datetime] = None
+    client_id: Optional[UUID] = None
+    table_id: Optional[UUID] = None
+    skip: int = 0
+    limit: int = 100
+    cursor: Optional[str] = None
+
+
+class Reservation(Base):
+    __tablename__ = "reservations"
+
+    reservation_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    client_id = Column(Uuid(as_uuid=True), ForeignKey("clients.client_id"), nullable=False)
+    table_id = Column(Uuid(as_uuid=True), ForeignKey("tables.table_id"), nullable=False)
+    reservation_time = Column(DateTime, nullable=False)
+    duration_minutes = Column(Integer, nullable=False, default=90)
+    notes = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Keyset pagination of GET /reservations
+        Index("ix_reservations_reservation_time_reservation_id", "reservation_time", "reservation_id"),
+    )
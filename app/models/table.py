@@ -2,6 +2,10 @@ from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from uuid import UUID
 from enum import Enum
+from sqlalchemy import Column, String, Integer, Boolean, Uuid
+from sqlalchemy import Enum as SAEnum
+from app.database import Base
+from app.utils.ids import uuid7
 
 class TableStatus(str, Enum):
     AVAILABLE = "available"
@@ -25,4 +29,19 @@ class TableResponse(TableBase):
 
 class TableUpdate(BaseModel):
     capacity: Optional[int] = None
-    location_description: Optional[str] = None
\ No newline at end of file
+    location_description: Optional[str] = None
+
+
+class Table(Base):
+    __tablename__ = "tables"
+
+    table_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
+    table_number = Column(String(10), unique=True, nullable=False)
+    capacity = Column(Integer, nullable=False)
+    location_description = Column(String(255))
+    status = Column(
+        SAEnum(TableStatus, name="table_status", values_callable=lambda statuses: [s.value for s in statuses]),
+        nullable=False,
+        default=TableStatus.AVAILABLE
+    )
+    is_reserved = Column(Boolean, nullable=False, default=False)
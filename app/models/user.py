@@ -1,11 +1,10 @@
-from uuid import uuid4
 from datetime import datetime
 from enum import Enum as PyEnum
-from sqlalchemy import Column, String, Boolean, DateTime
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy import Column, String, Boolean, DateTime, Uuid, Index
 from sqlalchemy.sql import func
 from sqlalchemy import Enum as SAEnum
 from app.database import Base
+from app.utils.ids import uuid7
 
 class UserRole(str, PyEnum):
     ADMIN = "admin"
@@ -15,12 +14,18 @@ class UserRole(str, PyEnum):
 class User(Base):
     __tablename__ = "users"
 
-    user_id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
+    user_id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(255), unique=True, index=True)
     hashed_password = Column(String(255), nullable=False)
     role = Column(SAEnum(UserRole, name="user_roles"), nullable=False)
     is_active = Column(Boolean, default=True)
     last_login = Column(DateTime(timezone=True))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    # Keyset pagination sort key; a NULL would have no place in the page order
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Keyset pagination of GET /users
+        Index("ix_users_created_at_user_id", "created_at", "user_id"),
+    )
\ No newline at end of file
@@ -1,10 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 
-from ..schemas.client import * 
-from ..models.client import (
+from ..schemas.client import (
     ClientCreate,
     ClientResponse,
     ClientUpdate,
@@ -19,8 +18,9 @@ from ..services.client_service import (
     get_client_with_loyalty,
     update_loyalty_points
 )
-from ..database import get_db
-from ..utils.security import get_current_active_user
+from ..database import get_db, get_read_db
+from ..utils.pagination import set_next_cursor
+from ..services.auth import get_current_active_user
 
 router = APIRouter(prefix="/clients", tags=["Clients"])
 
@@ -28,7 +28,7 @@ router = APIRouter(prefix="/clients", tags=["Clients"])
 async def create_new_client(
     client: ClientCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: Client = Depends(get_current_active_user)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """
     Create a new client record
@@ -42,25 +42,29 @@ async def create_new_client(
 
 @router.get("/", response_model=List[ClientResponse])
 async def read_clients(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-    current_user: Client = Depends(get_current_active_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
 ):
     """
     List all clients with pagination
     
-    - **skip**: Number of records to skip
+    - **skip**: Number of records to skip (ignored when a cursor is given)
     - **limit**: Maximum number of records to return
+    - **cursor**: Opaque cursor from the X-Next-Cursor header of the previous page
     """
-    clients = await get_clients(db, skip=skip, limit=limit)
+    clients = await get_clients(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, clients, "created_at", "client_id", limit)
     return clients
 
 @router.get("/{client_id}", response_model=ClientWithLoyalty)
 async def read_client(
     client_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: Client = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
 ):
     """
     Get detailed client information including loyalty points
@@ -77,7 +81,7 @@ async def update_existing_client(
     client_id: UUID,
     client: ClientUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: Client = Depends(get_current_active_user)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """
     Update client information
@@ -97,7 +101,7 @@ async def update_existing_client(
 async def remove_client(
     client_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: Client = Depends(get_current_active_user)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """
     Delete a client record
@@ -114,7 +118,7 @@ async def adjust_loyalty_points(
     client_id: UUID,
     points: int,
     db: AsyncSession = Depends(get_db),
-    current_user: Client = Depends(get_current_active_user)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """
     Add or subtract loyalty points
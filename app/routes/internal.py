@@ -0,0 +1,202 @@
+from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import engine, get_db, pool_status, replica_engine
+from ..schemas import UserResponse
+from ..services.auth import get_current_admin_user
+from ..services.kitchen_feed import kitchen_feed
+from ..services.kitchen_queue import kitchen_queue, reconcile_kitchen_queue
+from ..services.order_numbers import order_number_allocator
+from ..services.menu_snapshot import menu_snapshot
+from ..services.menu_search import menu_search
+from ..services.availability import availability_engine
+from ..services.costing import costing_engine
+from ..services.partitioning import partition_report
+from ..services.pricing import price_cache, recompute_order_totals
+from ..utils.db_stats import route_sql_summary
+from ..utils.idempotency import idempotency_store, purge_expired_keys
+from ..utils.principal_cache import principal_cache
+from ..utils.security import hashing_stats
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+@router.get("/auth/principal-cache")
+async def read_principal_cache_stats(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Principal cache counters (admin only)
+    
+    A rising hit ratio means authenticated requests are served without a user lookup
+    """
+    return principal_cache.stats()
+
+@router.get("/auth/hashing")
+async def read_hashing_stats(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Password hashing pool counters (admin only)
+    
+    A growing queue_depth during shift changes means HASH_WORKERS is too small
+    """
+    return hashing_stats()
+
+@router.get("/db/pool")
+async def read_db_pool_status(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Connection pool usage (admin only)
+    
+    - **checked_out** / **idle** / **overflow**: current connections per state
+    - **avg_wait_ms** / **recent_p95_wait_ms**: time requests waited for a connection
+    """
+    status = pool_status()
+    if replica_engine is not None:
+        status["replica"] = pool_status(replica_engine)
+    return status
+
+@router.get("/db/routes")
+async def read_route_sql_summary(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Rolling per-route SQL usage (admin only)
+    
+    - **avg_statements** / **p95_statements**: statements issued per request
+    - **n_plus_one_requests**: requests where one statement shape repeated above SQL_N_PLUS_ONE_THRESHOLD
+    """
+    return route_sql_summary.summary()
+
+@router.get("/kitchen/feed")
+async def read_kitchen_feed_stats(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Kitchen feed fan-out counters (admin only)
+    
+    - **subscribers**: connected kitchen screens
+    - **slow_disconnects**: screens dropped because their queue filled up
+    """
+    return kitchen_feed.stats()
+
+@router.get("/kitchen/queue")
+async def read_kitchen_queue_stats(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    In-memory kitchen queue state and the last reconciliation's drift report (admin only)
+    
+    - **last_drift.missing** / **stale** / **changed**: orders the queue had wrong and were corrected
+    """
+    return kitchen_queue.stats()
+
+@router.post("/kitchen/queue/reconcile")
+async def reconcile_kitchen_queue_now(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """Reconcile the kitchen queue against the database now and return the drift report (admin only)"""
+    return await reconcile_kitchen_queue(db)
+
+@router.get("/pricing/cache")
+async def read_price_cache_stats(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """Product/modifier price cache counters (admin only)"""
+    return price_cache.stats()
+
+@router.post("/orders/recompute-totals")
+async def repair_order_totals(
+    since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Recompute stored order totals from their line items (admin only)
+    
+    Runs as a single UPDATE in the database and only rewrites totals that differ.
+    
+    - **since**: Only orders placed at or after this time (default: all orders)
+    """
+    return {"updated": await recompute_order_totals(db, since=since)}
+
+@router.get("/idempotency")
+async def read_idempotency_stats(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Idempotency-Key counters (admin only)
+    
+    - **replay_hits**: retries answered from a stored response (memory, database or an in-flight original)
+    - **key_reuse_mismatches**: keys reused with a different request body
+    """
+    return idempotency_store.stats()
+
+@router.post("/idempotency/purge")
+async def purge_idempotency_keys(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """Delete expired idempotency records (admin only)"""
+    return {"deleted": await purge_expired_keys(db)}
+
+@router.get("/orders/numbers")
+async def read_order_number_allocator(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """Order number blocks held by this worker (admin only)"""
+    return order_number_allocator.stats()
+
+@router.get("/menu/snapshot")
+async def read_menu_snapshot(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    State of the pre-built menu served by GET /menu/ (admin only)
+    
+    - **builds**: snapshot rebuilds since startup (one per burst of menu writes)
+    - **not_modified**: requests answered with 304 from If-None-Match
+    """
+    return menu_snapshot.stats()
+
+@router.get("/menu/search")
+async def read_menu_search_index(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """Size and hit counters of the in-memory menu search index (admin only)"""
+    return menu_search.stats()
+
+@router.get("/menu/availability")
+async def read_availability_engine(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """Recipe matrix size and recompute/flip counters of the availability engine (admin only)"""
+    return availability_engine.stats()
+
+@router.get("/menu/costing")
+async def read_costing_engine(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    State of the dish costing engine (admin only)
+    
+    - **memo_hits**: sub-recipe expansions reused instead of recomputed
+    - **owners_recomputed**: products/modifiers re-costed by ingredient cost changes
+    """
+    return costing_engine.stats()
+
+@router.get("/db/partitions")
+async def read_partitions(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Live and archived monthly partitions of orders, order items and payments (admin only)
+    
+    Partitions are created and archived with `python -m app.maintenance`
+    """
+    async with engine.connect() as conn:
+        return await partition_report(conn)
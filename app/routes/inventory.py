@@ -1,31 +1,108 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 from uuid import UUID
-from enum import Enum
-from datetime import datetime
-
-class TransactionType(str, Enum):
-    ADD = "add"
-    USE = "use"
-    SPOIL = "spoil"
-    ADJUST = "adjust"
-
-class InventoryTransactionBase(BaseModel):
-    ingredient_id: UUID
-    quantity: float
-    transaction_type: TransactionType
-
-class InventoryTransactionCreate(InventoryTransactionBase):
-    reference: Optional[str] = None
-
-class InventoryTransactionResponse(InventoryTransactionBase):
-    transaction_id: UUID
-    transaction_time: datetime
-    reference: Optional[str]
-    staff_id: UUID
-    model_config = ConfigDict(from_attributes=True)
-
-class StockAdjustment(BaseModel):
-    quantity: float
-    transaction_type: TransactionType
-    notes: Optional[str] = None
\ No newline at end of file
+
+from ..models.ingredient import (
+    IngredientCreate,
+    IngredientResponse,
+    IngredientUpdate
+)
+from ..models.inventory import StockAdjustment
+from ..services.inventory_service import (
+    get_ingredient,
+    get_ingredients,
+    create_ingredient,
+    update_ingredient,
+    adjust_stock
+)
+from ..database import get_db, get_read_db
+from ..services.auth import get_current_active_user
+from ..utils.dependencies import get_current_manager_user, get_current_staff_user
+
+router = APIRouter(prefix="/inventory", tags=["Inventory"])
+
+@router.get("/ingredients", response_model=List[IngredientResponse])
+async def read_ingredients(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    List ingredients
+
+    - **skip**: Pagination offset
+    - **limit**: Maximum results per page
+    """
+    return await get_ingredients(db, skip=skip, limit=limit)
+
+@router.get("/ingredients/{ingredient_id}", response_model=IngredientResponse)
+async def read_ingredient(
+    ingredient_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get ingredient details
+
+    - **ingredient_id**: UUID of the ingredient
+    """
+    db_ingredient = await get_ingredient(db, ingredient_id=ingredient_id)
+    if db_ingredient is None:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+    return db_ingredient
+
+@router.post("/ingredients", response_model=IngredientResponse, status_code=status.HTTP_201_CREATED)
+async def create_new_ingredient(
+    ingredient: IngredientCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_manager_user)
+):
+    """
+    Add an ingredient
+
+    - **name**: Ingredient name (required)
+    - **unit_of_measure**: Unit its stock and recipe quantities are counted in
+    - **cost_per_unit**: Purchase cost per unit, used for dish costing
+    """
+    return await create_ingredient(db, ingredient.model_dump())
+
+@router.put("/ingredients/{ingredient_id}", response_model=IngredientResponse)
+async def update_ingredient_details(
+    ingredient_id: UUID,
+    ingredient: IngredientUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_manager_user)
+):
+    """
+    Update an ingredient
+
+    - **ingredient_id**: UUID of the ingredient
+    - A new **cost_per_unit** re-costs only the dishes that use it
+    """
+    db_ingredient = await update_ingredient(db, ingredient_id=ingredient_id, ingredient=ingredient)
+    if db_ingredient is None:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+    return db_ingredient
+
+@router.post("/ingredients/{ingredient_id}/stock", response_model=IngredientResponse)
+async def adjust_ingredient_stock(
+    ingredient_id: UUID,
+    adjustment: StockAdjustment,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_staff_user)
+):
+    """
+    Record a stock movement
+
+    - **ingredient_id**: UUID of the ingredient
+    - **quantity**: Units moved (positive)
+    - **transaction_type**: `add` restocks; `use`, `spoil` and `adjust` take stock out
+    - **notes**: Kept as the transaction's reference (delivery note, reason)
+    - Dishes that can no longer be made are switched off, and back on once restocked
+    """
+    db_ingredient = await adjust_stock(db, ingredient_id, adjustment, current_user.user_id)
+    if db_ingredient is None:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+    return db_ingredient
@@ -1,70 +1,231 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
-from enum import Enum
-from datetime import datetime
-
-class MenuCategory(str, Enum):
-    APPETIZER = "appetizer"
-    MAIN = "main"
-    DESSERT = "dessert"
-    BEVERAGE = "beverage"
-    SIDE = "side"
-    ALCOHOL = "alcohol"
-    BREAKFAST = "breakfast"
-    LUNCH = "lunch"
-    DINNER = "dinner"
-
-class MenuProductBase(BaseModel):
-    name: str
-    description: Optional[str] = None
-    price: float
-    category: Optional[MenuCategory] = None
-
-class MenuProductCreate(MenuProductBase):
-    preparation_time: Optional[int] = None
-    is_available: bool = True
-    is_made_in_house: bool = True
-    product_code: Optional[str] = None
-    ingredients: Optional[List[UUID]] = None
-
-class ProductIngredientBase(BaseModel):
-    product_id: UUID
-    ingredient_id: UUID
-    quantity_required: float
-
-class ProductIngredientCreate(ProductIngredientBase):
-    pass
-
-class ProductIngredientResponse(ProductIngredientBase):
-    ingredient_name: str
-    unit_of_measure: str
-    model_config = ConfigDict(from_attributes=True)
-
-class MenuProductResponse(MenuProductBase):
-    product_id: UUID
-    preparation_time: Optional[int]
-    is_available: bool
-    is_made_in_house: bool
-    product_code: Optional[str]
-    created_at: datetime
-    updated_at: datetime
-    ingredients: Optional[List[ProductIngredientResponse]] = []
-    model_config = ConfigDict(from_attributes=True)
-
-class MenuProductUpdate(BaseModel):
-    name: Optional[str] = None
-    description: Optional[str] = None
-    price: Optional[float] = None
-    category: Optional[MenuCategory] = None
-    preparation_time: Optional[int] = None
-    is_available: Optional[bool] = None
-    product_code: Optional[str] = None
-
-class MenuSection(BaseModel):
-    category: MenuCategory
-    products: List[MenuProductResponse] = []
-
-class FullMenuResponse(BaseModel):
-    sections: List[MenuSection] = []
-    last_updated: datetime
\ No newline at end of file
+
+from ..models.menu import (
+    FullMenuResponse,
+    MenuImportResult,
+    MenuProductCreate,
+    MenuProductResponse,
+    MenuProductUpdate,
+    MenuSearchResult,
+    ProductAvailability,
+    CostingReport,
+    RecipeComponentsUpdate
+)
+from ..models.modifier import ModifierResponse, ModifierUpdate
+from ..services.menu_service import (
+    get_product,
+    get_products,
+    create_product,
+    update_product,
+    update_modifier,
+    set_recipe_components
+)
+from ..services.availability import availability_engine, ensure_availability
+from ..services.costing import costing_engine, ensure_costing, SORT_KEYS
+from ..services.menu_import import import_menu
+from ..services.menu_search import menu_search, load_menu_search
+from ..services.menu_snapshot import menu_snapshot, etag_matches
+from ..database import get_db, get_read_db
+from ..services.auth import get_current_active_user
+from ..utils.dependencies import get_current_manager_user
+
+router = APIRouter(prefix="/menu", tags=["Menu"])
+
+# Clients may keep the menu but must revalidate it (a cheap 304 when unchanged)
+MENU_CACHE_CONTROL = "no-cache"
+
+@router.get("/", response_model=FullMenuResponse)
+async def read_full_menu(
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Full menu grouped by category (public, for guest QR codes and table tablets)
+
+    Served from a pre-built snapshot. Send the last `ETag` back as
+    `If-None-Match` to get a 304 when the menu hasn't changed.
+    """
+    snapshot = await menu_snapshot.current()
+    headers = {"ETag": snapshot.etag, "Cache-Control": MENU_CACHE_CONTROL}
+    if etag_matches(if_none_match, snapshot.etag):
+        menu_snapshot.not_modified += 1
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    menu_snapshot.served += 1
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+@router.get("/search", response_model=List[MenuSearchResult])
+async def search_menu(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    available_only: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Find dishes as you type
+
+    - **q**: Words or word beginnings from the name, description, product code or category; small typos are tolerated
+    - **limit**: Maximum results
+    - **available_only**: Leave out products that can't be ordered (they are ranked lower either way)
+    """
+    if not menu_search.loaded:
+        await load_menu_search(db)
+    return [hit._asdict() for hit in menu_search.search(q, limit=limit, available_only=available_only)]
+
+@router.get("/availability", response_model=List[ProductAvailability])
+async def read_availability(
+    max_portions: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Portions of each product that current stock can make, fewest first
+
+    - **max_portions**: Only products running this low (e.g. 0 for sold out)
+    - **portions** is null for products without recipe quantities; **limiting_ingredient** is the one that runs out first
+    - Products reaching 0 portions are switched off automatically and back on when restocked
+    """
+    await ensure_availability(db)
+    return availability_engine.report(max_portions=max_portions)
+
+@router.get("/costing", response_model=CostingReport)
+async def read_costing(
+    sort: str = Query("margin", pattern="^(" + "|".join(SORT_KEYS) + ")$"),
+    descending: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    include_sub_recipes: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_manager_user)
+):
+    """
+    Cost to make and margin of every dish, plus every modifier (manager only)
+
+    - **sort**: margin, margin_pct, margin_with_modifiers, cost, price or name; dishes with unknown cost come last
+    - **descending**: Largest first
+    - **include_sub_recipes**: Also list preparations (sauces, doughs) that aren't on the menu themselves
+    - Costs include sub-recipes; **missing_costs** counts ingredients without a cost_per_unit.
+      **margin_with_modifiers** adds the modifiers usually ordered with the dish (recent orders)
+    """
+    await ensure_costing(db)
+    return costing_engine.report(
+        sort=sort, descending=descending, offset=skip, limit=limit, include_sub_recipes=include_sub_recipes
+    )
+
+@router.put("/costing/components")
+async def update_recipe_components(
+    components: RecipeComponentsUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_manager_user)
+):
+    """
+    Set the sub-recipes and extra ingredients of a product or modifier (manager only)
+
+    - **product_id** or **modifier_id**: Whose bill of materials this is
+    - **components**: Lines with a **sub_recipe_id** (another product, e.g. a sauce) or an
+      **ingredient_id**, and the **quantity** per portion; replaces the previous lines
+    """
+    return {"components": await set_recipe_components(db, components)}
+
+@router.get("/products", response_model=List[MenuProductResponse])
+async def read_products(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    List menu products
+
+    - **skip**: Pagination offset
+    - **limit**: Maximum results per page
+    """
+    return await get_products(db, skip=skip, limit=limit)
+
+@router.get("/products/{product_id}", response_model=MenuProductResponse)
+async def read_product(
+    product_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get menu product details
+
+    - **product_id**: UUID of the product
+    """
+    db_product = await get_product(db, product_id=product_id)
+    if db_product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return db_product
+
+@router.post("/products", response_model=MenuProductResponse, status_code=status.HTTP_201_CREATED)
+async def create_new_product(
+    product: MenuProductCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_manager_user)
+):
+    """
+    Add a product to the menu
+
+    - **name**: Product name (required)
+    - **price**: Menu price (required)
+    - **category**: Menu section it appears in
+    - **ingredients**: Recipe lines (`ingredient_id`, `quantity_required`), inserted in one batch
+    """
+    return await create_product(db=db, product=product)
+
+@router.post("/import", response_model=MenuImportResult)
+async def import_menu_file(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_manager_user)
+):
+    """
+    Load a whole menu (products with recipes, and modifiers) from a file
+
+    - **file**: `.csv`, `.json` or `.ndjson`. Rows have the product fields
+      (or `type: modifier` with `name`, `additional_cost`); `ingredients`
+      lists the recipe as `Tomato:0.2; Mozzarella:0.125` in CSV or as
+      `{"ingredient": name or id, "quantity_required": ...}` objects in JSON
+    - Rows are processed in chunks; invalid rows are skipped and listed in
+      `errors` with their row number, the rest are saved
+    """
+    return await import_menu(db, file)
+
+@router.put("/products/{product_id}", response_model=MenuProductResponse)
+async def update_product_details(
+    product_id: UUID,
+    product: MenuProductUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_manager_user)
+):
+    """
+    Update a menu product
+
+    - **product_id**: UUID of the product
+    - Only the fields sent are changed
+    """
+    db_product = await update_product(db, product_id=product_id, product=product)
+    if db_product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return db_product
+
+@router.put("/modifiers/{modifier_id}", response_model=ModifierResponse)
+async def update_modifier_details(
+    modifier_id: UUID,
+    modifier: ModifierUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_manager_user)
+):
+    """
+    Update a modifier
+
+    - **modifier_id**: UUID of the modifier
+    - A new **additional_cost** applies to items ordered from now on
+    """
+    db_modifier = await update_modifier(db, modifier_id=modifier_id, modifier=modifier)
+    if db_modifier is None:
+        raise HTTPException(status_code=404, detail="Modifier not found")
+    return db_modifier
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
@@ -13,28 +15,40 @@ from ..models.order import (
     OrderItemCreate,
     OrderItemModifierCreate
 )
+from ..models.order_item import OrderItemResponse
 from ..services.order_service import (
     get_order,
     get_orders,
     create_order,
+    create_orders,
     update_order,
     delete_order,
     add_order_item,
+    remove_order_item,
     update_order_status,
     add_modifier_to_item,
     get_kitchen_orders,
     get_table_orders
 )
-from ..database import get_db
-from ..utils.security import get_current_active_user, require_staff_or_higher
+from ..services.kitchen_feed import kitchen_feed, stream_events
+from ..database import get_db, get_read_db
+from ..utils.helpers import serialize_json
+from ..utils.idempotency import idempotent
+from ..utils.pagination import set_next_cursor
+from ..services.auth import get_current_active_user
+from ..utils.dependencies import get_current_staff_user
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+# Largest batch a POS terminal may flush through POST /orders/bulk
+ORDER_BULK_MAX = int(os.getenv("ORDER_BULK_MAX", "50"))
+
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_order(
     order: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Create a new order
@@ -42,43 +56,125 @@ async def create_new_order(
     - **table_id**: UUID of the table (required)
     - **server_id**: UUID of the staff member
     - **client_id**: UUID of the client (optional)
-    - **items**: List of order items
+    - **items**: List of order items, each with its modifier ids; saved with the order in one transaction
+    
+    Send an `Idempotency-Key` header to make retries safe: a repeated key
+    returns the original response instead of creating another order.
     """
-    return await create_order(db=db, order=order, server_id=current_user.user_id)
+    return await idempotent(
+        db, idempotency_key,
+        endpoint="POST /orders/",
+        user_id=current_user.user_id,
+        payload=order,
+        run=lambda: create_order(db=db, order=order, server_id=current_user.user_id),
+        response_model=OrderResponse,
+        status_code=status.HTTP_201_CREATED
+    )
+
+@router.post("/bulk", response_model=List[OrderResponse], status_code=status.HTTP_201_CREATED)
+async def create_orders_bulk(
+    orders: List[OrderCreate] = Body(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_staff_user)
+):
+    """
+    Create several orders at once (POS terminals flushing queued tickets)
+    
+    All tickets, items and modifiers are written in one transaction: if any
+    product or modifier is unknown or unavailable, nothing is created.
+    
+    - **orders**: List of orders, each with its nested items and modifiers
+
+    Send an `Idempotency-Key` header so a terminal can retry a batch whose
+    response it never got: a repeated key returns the orders first created.
+    """
+    if not orders:
+        raise HTTPException(status_code=400, detail="No orders given")
+    if len(orders) > ORDER_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {ORDER_BULK_MAX} orders per request")
+    return await idempotent(
+        db, idempotency_key,
+        endpoint="POST /orders/bulk",
+        user_id=current_user.user_id,
+        payload=orders,
+        run=lambda: create_orders(db=db, orders=orders, server_id=current_user.user_id),
+        response_model=List[OrderResponse],
+        status_code=status.HTTP_201_CREATED
+    )
 
 @router.get("/", response_model=List[OrderResponse])
 async def read_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[OrderStatus] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    List all orders with filters
+    List all orders with filters, newest first
     
-    - **skip**: Pagination offset
+    - **skip**: Pagination offset (ignored when a cursor is given)
     - **limit**: Maximum results per page
+    - **cursor**: Opaque cursor from the X-Next-Cursor header of the previous page
     - **status**: Filter by order status
     """
-    return await get_orders(db, skip=skip, limit=limit, status=status)
+    orders = await get_orders(db, skip=skip, limit=limit, status=status, cursor=cursor)
+    set_next_cursor(response, orders, "order_time", "order_id", limit)
+    return orders
 
 @router.get("/kitchen", response_model=List[OrderResponse])
 async def read_kitchen_orders(
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Get orders that need kitchen preparation
     (status: pending or preparing)
+    
+    - **limit**: Only the next N tickets
+    """
+    return await get_kitchen_orders(db, limit=limit)
+
+@router.get("/kitchen/stream")
+async def stream_kitchen_orders(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_staff_user)
+):
     """
-    return await get_kitchen_orders(db)
+    Live kitchen feed (Server-Sent Events)
+
+    Sends a `snapshot` event with the current kitchen orders, then
+    `order.created`, `order.item_added`, `order.item_removed`,
+    `order.item_updated` (a modifier added) and `order.status_changed` events as
+    they commit. Screens that fall behind receive `disconnect` and should
+    reconnect for a fresh snapshot.
+    """
+    # Subscribe before reading the snapshot so nothing committed in between is lost;
+    # the snapshot is read from the primary and serialized here, before the session closes.
+    subscriber = kitchen_feed.subscribe()
+    try:
+        orders = await get_kitchen_orders(db)
+        snapshot = serialize_json([
+            OrderResponse.model_validate(order).model_dump(mode="json") for order in orders
+        ])
+    except Exception:
+        kitchen_feed.unsubscribe(subscriber)
+        raise
+    return StreamingResponse(
+        stream_events(subscriber, snapshot, kitchen_feed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/table/{table_id}", response_model=List[OrderResponse])
 async def read_table_orders(
     table_id: UUID,
     active_only: bool = True,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -92,7 +188,7 @@ async def read_table_orders(
 @router.get("/{order_id}", response_model=OrderResponse)
 async def read_order(
     order_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -110,7 +206,7 @@ async def update_order_details(
     order_id: UUID,
     order: OrderUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Update order information
@@ -129,25 +225,28 @@ async def change_order_status(
     order_id: UUID,
     new_status: OrderStatus,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Update order status
     
     - **order_id**: UUID of the order
     - **new_status**: New status (pending, preparing, ready, delivered, cancelled)
+    
+    Returns 409 if the order can't move from its current status to `new_status`
+    (e.g. delivered → pending).
     """
     db_order = await update_order_status(db, order_id=order_id, new_status=new_status)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     return db_order
 
-@router.post("/{order_id}/items", response_model=OrderItem)
+@router.post("/{order_id}/items", response_model=OrderItemResponse)
 async def add_item_to_order(
     order_id: UUID,
     item: OrderItemCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Add an item to an existing order
@@ -156,15 +255,38 @@ async def add_item_to_order(
     - **product_id**: UUID of the menu product
     - **quantity**: Item quantity
     - **notes**: Special instructions
+    - **modifiers**: UUIDs of modifiers for this item
+    
+    The order total is updated by this line's amount.
+    """
+    db_item = await add_order_item(db, order_id=order_id, item=item)
+    if db_item is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return db_item
+
+@router.delete("/{order_id}/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_item_from_order(
+    order_id: UUID,
+    item_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_staff_user)
+):
+    """
+    Remove an item from an order and deduct it from the order total
+    
+    - **order_id**: UUID of the order
+    - **item_id**: UUID of the order item
     """
-    return await add_order_item(db, order_id=order_id, item=item)
+    if not await remove_order_item(db, order_id=order_id, item_id=item_id):
+        raise HTTPException(status_code=404, detail="Order item not found")
+    return None
 
-@router.post("/items/{item_id}/modifiers", response_model=OrderItemModifier)
+@router.post("/items/{item_id}/modifiers", response_model=OrderItemResponse)
 async def add_modifier_to_order_item(
     item_id: UUID,
     modifier: OrderItemModifierCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Add a modifier to an order item
@@ -172,13 +294,16 @@ async def add_modifier_to_order_item(
     - **item_id**: UUID of the order item
     - **modifier_id**: UUID of the product modifier
     """
-    return await add_modifier_to_item(db, item_id=item_id, modifier_id=modifier.modifier_id)
+    db_item = await add_modifier_to_item(db, item_id=item_id, modifier_id=modifier.modifier_id)
+    if db_item is None:
+        raise HTTPException(status_code=404, detail="Order item not found")
+    return db_item
 
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_order(
     order_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Cancel an order (soft delete)
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -20,16 +20,19 @@ from ..services.payment_service import (
     process_refund,
     get_daily_sales_summary
 )
-from ..database import get_db
-from ..utils.security import get_current_active_user, require_staff_or_higher
+from ..database import get_db, get_read_db
+from ..utils.idempotency import idempotent
+from ..services.auth import get_current_active_user
+from ..utils.dependencies import get_current_staff_user
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
 @router.post("/", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
 async def record_payment(
     payment: PaymentCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Record a new payment
@@ -38,13 +41,24 @@ async def record_payment(
     - **amount**: Payment amount (required)
     - **payment_method**: 'cash', 'card', 'online', or 'voucher'
     - **transaction_reference**: External reference ID
+    
+    Send an `Idempotency-Key` header to make retries safe: a repeated key
+    returns the original payment instead of charging again.
     """
-    return await create_payment(db=db, payment=payment, staff_id=current_user.user_id)
+    return await idempotent(
+        db, idempotency_key,
+        endpoint="POST /payments/",
+        user_id=current_user.user_id,
+        payload=payment,
+        run=lambda: create_payment(db=db, payment=payment, staff_id=current_user.user_id),
+        response_model=PaymentResponse,
+        status_code=status.HTTP_201_CREATED
+    )
 
 @router.get("/order/{order_id}", response_model=List[PaymentResponse])
 async def read_order_payments(
     order_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -57,8 +71,8 @@ async def read_order_payments(
 @router.get("/{payment_id}", response_model=PaymentResponse)
 async def read_payment(
     payment_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Get payment details
@@ -75,7 +89,7 @@ async def update_payment_details(
     payment_id: UUID,
     payment: PaymentUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Update payment information
@@ -94,7 +108,7 @@ async def refund_payment(
     payment_id: UUID,
     refund: RefundRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Process a payment refund
@@ -110,9 +124,9 @@ async def refund_payment(
 
 @router.get("/reports/daily", response_model=List[dict])
 async def read_daily_sales_report(
-    date: datetime = datetime.now().date(),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    date: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Get daily sales summary
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
@@ -19,8 +19,10 @@ from ..services.reservation_service import (
     delete_reservation,
     get_available_times
 )
-from ..database import get_db
-from ..utils.security import get_current_active_user, require_staff_or_higher
+from ..database import get_db, get_read_db
+from ..utils.pagination import set_next_cursor
+from ..services.auth import get_current_active_user
+from ..utils.dependencies import get_current_staff_user
 
 router = APIRouter(prefix="/reservations", tags=["Reservations"])
 
@@ -39,16 +41,18 @@ async def create_new_reservation(
     - **duration_minutes**: Duration in minutes (default 90)
     - **notes**: Additional notes
     """
-    return await create_reservation(db=db, reservation=reservation)
+    return await create_reservation(db=db, reservation=reservation.model_dump())
 
 @router.get("/", response_model=List[ReservationResponse])
 async def read_reservations(
+    response: Response,
     date: Optional[datetime] = None,
     client_id: Optional[UUID] = None,
     table_id: Optional[UUID] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -57,24 +61,28 @@ async def read_reservations(
     - **date**: Filter by date
     - **client_id**: Filter by client
     - **table_id**: Filter by table
-    - **skip**: Pagination offset
+    - **skip**: Pagination offset (ignored when a cursor is given)
     - **limit**: Maximum results per page
+    - **cursor**: Opaque cursor from the X-Next-Cursor header of the previous page
     """
     query = ReservationQuery(
         date=date,
         client_id=client_id,
         table_id=table_id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
-    return await get_reservations(db, query=query)
+    reservations = await get_reservations(db, query=query)
+    set_next_cursor(response, reservations, "reservation_time", "reservation_id", limit)
+    return reservations
 
 @router.get("/available-times", response_model=List[datetime])
 async def read_available_times(
     table_id: UUID,
     date: datetime,
     duration: int = 90,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -89,7 +97,7 @@ async def read_available_times(
 @router.get("/{reservation_id}", response_model=ReservationResponse)
 async def read_reservation(
     reservation_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -107,7 +115,7 @@ async def update_reservation_details(
     reservation_id: UUID,
     reservation: ReservationUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Update reservation information
@@ -10,7 +10,7 @@ from ..models.table import (
     TableUpdate,
     TableStatus
 )
-from a.pp.services.table_service import (
+from ..services.table_service import (
     get_table,
     get_tables,
     create_table,
@@ -18,8 +18,9 @@ from a.pp.services.table_service import (
     delete_table,
     update_table_status
 )
-from ..database import get_db
-from ..utils.security import get_current_active_user, require_admin_or_manager
+from ..database import get_db, get_read_db
+from ..services.auth import get_current_active_user
+from ..utils.dependencies import get_current_staff_user, get_current_manager_user
 
 router = APIRouter(prefix="/tables", tags=["Tables"])
 
@@ -27,7 +28,7 @@ router = APIRouter(prefix="/tables", tags=["Tables"])
 async def create_new_table(
     table: TableCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_admin_or_manager)
+    current_user: dict = Depends(get_current_manager_user)
 ):
     """
     Add a new table
@@ -36,14 +37,14 @@ async def create_new_table(
     - **capacity**: Seating capacity (required)
     - **location_description**: Physical location notes
     """
-    return await create_table(db=db, table=table)
+    return await create_table(db=db, table=table.model_dump())
 
 @router.get("/", response_model=List[TableResponse])
 async def read_tables(
     status: Optional[TableStatus] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -58,7 +59,7 @@ async def read_tables(
 @router.get("/{table_id}", response_model=TableResponse)
 async def read_table(
     table_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -76,7 +77,7 @@ async def update_table_details(
     table_id: UUID,
     table: TableUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_admin_or_manager)
+    current_user: dict = Depends(get_current_manager_user)
 ):
     """
     Update table information
@@ -95,13 +96,15 @@ async def change_table_status(
     table_id: UUID,
     new_status: TableStatus,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_staff_or_higher)
+    current_user: dict = Depends(get_current_staff_user)
 ):
     """
     Update table status
     
     - **table_id**: UUID of the table
-    - **new_status**: 'available', 'occupied', or 'reserved'
+    - **new_status**: 'available', 'occupied', 'reserved' or 'maintenance'
+    
+    Returns 409 if the table can't move from its current status to `new_status`.
     """
     db_table = await update_table_status(db, table_id=table_id, new_status=new_status)
     if db_table is None:
@@ -112,7 +115,7 @@ async def change_table_status(
 async def remove_table(
     table_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_admin_or_manager)
+    current_user: dict = Depends(get_current_manager_user)
 ):
     """
     Remove a table (hard delete)
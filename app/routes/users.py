@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
-from ..schemas import UserResponse, UserUpdate, UserRole  # Added UserRole import
+from ..schemas import UserResponse, UserUpdate, UserRole, PasswordChange  # Added UserRole import
 from ..schemas.user import UserCreate
 from ..services.user_service import (
     get_user,
@@ -10,9 +10,11 @@ from ..services.user_service import (
     create_user,
     update_user,
     delete_user,
-    change_user_role
+    change_user_role,
+    change_password
 )
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..utils.pagination import set_next_cursor
 from ..services.auth import get_current_active_user, get_current_admin_user
 
 router = APIRouter(
@@ -27,22 +29,38 @@ async def create_new_user(
     current_user: UserResponse = Depends(get_current_admin_user)
 ):
     """Create a new user (admin only)"""
-    return await create_user(db, user.model_dump())
+    return await create_user(db, user)
+
+@router.put("/me/password", response_model=UserResponse)
+async def change_own_password(
+    passwords: PasswordChange,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    """Change the logged-in user's password; 400 if the current password is wrong"""
+    db_user = await change_password(db, current_user.user_id, passwords.current_password, passwords.new_password)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
 
 @router.get("/", response_model=List[UserResponse])
 async def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserResponse = Depends(get_current_admin_user)
 ):
-    """Get all users (admin only)"""
-    return await get_users(db, skip=skip, limit=limit)
+    """Get all users (admin only), paged by skip or by the X-Next-Cursor cursor"""
+    users = await get_users(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, users, "created_at", "user_id", limit)
+    return users
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """Get a specific user"""
@@ -2,11 +2,24 @@ from .client import ClientCreate, ClientUpdate, ClientResponse, ClientWithLoyalt
 from .table import TableCreate, TableResponse, TableUpdate, TableStatus
 from .reservation import ReservationCreate, ReservationResponse, ReservationUpdate
 from .order import OrderCreate, OrderResponse, OrderUpdate, OrderStatus
-from .order_item import OrderItemCreate, OrderItemResponse
+from .order_item import OrderItemCreate, OrderItemResponse, OrderItemModifierCreate
 from .modifier import ModifierCreate, ModifierResponse, ModifierUpdate
-from .menu import MenuProductCreate, MenuProductResponse, MenuProductUpdate, MenuCategory, ProductIngredientCreate, ProductIngredientResponse, FullMenuResponse, MenuSection
+from .menu import MenuProductCreate, MenuProductResponse, MenuProductUpdate, MenuCategory, ProductIngredientCreate, ProductIngredientResponse, FullMenuResponse, MenuSection, MenuImportResult, MenuSearchResult, ProductAvailability, RecipeComponentsUpdate, CostingReport
 from .inventory import InventoryTransactionCreate, InventoryTransactionResponse, StockAdjustment, TransactionType
 from .ingredient import IngredientCreate, IngredientResponse, IngredientUpdate
-from .payment import PaymentCreate, PaymentResponse, RefundRequest, PaymentMethod
-from .user import Token, TokenData, UserCreate, UserLogin, UserResponse, UserUpdate, UserRole
-from .client import Client  
+from .payment import PaymentCreate, PaymentResponse, PaymentUpdate, RefundRequest, PaymentMethod
+from .user import Token, TokenData, UserCreate, UserLogin, UserResponse, UserUpdate, UserRole, PasswordChange
+
+# Mapped (SQLAlchemy) classes, used by the services next to the schemas above
+from ..models.user import User
+from ..models.client import Client
+from ..models.table import Table
+from ..models.reservation import Reservation
+from ..models.order import Order
+from ..models.order_item import OrderItem, OrderItemModifier
+from ..models.modifier import Modifier
+from ..models.menu import MenuProduct, ProductIngredient
+from ..models.ingredient import Ingredient
+from ..models.inventory import InventoryTransaction
+from ..models.payment import Payment
+from ..models.recipe import RecipeComponent
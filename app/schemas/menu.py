@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Union
 from uuid import UUID
 from enum import Enum
 from datetime import datetime
@@ -21,20 +21,22 @@ class MenuProductBase(BaseModel):
     price: float
     category: Optional[MenuCategory] = None
 
-class MenuProductCreate(MenuProductBase):
-    preparation_time: Optional[int] = None
-    is_available: bool = True
-    is_made_in_house: bool = True
-    product_code: Optional[str] = None
-    ingredients: Optional[List[UUID]] = None
-
 class ProductIngredientBase(BaseModel):
     product_id: UUID
     ingredient_id: UUID
     quantity_required: float
 
 class ProductIngredientCreate(ProductIngredientBase):
-    pass
+    # Taken from the product when the line is sent with it
+    product_id: Optional[UUID] = None
+
+class MenuProductCreate(MenuProductBase):
+    preparation_time: Optional[int] = None
+    is_available: bool = True
+    is_made_in_house: bool = True
+    product_code: Optional[str] = None
+    # Recipe lines; a bare ingredient id (older clients) is linked with quantity 0
+    ingredients: Optional[List[Union[ProductIngredientCreate, UUID]]] = None
 
 class ProductIngredientResponse(ProductIngredientBase):
     ingredient_name: str
@@ -67,4 +69,77 @@ class MenuSection(BaseModel):
 
 class FullMenuResponse(BaseModel):
     sections: List[MenuSection] = []
-    last_updated: datetime
\ No newline at end of file
+    last_updated: datetime
+
+class MenuImportError(BaseModel):
+    row: int
+    name: Optional[str] = None
+    detail: str
+
+class MenuImportResult(BaseModel):
+    rows: int = 0
+    products_created: int = 0
+    recipe_lines_created: int = 0
+    modifiers_created: int = 0
+    errors: List[MenuImportError] = []
+
+class MenuSearchResult(BaseModel):
+    product_id: UUID
+    name: str
+    category: Optional[MenuCategory] = None
+    product_code: Optional[str] = None
+    price: float
+    is_available: bool
+    score: float
+
+class ProductAvailability(BaseModel):
+    product_id: UUID
+    name: str
+    portions: Optional[int] = None
+    is_available: bool
+    auto_disabled: bool = False
+    limiting_ingredient_id: Optional[UUID] = None
+    limiting_ingredient: Optional[str] = None
+
+class RecipeComponentLine(BaseModel):
+    # Exactly one of sub_recipe_id (a product used as a sub-recipe) / ingredient_id
+    sub_recipe_id: Optional[UUID] = None
+    ingredient_id: Optional[UUID] = None
+    quantity: float
+
+class RecipeComponentsUpdate(BaseModel):
+    # Exactly one owner
+    product_id: Optional[UUID] = None
+    modifier_id: Optional[UUID] = None
+    components: List[RecipeComponentLine] = []
+
+class ProductCost(BaseModel):
+    product_id: UUID
+    name: str
+    category: Optional[MenuCategory] = None
+    price: float
+    cost: Optional[float] = None
+    margin: Optional[float] = None
+    margin_pct: Optional[float] = None
+    # Average modifiers per portion sold, from recent orders
+    modifier_revenue: float = 0.0
+    modifier_cost: Optional[float] = None
+    margin_with_modifiers: Optional[float] = None
+    missing_costs: int = 0
+    is_sub_recipe: bool = False
+    error: Optional[str] = None
+
+class ModifierCost(BaseModel):
+    modifier_id: UUID
+    name: str
+    price: float
+    cost: Optional[float] = None
+    margin: Optional[float] = None
+    missing_costs: int = 0
+    error: Optional[str] = None
+
+class CostingReport(BaseModel):
+    total: int
+    products: List[ProductCost] = []
+    modifiers: List[ModifierCost] = []
+    computed_at: datetime
\ No newline at end of file
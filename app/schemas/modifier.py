@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from uuid import UUID
+from datetime import datetime
 
 class ModifierBase(BaseModel):
     name: str
@@ -11,7 +12,7 @@ class ModifierCreate(ModifierBase):
 
 class ModifierResponse(ModifierBase):
     modifier_id: UUID
-    created_at: str
+    created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
 class ModifierUpdate(BaseModel):
@@ -22,6 +22,7 @@ class OrderCreate(OrderBase):
 
 class OrderResponse(OrderBase):
     order_id: UUID
+    order_number: Optional[str] = None
     server_id: UUID
     order_time: datetime
     status: OrderStatus
@@ -11,6 +11,9 @@ class OrderItemCreate(OrderItemBase):
     notes: Optional[str] = None
     modifiers: Optional[List[UUID]] = []
 
+class OrderItemModifierCreate(BaseModel):
+    modifier_id: UUID
+
 class OrderItemResponse(OrderItemBase):
     item_id: UUID
     unit_price: float
@@ -26,8 +26,13 @@ class PaymentResponse(PaymentBase):
     transaction_reference: Optional[str]
     notes: Optional[str]
     is_refunded: bool = False
+    refunded_amount: float = 0.0
     model_config = ConfigDict(from_attributes=True)
 
+class PaymentUpdate(BaseModel):
+    transaction_reference: Optional[str] = None
+    notes: Optional[str] = None
+
 class RefundRequest(BaseModel):
     amount: float
     reason: str
\ No newline at end of file
@@ -29,6 +29,10 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     role: Optional[UserRole] = None
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
 class UserLogin(BaseModel):
     username: str
     password: str
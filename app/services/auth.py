@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,9 +9,10 @@ from sqlalchemy.future import select
 from ..models.user import User  # SQLAlchemy model
 from ..schemas import TokenData, UserRole, UserCreate  # Pydantic schemas
 from ..database import get_db
+from ..utils.principal_cache import Principal, principal_cache
+from ..utils.security import pwd_context, verify_password_async
 
 # Security setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 # Security constants
@@ -31,8 +31,7 @@ async def create_user(db: AsyncSession, user_create: UserCreate, hashed_password
         is_active=True
     )
     db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
+    await db.flush()
     return db_user
 
 async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
@@ -44,16 +43,16 @@ async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User
 async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """Authenticate a user with username and password"""
     user = await get_user_by_username(db, username)
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against the hashed version"""
+    """Verify a plain password against the hashed version (blocking; prefer verify_password_async)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Generate a password hash"""
+    """Generate a password hash (blocking; prefer get_password_hash_async)"""
     return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -63,11 +62,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def token_user_id(token: str) -> Optional[str]:
+    """The user id a valid, unexpired token was issued to, without touching the database"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("user_id")
+
 # Current User Dependencies
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
     """Get the current authenticated user from JWT token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,15 +99,28 @@ async def get_current_user(
     except (JWTError, ValueError):
         raise credentials_exception
     
+    principal = principal_cache.get(token_data.user_id, token)
+    if principal is not None:
+        return principal
+
+    generation = principal_cache.generation
     user = await db.execute(select(User).where(User.user_id == token_data.user_id))
     user = user.scalars().first()
     if user is None:
         raise credentials_exception
-    return user
+
+    principal = Principal(
+        user_id=user.user_id,
+        username=user.username,
+        role=user.role,
+        is_active=user.is_active
+    )
+    principal_cache.set(token, principal, token_expires_at=payload.get("exp"), generation=generation)
+    return principal
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Verify the current user is active"""
     if not current_user.is_active:
         raise HTTPException(
@@ -110,8 +130,8 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Verify the current user is an admin"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
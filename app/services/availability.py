@@ -0,0 +1,390 @@
+import os
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..database import run_after_commit
+from ..schemas import Ingredient, MenuProduct, ProductIngredient
+from ..models.recipe import RecipeComponent
+from .costing import CostingEngine
+from .menu_search import SEARCH_FIELDS, menu_search
+from .menu_snapshot import menu_snapshot
+from .pricing import price_cache
+
+logger = logging.getLogger(__name__)
+
+# Full reload of recipes and stock, to pick up changes made outside adjust_stock
+AVAILABILITY_REFRESH_SECONDS = float(os.getenv("AVAILABILITY_REFRESH_SECONDS", "300"))
+# Guards floor(stock / quantity) against float noise (0.3 / 0.1 -> 2.9999...)
+_EPSILON = 1e-9
+
+
+class AvailabilityEngine:
+    """
+    Portions of every product that current stock can make.
+
+    The recipe matrix is kept sparse, one entry per (product, ingredient)
+    line with a positive quantity, as parallel NumPy arrays sorted by
+    product, plus a by-ingredient ordering of the same entries:
+
+        portions[p] = min over p's lines of floor(stock[ingredient] / quantity)
+
+    computed for all products with one np.minimum.reduceat. A stock change
+    only recomputes the products whose recipes use the changed ingredients.
+    Products without recipe lines are not limited by stock (portions None).
+    Sub-recipes (recipe_components) are flattened into their ingredients
+    through the costing engine's bill of materials, so a pizza is limited
+    by the flour in its dough; a product whose sub-recipes are broken (a
+    cycle, an unknown sub-recipe) has no bill and is not limited either.
+
+    Availability is flipped automatically: a product reaching 0 portions is
+    marked unavailable, and turned back on when restocked, but only if it
+    was switched off for lack of stock rather than by a manager.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.stale = False
+        self.generation = 0
+        self.recomputes = 0
+        self.products_recomputed = 0
+        self.flips = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.product_ids: List[UUID] = []
+        self.names: List[str] = []
+        self.ingredient_ids: List[UUID] = []
+        self.ingredient_names: List[str] = []
+        self._product_index: Dict[UUID, int] = {}
+        self._ingredient_index: Dict[UUID, int] = {}
+        self.available = np.zeros(0, dtype=bool)
+        self.stock = np.zeros(0)
+        self.portions = np.zeros(0)  # float so "no recipe" can be +inf
+        self.auto_disabled: Set[UUID] = set()
+        # Recipe entries, sorted by product row
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._cols = np.zeros(0, dtype=np.int64)
+        self._quantity = np.zeros(0)
+        # Product p's entries are _rows[_product_starts[p]:_product_starts[p + 1]]
+        self._product_starts = np.zeros(1, dtype=np.int64)
+        # Same entries by ingredient: _by_ingredient[_ingredient_starts[j]:_ingredient_starts[j + 1]]
+        self._by_ingredient = np.zeros(0, dtype=np.int64)
+        self._ingredient_starts = np.zeros(1, dtype=np.int64)
+
+    def load(
+        self,
+        products: Iterable[Tuple],
+        ingredients: Iterable[Tuple],
+        lines: Iterable[Tuple],
+        components: Iterable[Tuple] = ()
+    ) -> None:
+        """
+        Build the matrix from (product_id, name, is_available), (ingredient_id,
+        name, current_stock), (product_id, ingredient_id, quantity_required) and
+        recipe_components (product_id, modifier_id, sub_recipe_id, ingredient_id,
+        quantity) rows. Modifier components are ignored: they don't limit a product.
+        """
+        products, ingredients = list(products), list(ingredients)
+        components = [component for component in components if component[0] is not None]
+        if components:
+            lines = self._flatten(products, ingredients, lines, components)
+        self._clear()
+        for product_id, name, is_available in products:
+            self._product_index[product_id] = len(self.product_ids)
+            self.product_ids.append(product_id)
+            self.names.append(name)
+        self.available = np.zeros(len(self.product_ids), dtype=bool)
+        stock = []
+        for ingredient_id, name, current_stock in ingredients:
+            self._ingredient_index[ingredient_id] = len(self.ingredient_ids)
+            self.ingredient_ids.append(ingredient_id)
+            self.ingredient_names.append(name)
+            stock.append(current_stock or 0.0)
+        self.stock = np.array(stock, dtype=float)
+
+        entries = [
+            (self._product_index[product_id], self._ingredient_index[ingredient_id], quantity)
+            for product_id, ingredient_id, quantity in lines
+            # Lines linked without a quantity don't limit anything
+            if quantity and quantity > 0
+            and product_id in self._product_index and ingredient_id in self._ingredient_index
+        ]
+        entries.sort()
+        if entries:
+            rows, cols, quantity = zip(*entries)
+            self._rows = np.array(rows, dtype=np.int64)
+            self._cols = np.array(cols, dtype=np.int64)
+            self._quantity = np.array(quantity, dtype=float)
+        self._product_starts = np.searchsorted(self._rows, np.arange(len(self.product_ids) + 1))
+        self._by_ingredient = np.argsort(self._cols, kind="stable")
+        self._ingredient_starts = np.searchsorted(
+            self._cols[self._by_ingredient], np.arange(len(self.ingredient_ids) + 1)
+        )
+
+        self.portions = self._compute(np.arange(len(self.product_ids)), self.stock)
+        self.loaded = True
+        self.stale = False
+        self.generation += 1
+
+    @staticmethod
+    def _flatten(products, ingredients, lines, components) -> List[Tuple[UUID, UUID, float]]:
+        """Recipe lines with sub-recipes expanded into ingredients"""
+        bom = CostingEngine()
+        bom.load(
+            products=((product_id, name, None, 0) for product_id, name, _ in products),
+            modifiers=(),
+            ingredients=((ingredient_id, None) for ingredient_id, _, _ in ingredients),
+            lines=lines,
+            components=components
+        )
+        return bom.product_bills()
+
+    def invalidate(self) -> None:
+        """Recipes or the product/ingredient list changed: rebuild on next use"""
+        self.stale = True
+
+    def set_available(self, product_id: UUID, is_available: bool, automatic: bool = False) -> None:
+        index = self._product_index.get(product_id)
+        if index is None:
+            return
+        self.available[index] = is_available
+        if automatic and not is_available:
+            self.auto_disabled.add(product_id)
+        else:
+            self.auto_disabled.discard(product_id)
+
+    def _entries_for(self, rows: np.ndarray) -> np.ndarray:
+        """Indexes of the recipe entries of the given product rows"""
+        if len(rows) == len(self.product_ids):
+            return np.arange(len(self._rows))
+        # Each product's entries are contiguous; concatenate their ranges without
+        # touching the rest of the matrix
+        starts = self._product_starts[rows]
+        lengths = self._product_starts[rows + 1] - starts
+        block_starts = np.cumsum(lengths) - lengths
+        return np.repeat(starts - block_starts, lengths) + np.arange(int(lengths.sum()))
+
+    def _compute(self, rows: np.ndarray, stock: np.ndarray) -> np.ndarray:
+        """Portions for `rows` (sorted product rows) under `stock`"""
+        portions = np.full(len(rows), np.inf)
+        entries = self._entries_for(rows)
+        if len(entries) == 0:
+            return portions
+        entry_rows = self._rows[entries]
+        per_line = np.floor(np.maximum(stock[self._cols[entries]], 0.0) / self._quantity[entries] + _EPSILON)
+        # Entries are grouped by product; one min per group
+        starts = np.flatnonzero(np.r_[True, entry_rows[1:] != entry_rows[:-1]])
+        minimums = np.minimum.reduceat(per_line, starts)
+        portions[np.searchsorted(rows, entry_rows[starts])] = minimums
+        return portions
+
+    def affected_rows(self, ingredient_ids: Iterable[UUID]) -> np.ndarray:
+        """Product rows whose recipes use any of the ingredients"""
+        chunks = []
+        for ingredient_id in ingredient_ids:
+            column = self._ingredient_index.get(ingredient_id)
+            if column is not None:
+                start, end = self._ingredient_starts[column], self._ingredient_starts[column + 1]
+                chunks.append(self._rows[self._by_ingredient[start:end]])
+        if not chunks:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(chunks))
+
+    def _with_stock(self, stock: np.ndarray, stock_changes: Dict[UUID, float]) -> np.ndarray:
+        for ingredient_id, current_stock in stock_changes.items():
+            column = self._ingredient_index.get(ingredient_id)
+            if column is not None:
+                stock[column] = current_stock
+        return stock
+
+    def preview(self, stock_changes: Dict[UUID, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """(affected rows, their new portions) for new stock levels, without applying them"""
+        rows = self.affected_rows(stock_changes)
+        return rows, self._compute(rows, self._with_stock(self.stock.copy(), stock_changes))
+
+    def flips_for(self, rows: np.ndarray, portions: np.ndarray) -> Tuple[List[UUID], List[UUID]]:
+        """(products to switch off, products to switch back on) for new portions"""
+        disable, enable = [], []
+        for row, count in zip(rows.tolist(), portions.tolist()):
+            product_id = self.product_ids[row]
+            if count < 1 and self.available[row]:
+                disable.append(product_id)
+            elif count >= 1 and product_id in self.auto_disabled:
+                enable.append(product_id)
+        return disable, enable
+
+    def apply(
+        self,
+        generation: int,
+        stock_changes: Dict[UUID, float],
+        disable: List[UUID],
+        enable: List[UUID]
+    ) -> None:
+        if generation != self.generation:
+            # Reloaded in between; the rows no longer line up, so reload again to see this change
+            self.stale = True
+            return
+        # Recomputed from the latest stock rather than the preview, which may predate another commit
+        self._with_stock(self.stock, stock_changes)
+        rows = self.affected_rows(stock_changes)
+        self.portions[rows] = self._compute(rows, self.stock)
+        for product_id in disable:
+            self.set_available(product_id, False, automatic=True)
+        for product_id in enable:
+            self.set_available(product_id, True)
+        self.recomputes += 1
+        self.products_recomputed += len(rows)
+        self.flips += len(disable) + len(enable)
+
+    def limiting_ingredients(self) -> List[Optional[int]]:
+        """Per product, the ingredient column that bounds its portions (None without a recipe)"""
+        limiting: List[Optional[int]] = [None] * len(self.product_ids)
+        if len(self._rows) == 0:
+            return limiting
+        per_line = np.floor(np.maximum(self.stock[self._cols], 0.0) / self._quantity + _EPSILON)
+        is_min = per_line == self.portions[self._rows]
+        starts = np.flatnonzero(np.r_[True, self._rows[1:] != self._rows[:-1]])
+        # First entry of each product that reaches its minimum
+        positions = np.where(is_min, np.arange(len(self._rows)), len(self._rows))
+        first = np.minimum.reduceat(positions, starts)
+        for row, entry in zip(self._rows[starts].tolist(), first.tolist()):
+            limiting[row] = int(self._cols[entry])
+        return limiting
+
+    def report(self, max_portions: Optional[int] = None) -> List[dict]:
+        limiting = self.limiting_ingredients()
+        report = []
+        for row, product_id in enumerate(self.product_ids):
+            count = self.portions[row]
+            portions = None if np.isinf(count) else int(count)
+            if max_portions is not None and (portions is None or portions > max_portions):
+                continue
+            column = limiting[row]
+            report.append({
+                "product_id": product_id,
+                "name": self.names[row],
+                "portions": portions,
+                "is_available": bool(self.available[row]),
+                "auto_disabled": product_id in self.auto_disabled,
+                "limiting_ingredient_id": self.ingredient_ids[column] if column is not None else None,
+                "limiting_ingredient": self.ingredient_names[column] if column is not None else None,
+            })
+        report.sort(key=lambda item: (item["portions"] is None, item["portions"] or 0, item["name"] or ""))
+        return report
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "stale": self.stale,
+            "products": len(self.product_ids),
+            "ingredients": len(self.ingredient_ids),
+            "recipe_lines": int(len(self._rows)),
+            "out_of_stock": int(np.count_nonzero(self.portions < 1)),
+            "auto_disabled": len(self.auto_disabled),
+            "recomputes": self.recomputes,
+            "products_recomputed": self.products_recomputed,
+            "flips": self.flips,
+        }
+
+
+async def load_availability(db: AsyncSession) -> None:
+    """(Re)build the engine from products, ingredients, recipe lines and sub-recipes (four queries)"""
+    products = (await db.execute(
+        select(MenuProduct.product_id, MenuProduct.name, MenuProduct.is_available)
+    )).all()
+    ingredients = (await db.execute(
+        select(Ingredient.ingredient_id, Ingredient.name, Ingredient.current_stock)
+    )).all()
+    lines = (await db.execute(
+        select(ProductIngredient.product_id, ProductIngredient.ingredient_id, ProductIngredient.quantity_required)
+    )).all()
+    components = (await db.execute(
+        select(
+            RecipeComponent.product_id,
+            RecipeComponent.modifier_id,
+            RecipeComponent.sub_recipe_id,
+            RecipeComponent.ingredient_id,
+            RecipeComponent.quantity
+        ).where(RecipeComponent.product_id.is_not(None))
+    )).all()
+
+    previously_auto = availability_engine.auto_disabled
+    availability_engine.load(products, ingredients, lines, components)
+    for product_id, _, is_available in products:
+        availability_engine.set_available(product_id, bool(is_available))
+    # An unavailable product that stock can't make is assumed to be off for lack of stock,
+    # so it comes back on restock; one that stock could make was switched off by hand.
+    for row, product_id in enumerate(availability_engine.product_ids):
+        if not availability_engine.available[row] and (
+            product_id in previously_auto or availability_engine.portions[row] < 1
+        ):
+            availability_engine.auto_disabled.add(product_id)
+    logger.info("Availability engine loaded: %s", availability_engine.stats())
+
+
+async def ensure_availability(db: AsyncSession) -> bool:
+    """Load the engine if it hasn't been, or reload it after recipe changes; False if it can't be"""
+    if availability_engine.loaded and not availability_engine.stale:
+        return True
+    await load_availability(db)
+    return availability_engine.loaded
+
+
+async def sync_availability(db: AsyncSession, stock_changes: Dict[UUID, float]) -> Tuple[List[UUID], List[UUID]]:
+    """
+    Recompute the products using the changed ingredients and flip their availability.
+
+    Called from stock writes with the ingredients' new stock levels. The
+    flips are written in the caller's transaction; the engine, search index,
+    price cache and menu snapshot pick them up after the commit.
+    """
+    await ensure_availability(db)
+    generation = availability_engine.generation
+    rows, portions = availability_engine.preview(stock_changes)
+    disable, enable = availability_engine.flips_for(rows, portions)
+
+    changed = []
+    for product_ids, is_available in ((disable, False), (enable, True)):
+        if product_ids:
+            result = await db.execute(
+                update(MenuProduct)
+                .where(MenuProduct.product_id.in_(product_ids))
+                .values(is_available=is_available)
+                .returning(*(getattr(MenuProduct, field) for field in SEARCH_FIELDS))
+            )
+            changed.extend(row._asdict() for row in result)
+
+    def apply():
+        availability_engine.apply(generation, stock_changes, disable, enable)
+        if changed:
+            for fields in changed:
+                price_cache.invalidate_product(fields["product_id"])
+            menu_search.upsert_many(changed)
+            menu_snapshot.invalidate()
+            logger.info("Availability flipped: %d off, %d back on", len(disable), len(enable))
+    run_after_commit(db, apply)
+    return disable, enable
+
+
+async def run_availability_refresh(session_factory, interval: float = AVAILABILITY_REFRESH_SECONDS) -> None:
+    """Background task: periodically reload the engine from the database"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                await load_availability(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Availability refresh failed")
+
+
+# Process-wide engine used by adjust_stock and GET /menu/availability
+availability_engine = AvailabilityEngine()
@@ -1,66 +1,72 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, delete
 from fastapi import HTTPException, status
 from typing import Optional
 
 from ..models.client import Client
-from ..schemas import ClientCreate, ClientUpdate
+from ..schemas import ClientCreate, ClientUpdate, ClientWithLoyalty
+from ..utils.pagination import apply_keyset
+
+# Loyalty tiers by points, highest first
+LOYALTY_TIERS = ((1000, "gold"), (500, "silver"), (0, "bronze"))
 
 async def get_client(db: AsyncSession, client_id: str) -> Optional[Client]:
     """Get a single client by ID"""
     result = await db.execute(select(Client).where(Client.client_id == client_id))
     return result.scalars().first()
 
-async def get_clients(db: AsyncSession, skip: int = 0, limit: int = 100):
+async def get_client_with_loyalty(db: AsyncSession, client_id: str) -> Optional[ClientWithLoyalty]:
+    """A client with the loyalty tier their points put them in"""
+    db_client = await get_client(db, client_id)
+    if db_client is None:
+        return None
+    points = db_client.loyalty_points or 0
+    tier = next(name for threshold, name in LOYALTY_TIERS if points >= threshold) if points >= 0 else None
+    return ClientWithLoyalty.model_validate(db_client).model_copy(update={"loyalty_status": tier})
+
+async def get_clients(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
     """Get multiple clients with pagination"""
-    result = await db.execute(select(Client).offset(skip).limit(limit))
+    query = apply_keyset(select(Client), Client.created_at, Client.client_id, cursor, skip, limit)
+    result = await db.execute(query)
     return result.scalars().all()
 
 async def create_client(db: AsyncSession, client: ClientCreate) -> Client:
     """Create a new client"""
     db_client = Client(**client.model_dump())
     db.add(db_client)
-    await db.commit()
-    await db.refresh(db_client)
+    await db.flush()
     return db_client
 
 async def update_client(db: AsyncSession, client_id: str, client: ClientUpdate) -> Optional[Client]:
     """Update client information"""
-    result = await db.execute(select(Client).where(Client.client_id == client_id))
-    db_client = result.scalars().first()
-    
-    if not db_client:
-        return None
-    
     update_data = client.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_client, field, value)
+    if not update_data:
+        return await get_client(db, client_id)
     
-    await db.commit()
-    await db.refresh(db_client)
-    return db_client
+    result = await db.execute(
+        update(Client)
+        .where(Client.client_id == client_id)
+        .values(**update_data)
+        .returning(Client)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
 async def update_loyalty_points(db: AsyncSession, client_id: str, points: int) -> Optional[Client]:
     """Update client's loyalty points"""
-    result = await db.execute(select(Client).where(Client.client_id == client_id))
-    db_client = result.scalars().first()
-    
-    if not db_client:
-        return None
-    
-    db_client.loyalty_points = points
-    await db.commit()
-    await db.refresh(db_client)
-    return db_client
+    result = await db.execute(
+        update(Client)
+        .where(Client.client_id == client_id)
+        .values(loyalty_points=points)
+        .returning(Client)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
 async def delete_client(db: AsyncSession, client_id: str) -> bool:
     """Delete a client"""
-    result = await db.execute(select(Client).where(Client.client_id == client_id))
-    db_client = result.scalars().first()
-    
-    if not db_client:
-        return False
-    
-    await db.delete(db_client)
-    await db.commit()
-    return True
\ No newline at end of file
+    result = await db.execute(
+        delete(Client).where(Client.client_id == client_id).returning(Client.client_id)
+    )
+    return result.scalar() is not None
\ No newline at end of file
@@ -0,0 +1,466 @@
+import os
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..schemas import Ingredient, MenuProduct, Modifier, Order, OrderItem, OrderItemModifier, ProductIngredient
+from ..models.recipe import RecipeComponent
+
+logger = logging.getLogger(__name__)
+
+# Costs are fully reloaded after this long even without writes (modifier attach rates drift)
+COSTING_REFRESH_SECONDS = float(os.getenv("COSTING_REFRESH_SECONDS", "900"))
+# Order history used for how often each modifier is added to each product
+COSTING_MODIFIER_LOOKBACK_DAYS = int(os.getenv("COSTING_MODIFIER_LOOKBACK_DAYS", "30"))
+
+SORT_KEYS = ("margin", "margin_pct", "margin_with_modifiers", "cost", "price", "name")
+
+
+class CostingEngine:
+    """
+    Cost and margin of every product and modifier.
+
+    Each product's recipe (ingredient lines plus sub-recipes such as sauces
+    and doughs, which are products themselves) is expanded once into a flat
+    ingredient bill, memoizing every sub-recipe so a dough shared by twenty
+    pizzas is expanded once. The flattened bills form a sparse
+    (owner x ingredient) matrix, so all costs are one weighted bincount
+    against the ingredient cost vector, and margins one pass of array
+    arithmetic.
+
+    An ingredient cost change only recomputes the owners whose bills use
+    that ingredient; recipe changes mark the engine stale for a full reload.
+    Owners are products (rows 0..P-1) followed by modifiers.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.stale = False
+        self.loaded_at: Optional[datetime] = None
+        self.computed_at: Optional[datetime] = None
+        self.expansions = 0
+        self.memo_hits = 0
+        self.cost_updates = 0
+        self.owners_recomputed = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.product_ids: List[UUID] = []
+        self.product_names: List[str] = []
+        self.categories: List[Optional[str]] = []
+        self.modifier_ids: List[UUID] = []
+        self.modifier_names: List[str] = []
+        self.ingredient_ids: List[UUID] = []
+        self._product_index: Dict[UUID, int] = {}
+        self._modifier_index: Dict[UUID, int] = {}
+        self._ingredient_index: Dict[UUID, int] = {}
+        self._sub_recipes: Dict[int, List[Tuple[int, float]]] = {}
+        self.errors: Dict[int, str] = {}
+        self.is_sub_recipe = np.zeros(0, dtype=bool)
+        self.on_menu = np.zeros(0, dtype=bool)
+        self.prices = np.zeros(0)  # products, then modifiers
+        self.unit_costs = np.zeros(0)  # per ingredient, NaN when unknown
+        # Flattened bills: owner row, ingredient column, quantity per portion
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._cols = np.zeros(0, dtype=np.int64)
+        self._quantity = np.zeros(0)
+        self._by_ingredient = np.zeros(0, dtype=np.int64)
+        self._ingredient_starts = np.zeros(1, dtype=np.int64)
+        # Modifier attach rates: (product row, modifier index, modifiers per portion sold)
+        self._attach_products = np.zeros(0, dtype=np.int64)
+        self._attach_modifiers = np.zeros(0, dtype=np.int64)
+        self._attach_rate = np.zeros(0)
+        # Results, per owner
+        self.costs = np.zeros(0)
+        self.missing = np.zeros(0, dtype=np.int64)
+
+    @property
+    def owners(self) -> int:
+        return len(self.product_ids) + len(self.modifier_ids)
+
+    def load(
+        self,
+        products: Iterable[Tuple],
+        modifiers: Iterable[Tuple],
+        ingredients: Iterable[Tuple],
+        lines: Iterable[Tuple],
+        components: Iterable[Tuple],
+        attachments: Iterable[Tuple] = (),
+        units_sold: Iterable[Tuple] = ()
+    ) -> None:
+        """
+        Build from (product_id, name, category, price), (modifier_id, name,
+        additional_cost), (ingredient_id, cost_per_unit), product_ingredients
+        (product_id, ingredient_id, quantity), recipe_components (product_id,
+        modifier_id, sub_recipe_id, ingredient_id, quantity), and recent sales:
+        (product_id, modifier_id, units) and (product_id, units).
+        """
+        self._clear()
+        prices = []
+        for product_id, name, category, price in products:
+            self._product_index[product_id] = len(self.product_ids)
+            self.product_ids.append(product_id)
+            self.product_names.append(name)
+            self.categories.append(getattr(category, "value", category))
+            prices.append(float(price or 0))
+        for modifier_id, name, additional_cost in modifiers:
+            self._modifier_index[modifier_id] = len(self.modifier_ids)
+            self.modifier_ids.append(modifier_id)
+            self.modifier_names.append(name)
+            prices.append(float(additional_cost or 0))
+        self.prices = np.array(prices, dtype=float)
+        unit_costs = []
+        for ingredient_id, cost_per_unit in ingredients:
+            self._ingredient_index[ingredient_id] = len(self.ingredient_ids)
+            self.ingredient_ids.append(ingredient_id)
+            unit_costs.append(np.nan if cost_per_unit is None else float(cost_per_unit))
+        self.unit_costs = np.array(unit_costs, dtype=float)
+
+        direct: Dict[int, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        for product_id, ingredient_id, quantity in lines:
+            self._add_ingredient(direct, self._product_index.get(product_id), ingredient_id, quantity)
+        for product_id, modifier_id, sub_recipe_id, ingredient_id, quantity in components:
+            owner = self._owner_row(product_id, modifier_id)
+            if owner is None or not quantity or quantity <= 0:
+                continue
+            if ingredient_id is not None:
+                self._add_ingredient(direct, owner, ingredient_id, quantity)
+            elif sub_recipe_id in self._product_index:
+                self._sub_recipes.setdefault(owner, []).append((self._product_index[sub_recipe_id], float(quantity)))
+            else:
+                self.errors[owner] = f"Unknown sub-recipe {sub_recipe_id}"
+        self.is_sub_recipe = np.zeros(len(self.product_ids), dtype=bool)
+        for subs in self._sub_recipes.values():
+            for row, _ in subs:
+                self.is_sub_recipe[row] = True
+        self.on_menu = np.array([category is not None for category in self.categories], dtype=bool)
+
+        self._expand_all(direct)
+        self._load_attachments(attachments, units_sold)
+        self._compute_all()
+        self.loaded = True
+        self.stale = False
+        self.loaded_at = datetime.now()
+
+    def _owner_row(self, product_id: Optional[UUID], modifier_id: Optional[UUID]) -> Optional[int]:
+        if product_id is not None:
+            return self._product_index.get(product_id)
+        index = self._modifier_index.get(modifier_id)
+        return None if index is None else len(self.product_ids) + index
+
+    def _add_ingredient(self, direct, owner: Optional[int], ingredient_id: UUID, quantity) -> None:
+        column = self._ingredient_index.get(ingredient_id)
+        # Lines linked without a quantity cost nothing
+        if owner is not None and column is not None and quantity and quantity > 0:
+            direct[owner][column] += float(quantity)
+
+    def _expand_all(self, direct: Dict[int, Dict[int, float]]) -> None:
+        """Flatten every owner's bill of materials, memoizing sub-recipes"""
+        memo: Dict[int, Optional[Dict[int, float]]] = {}
+        rows, cols, quantity = [], [], []
+        for owner in range(self.owners):
+            bill = self._expand(owner, direct, memo, set())
+            if bill:
+                rows.extend([owner] * len(bill))
+                cols.extend(bill.keys())
+                quantity.extend(bill.values())
+        self._rows = np.array(rows, dtype=np.int64)
+        self._cols = np.array(cols, dtype=np.int64)
+        self._quantity = np.array(quantity, dtype=float)
+        self._by_ingredient = np.argsort(self._cols, kind="stable")
+        self._ingredient_starts = np.searchsorted(
+            self._cols[self._by_ingredient], np.arange(len(self.ingredient_ids) + 1)
+        )
+
+    def _expand(self, owner: int, direct, memo, visiting: Set[int]) -> Optional[Dict[int, float]]:
+        """Ingredient column -> quantity per portion of `owner`; None if its recipe is broken"""
+        if owner in memo:
+            self.memo_hits += 1
+            return memo[owner]
+        if owner in visiting:
+            self.errors[owner] = "Sub-recipe cycle"
+            return None
+        if owner in self.errors:
+            # e.g. an unknown sub-recipe, found at load
+            memo[owner] = None
+            return None
+        self.expansions += 1
+        visiting.add(owner)
+        bill = dict(direct.get(owner, {}))
+        for sub_recipe, quantity in self._sub_recipes.get(owner, ()):
+            sub_bill = self._expand(sub_recipe, direct, memo, visiting)
+            if sub_bill is None:
+                self.errors.setdefault(owner, f"Sub-recipe {self.product_names[sub_recipe]!r}: {self.errors.get(sub_recipe, 'broken')}")
+                bill = None
+                break
+            for column, amount in sub_bill.items():
+                bill[column] = bill.get(column, 0.0) + quantity * amount
+        visiting.discard(owner)
+        memo[owner] = bill
+        return bill
+
+    def _load_attachments(self, attachments: Iterable[Tuple], units_sold: Iterable[Tuple]) -> None:
+        sold = {product_id: float(units) for product_id, units in units_sold if units}
+        products, modifiers, rates = [], [], []
+        for product_id, modifier_id, units in attachments:
+            row = self._product_index.get(product_id)
+            index = self._modifier_index.get(modifier_id)
+            if row is None or index is None or not sold.get(product_id):
+                continue
+            products.append(row)
+            modifiers.append(index)
+            rates.append(float(units) / sold[product_id])
+        self._attach_products = np.array(products, dtype=np.int64)
+        self._attach_modifiers = np.array(modifiers, dtype=np.int64)
+        self._attach_rate = np.array(rates, dtype=float)
+
+    def _bill_costs(self, entries: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        rows = self._rows if entries is None else self._rows[entries]
+        cols = self._cols if entries is None else self._cols[entries]
+        quantity = self._quantity if entries is None else self._quantity[entries]
+        unit_costs = self.unit_costs[cols]
+        unknown = np.isnan(unit_costs)
+        costs = np.bincount(rows, weights=quantity * np.where(unknown, 0.0, unit_costs), minlength=self.owners).astype(float)
+        missing = np.bincount(rows, weights=unknown, minlength=self.owners).astype(np.int64)
+        return costs, missing
+
+    def _compute_all(self) -> None:
+        """Every owner's cost in one pass over the flattened bills"""
+        self.costs, self.missing = self._bill_costs()
+        for owner in self.errors:
+            self.costs[owner] = np.nan
+        self.computed_at = datetime.now()
+
+    def set_ingredient_cost(self, ingredient_id: UUID, cost_per_unit: Optional[float]) -> int:
+        """Recompute only the owners whose bills use the ingredient; returns how many"""
+        column = self._ingredient_index.get(ingredient_id)
+        if column is None:
+            return 0
+        self.unit_costs[column] = np.nan if cost_per_unit is None else float(cost_per_unit)
+        start, end = self._ingredient_starts[column], self._ingredient_starts[column + 1]
+        owners = np.unique(self._rows[self._by_ingredient[start:end]])
+        if len(owners):
+            entries = np.flatnonzero(np.isin(self._rows, owners))
+            costs, missing = self._bill_costs(entries)
+            self.costs[owners] = costs[owners]
+            self.missing[owners] = missing[owners]
+        self.cost_updates += 1
+        self.owners_recomputed += len(owners)
+        self.computed_at = datetime.now()
+        return len(owners)
+
+    def update_product(self, fields: dict) -> None:
+        """Name, category or price edits don't change any bill; patch them in place"""
+        row = self._product_index.get(fields.get("product_id"))
+        if row is None:
+            self.stale = True
+            return
+        self.product_names[row] = fields.get("name") or self.product_names[row]
+        self.categories[row] = getattr(fields.get("category"), "value", fields.get("category"))
+        self.on_menu[row] = self.categories[row] is not None
+        self.prices[row] = float(fields.get("price") or 0)
+
+    def product_bills(self) -> List[Tuple[UUID, UUID, float]]:
+        """(product_id, ingredient_id, quantity per portion) of every product's flattened bill"""
+        count = len(self.product_ids)
+        return [
+            (self.product_ids[row], self.ingredient_ids[column], quantity)
+            for row, column, quantity in zip(self._rows.tolist(), self._cols.tolist(), self._quantity.tolist())
+            if row < count
+        ]
+
+    def invalidate(self) -> None:
+        """Recipes, products or modifiers changed: reload on next use"""
+        self.stale = True
+
+    def creates_cycle(self, owner_product_id: UUID, sub_recipe_ids: Iterable[UUID]) -> bool:
+        """Whether using these sub-recipes in the product would make it (indirectly) contain itself"""
+        target = self._product_index.get(owner_product_id)
+        stack = [self._product_index.get(sub_recipe_id) for sub_recipe_id in sub_recipe_ids]
+        seen = set()
+        while stack:
+            row = stack.pop()
+            if row is None or row in seen:
+                continue
+            if row == target:
+                return True
+            seen.add(row)
+            stack.extend(sub for sub, _ in self._sub_recipes.get(row, ()))
+        return False
+
+    def product_figures(self) -> Dict[str, np.ndarray]:
+        """Margins of every product, with and without the modifiers usually added to it"""
+        count = len(self.product_ids)
+        price = self.prices[:count]
+        cost = self.costs[:count]
+        modifier_prices = self.prices[count:]
+        modifier_costs = self.costs[count:]
+        # astype: bincount of no entries at all comes back as integers
+        modifier_revenue = np.bincount(
+            self._attach_products, weights=self._attach_rate * modifier_prices[self._attach_modifiers], minlength=count
+        ).astype(float)
+        modifier_cost = np.bincount(
+            self._attach_products, weights=self._attach_rate * modifier_costs[self._attach_modifiers], minlength=count
+        ).astype(float)
+        margin = price - cost
+        with np.errstate(divide="ignore", invalid="ignore"):
+            margin_pct = np.where(price > 0, margin / price * 100, np.nan)
+        return {
+            "price": price,
+            "cost": cost,
+            "margin": margin,
+            "margin_pct": margin_pct,
+            "modifier_revenue": modifier_revenue,
+            "modifier_cost": modifier_cost,
+            "margin_with_modifiers": margin + modifier_revenue - modifier_cost,
+        }
+
+    def report(
+        self,
+        sort: str = "margin",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 100,
+        include_sub_recipes: bool = False
+    ) -> dict:
+        """One page of products ordered by `sort` (unknown costs last), plus every modifier"""
+        figures = self.product_figures()
+        selected = np.arange(len(self.product_ids))
+        if not include_sub_recipes:
+            # Preparations that only exist as part of other dishes
+            selected = selected[self.on_menu | ~self.is_sub_recipe]
+
+        if sort == "name":
+            order = sorted(selected.tolist(), key=lambda row: (self.product_names[row] or "").lower(), reverse=descending)
+        else:
+            values = figures[sort][selected]
+            keys = -values if descending else values
+            # NaN (unknown cost) sorts last either way
+            order = selected[np.argsort(np.where(np.isnan(keys), np.inf, keys), kind="stable")].tolist()
+        page = order[offset:offset + limit]
+
+        count = len(self.product_ids)
+        return {
+            "total": len(order),
+            "products": self._product_rows(page, figures),
+            "modifiers": [self._modifier_row(index, count + index) for index in range(len(self.modifier_ids))],
+            "computed_at": self.computed_at,
+        }
+
+    def _product_rows(self, page: List[int], figures: Dict[str, np.ndarray]) -> List[dict]:
+        # Converted a column at a time; per-element NumPy scalar access would dominate the report
+        columns = {}
+        for name in ("price", "cost", "margin", "margin_pct", "modifier_revenue", "modifier_cost", "margin_with_modifiers"):
+            values = np.round(figures[name][page], 4)
+            columns[name] = [None if number != number else number for number in values.tolist()]
+        missing = self.missing[page].tolist()
+        is_sub_recipe = self.is_sub_recipe[page].tolist()
+        return [
+            {
+                "product_id": self.product_ids[row],
+                "name": self.product_names[row],
+                "category": self.categories[row],
+                "price": columns["price"][position],
+                "cost": columns["cost"][position],
+                "margin": columns["margin"][position],
+                "margin_pct": columns["margin_pct"][position],
+                "modifier_revenue": columns["modifier_revenue"][position] or 0.0,
+                "modifier_cost": columns["modifier_cost"][position],
+                "margin_with_modifiers": columns["margin_with_modifiers"][position],
+                "missing_costs": missing[position],
+                "is_sub_recipe": is_sub_recipe[position],
+                "error": self.errors.get(row),
+            }
+            for position, row in enumerate(page)
+        ]
+
+    def _modifier_row(self, index: int, owner: int) -> dict:
+        cost = self.costs[owner]
+        known = not np.isnan(cost)
+        return {
+            "modifier_id": self.modifier_ids[index],
+            "name": self.modifier_names[index],
+            "price": float(self.prices[owner]),
+            "cost": round(float(cost), 4) if known else None,
+            "margin": round(float(self.prices[owner] - cost), 4) if known else None,
+            "missing_costs": int(self.missing[owner]),
+            "error": self.errors.get(owner),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "stale": self.stale,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "products": len(self.product_ids),
+            "modifiers": len(self.modifier_ids),
+            "ingredients": len(self.ingredient_ids),
+            "bill_entries": int(len(self._rows)),
+            "broken_recipes": len(self.errors),
+            "expansions": self.expansions,
+            "memo_hits": self.memo_hits,
+            "cost_updates": self.cost_updates,
+            "owners_recomputed": self.owners_recomputed,
+        }
+
+
+async def load_costing(db: AsyncSession) -> None:
+    """(Re)build the engine: catalog, recipes and recent modifier usage"""
+    since = datetime.now() - timedelta(days=COSTING_MODIFIER_LOOKBACK_DAYS)
+    sold = (
+        select(OrderItem.product_id, func.sum(OrderItem.quantity))
+        .join(Order, Order.order_id == OrderItem.order_id)
+        # order_time on both sides lets Postgres prune old partitions
+        .where(Order.status != "cancelled", Order.order_time >= since, OrderItem.order_time >= since)
+        .group_by(OrderItem.product_id)
+    )
+    attached = (
+        select(OrderItem.product_id, OrderItemModifier.modifier_id, func.sum(OrderItem.quantity))
+        .join(OrderItemModifier, OrderItemModifier.item_id == OrderItem.item_id)
+        .join(Order, Order.order_id == OrderItem.order_id)
+        .where(Order.status != "cancelled", Order.order_time >= since, OrderItem.order_time >= since)
+        .group_by(OrderItem.product_id, OrderItemModifier.modifier_id)
+    )
+    costing_engine.load(
+        products=(await db.execute(
+            select(MenuProduct.product_id, MenuProduct.name, MenuProduct.category, MenuProduct.price)
+        )).all(),
+        modifiers=(await db.execute(
+            select(Modifier.modifier_id, Modifier.name, Modifier.additional_cost)
+        )).all(),
+        ingredients=(await db.execute(select(Ingredient.ingredient_id, Ingredient.cost_per_unit))).all(),
+        lines=(await db.execute(
+            select(ProductIngredient.product_id, ProductIngredient.ingredient_id, ProductIngredient.quantity_required)
+        )).all(),
+        components=(await db.execute(select(
+            RecipeComponent.product_id,
+            RecipeComponent.modifier_id,
+            RecipeComponent.sub_recipe_id,
+            RecipeComponent.ingredient_id,
+            RecipeComponent.quantity
+        ))).all(),
+        attachments=(await db.execute(attached)).all(),
+        units_sold=(await db.execute(sold)).all()
+    )
+    logger.info("Costing engine loaded: %s", costing_engine.stats())
+
+
+async def ensure_costing(db: AsyncSession) -> None:
+    """Load on first use, after recipe changes, or once the data is COSTING_REFRESH_SECONDS old"""
+    if (
+        not costing_engine.loaded
+        or costing_engine.stale
+        or (datetime.now() - costing_engine.loaded_at).total_seconds() > COSTING_REFRESH_SECONDS
+    ):
+        await load_costing(db)
+
+
+# Process-wide engine used by GET /menu/costing
+costing_engine = CostingEngine()
@@ -1,10 +1,17 @@
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 
 from ..schemas import Ingredient, InventoryTransaction
-from ..models.inventory import StockAdjustment
+from ..models.inventory import StockAdjustment, TransactionType
+from ..models.ingredient import IngredientUpdate
+from ..database import run_after_commit
+from .availability import availability_engine, ensure_availability, sync_availability
+from .costing import costing_engine
+from .menu_snapshot import menu_snapshot
 
 async def get_ingredient(db: AsyncSession, ingredient_id: UUID):
     result = await db.execute(select(Ingredient).where(Ingredient.ingredient_id == ingredient_id))
@@ -17,22 +24,82 @@ async def get_ingredients(db: AsyncSession, skip: int = 0, limit: int = 100):
 async def create_ingredient(db: AsyncSession, ingredient: dict):
     db_ingredient = Ingredient(**ingredient)
     db.add(db_ingredient)
-    await db.commit()
-    await db.refresh(db_ingredient)
+    await db.flush()
+    run_after_commit(db, availability_engine.invalidate)
     return db_ingredient
 
-async def adjust_stock(db: AsyncSession, adjustment: StockAdjustment):
-    ingredient = await get_ingredient(db, adjustment.ingredient_id)
-    if not ingredient:
+async def update_ingredient(db: AsyncSession, ingredient_id: UUID, ingredient: IngredientUpdate) -> Optional[Ingredient]:
+    """Update an ingredient's details"""
+    update_data = ingredient.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_ingredient(db, ingredient_id)
+
+    result = await db.execute(
+        update(Ingredient)
+        .where(Ingredient.ingredient_id == ingredient_id)
+        .values(**update_data)
+        .returning(Ingredient)
+        .execution_options(populate_existing=True)
+    )
+    db_ingredient = result.scalars().first()
+    if db_ingredient is None:
         return None
-    
-    if adjustment.transaction_type == "add":
-        ingredient.current_stock += adjustment.quantity
+
+    cost_per_unit = db_ingredient.cost_per_unit
+    def invalidate():
+        if "cost_per_unit" in update_data:
+            # Only the products and modifiers using this ingredient are re-costed
+            costing_engine.set_ingredient_cost(ingredient_id, cost_per_unit)
+        if update_data.keys() & {"name", "unit_of_measure"}:
+            # Shown in the menu's recipe lines and the availability report
+            menu_snapshot.invalidate()
+            availability_engine.invalidate()
+    run_after_commit(db, invalidate)
+    return db_ingredient
+
+async def adjust_stock(
+    db: AsyncSession,
+    ingredient_id: UUID,
+    adjustment: StockAdjustment,
+    staff_id: UUID
+) -> Optional[Ingredient]:
+    """
+    Add stock to an ingredient or take it out (used, spoiled, counted short).
+
+    Returns None if the ingredient doesn't exist, 422 for a quantity that
+    isn't positive.
+    """
+    if adjustment.quantity <= 0:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Quantity must be positive")
+    if adjustment.transaction_type == TransactionType.ADD:
+        delta = adjustment.quantity
     else:
-        ingredient.current_stock -= adjustment.quantity
+        delta = -adjustment.quantity
+    # Loaded from the stock as it was before this change; otherwise a dish switched off by
+    # hand would look switched off for lack of stock and come back on with the restock
+    await ensure_availability(db)
+
+    # Apply the delta in the database so concurrent adjustments don't overwrite each other
+    result = await db.execute(
+        update(Ingredient)
+        .where(Ingredient.ingredient_id == ingredient_id)
+        .values(current_stock=Ingredient.current_stock + delta)
+        .returning(Ingredient)
+        .execution_options(populate_existing=True)
+    )
+    ingredient = result.scalars().first()
+    if not ingredient:
+        return None
     
-    transaction = InventoryTransaction(**adjustment.dict())
-    db.add(transaction)
-    await db.commit()
-    await db.refresh(ingredient)
+    # Written by the request's single commit
+    db.add(InventoryTransaction(
+        ingredient_id=ingredient_id,
+        quantity=adjustment.quantity,
+        transaction_type=adjustment.transaction_type,
+        reference=adjustment.notes,
+        staff_id=staff_id
+    ))
+
+    # Products using this ingredient are recomputed, and switched off/on if they cross zero portions
+    await sync_availability(db, {ingredient.ingredient_id: ingredient.current_stock})
     return ingredient
\ No newline at end of file
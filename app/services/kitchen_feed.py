@@ -0,0 +1,122 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Optional, Set
+
+from ..utils.helpers import serialize_json
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per kitchen screen before it is considered frozen and disconnected
+KITCHEN_FEED_QUEUE_SIZE = int(os.getenv("KITCHEN_FEED_QUEUE_SIZE", "256"))
+KITCHEN_FEED_HEARTBEAT_SECONDS = float(os.getenv("KITCHEN_FEED_HEARTBEAT_SECONDS", "15"))
+
+ORDER_CREATED = "order.created"
+ORDER_ITEM_ADDED = "order.item_added"
+ORDER_ITEM_REMOVED = "order.item_removed"
+ORDER_ITEM_UPDATED = "order.item_updated"
+ORDER_STATUS_CHANGED = "order.status_changed"
+
+
+class KitchenSubscriber:
+    """One connected kitchen screen with its own bounded event queue"""
+
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.closed = asyncio.Event()
+        self.close_reason: Optional[str] = None
+
+    def offer(self, message: str) -> bool:
+        """Queue a message without waiting; False if the subscriber can't keep up"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self, reason: str) -> None:
+        self.close_reason = reason
+        self.closed.set()
+
+
+class KitchenFeed:
+    """
+    In-process pub/sub for kitchen order events.
+
+    Publishing never waits on a subscriber: each screen has a bounded queue and
+    a screen whose queue is full is disconnected (it reconnects and gets a fresh
+    snapshot), so one frozen tablet can't hold up fan-out to the others.
+    """
+
+    def __init__(self, max_queue: int = KITCHEN_FEED_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self._subscribers: Set[KitchenSubscriber] = set()
+        self.published = 0
+        self.delivered = 0
+        self.slow_disconnects = 0
+
+    def subscribe(self) -> KitchenSubscriber:
+        subscriber = KitchenSubscriber(self.max_queue)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: KitchenSubscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event_type: str, data: dict) -> None:
+        """Fan an event out to every subscriber; serialized once for all of them"""
+        message = format_sse(event_type, serialize_json({"type": event_type, "data": data}))
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            if subscriber.offer(message):
+                self.delivered += 1
+                continue
+            self._subscribers.discard(subscriber)
+            subscriber.close("slow consumer")
+            self.slow_disconnects += 1
+            logger.warning("Disconnected slow kitchen feed subscriber (%d queued events)", subscriber.queue.qsize())
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "queue_size": self.max_queue,
+            "published": self.published,
+            "delivered": self.delivered,
+            "slow_disconnects": self.slow_disconnects,
+            "max_backlog": max((s.queue.qsize() for s in self._subscribers), default=0),
+        }
+
+
+def format_sse(event_type: str, data: str) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event_type}\ndata: {data}\n\n"
+
+
+async def stream_events(subscriber: KitchenSubscriber, snapshot: str, feed: "KitchenFeed"):
+    """SSE body: the snapshot, then live events until the client leaves or falls behind"""
+    try:
+        yield format_sse("snapshot", snapshot)
+        while True:
+            get_message = asyncio.ensure_future(subscriber.queue.get())
+            closed = asyncio.ensure_future(subscriber.closed.wait())
+            done, _ = await asyncio.wait(
+                {get_message, closed},
+                timeout=KITCHEN_FEED_HEARTBEAT_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            closed.cancel()
+            if get_message in done:
+                yield get_message.result()
+                continue
+            get_message.cancel()
+            if subscriber.closed.is_set():
+                yield format_sse("disconnect", json.dumps({"reason": subscriber.close_reason}))
+                return
+            yield ": keep-alive\n\n"
+    finally:
+        feed.unsubscribe(subscriber)
+
+
+# Process-wide feed used by order_service and the orders router
+kitchen_feed = KitchenFeed()
@@ -0,0 +1,296 @@
+import os
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..schemas import Order, OrderItem, MenuProduct
+from ..models.order import OrderStatus
+from ..utils.helpers import calculate_estimated_wait_time
+from .partitioning import active_since
+
+logger = logging.getLogger(__name__)
+
+KITCHEN_QUEUE_RECONCILE_SECONDS = float(os.getenv("KITCHEN_QUEUE_RECONCILE_SECONDS", "60"))
+
+KITCHEN_STATUSES = (OrderStatus.PENDING, OrderStatus.PREPARING)
+
+
+class KitchenTicket:
+    """An order waiting on the kitchen, with the item data its prep estimate depends on"""
+
+    __slots__ = ("order_id", "order_time", "status", "items", "estimated_minutes")
+
+    def __init__(self, order_id: UUID, order_time: datetime, status: OrderStatus, items: Optional[List[dict]] = None):
+        self.order_id = order_id
+        self.order_time = order_time
+        self.status = OrderStatus(status)
+        self.items = list(items or [])
+        self.estimated_minutes = calculate_estimated_wait_time(self.items)
+
+    @property
+    def sort_key(self) -> Tuple[datetime, int, str]:
+        return (self.order_time, self.estimated_minutes, str(self.order_id))
+
+    def as_dict(self) -> dict:
+        return {
+            "order_id": self.order_id,
+            "order_time": self.order_time,
+            "status": self.status,
+            "item_count": len(self.items),
+            "estimated_minutes": self.estimated_minutes,
+        }
+
+
+class KitchenQueue:
+    """
+    Pending/preparing orders kept sorted by (order_time, estimated prep time).
+
+    Loaded once at startup and then maintained from committed order writes, so
+    reading the first k tickets is a slice instead of a query. Writes made by
+    other processes are only picked up by `reconcile`, which runs periodically
+    and reports what it had to correct.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self._keys: List[Tuple[datetime, int, str]] = []
+        self._tickets: Dict[UUID, KitchenTicket] = {}
+        self._preparation_times: Dict[UUID, int] = {}
+        # Mutation counter, and the last mutation per order; lets reconcile skip
+        # orders that changed while it was reading the database
+        self._version = 0
+        self._touched: Dict[UUID, int] = {}
+        self.last_reconciled_at: Optional[datetime] = None
+        self.last_drift: Optional[dict] = None
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def load(self, tickets: Iterable[KitchenTicket], preparation_times: Optional[Dict[UUID, int]] = None) -> None:
+        """Replace the whole queue"""
+        self._tickets = {ticket.order_id: ticket for ticket in tickets}
+        self._keys = sorted(ticket.sort_key for ticket in self._tickets.values())
+        if preparation_times is not None:
+            self._preparation_times = dict(preparation_times)
+        self._touched.clear()
+        self.loaded = True
+
+    def preparation_time(self, product_id: UUID) -> Optional[int]:
+        return self._preparation_times.get(product_id)
+
+    def remember_preparation_times(self, preparation_times: Dict[UUID, int]) -> None:
+        self._preparation_times.update(preparation_times)
+
+    def forget_preparation_time(self, product_id: UUID) -> None:
+        """Drop a cached prep time after a menu product changes"""
+        self._preparation_times.pop(product_id, None)
+
+    def upsert(self, ticket: KitchenTicket) -> None:
+        """Insert or replace a ticket, keeping the order sorted"""
+        self._discard(ticket.order_id)
+        self._tickets[ticket.order_id] = ticket
+        insort(self._keys, ticket.sort_key)
+        self._touch(ticket.order_id)
+
+    def remove(self, order_id: UUID) -> None:
+        self._discard(order_id)
+        self._touch(order_id)
+
+    def set_status(self, order_id: UUID, status: OrderStatus, order_time: datetime, items: List[dict]) -> None:
+        """Apply a status transition; orders leaving the kitchen drop out of the queue"""
+        if status not in KITCHEN_STATUSES:
+            self.remove(order_id)
+            return
+        ticket = self._tickets.get(order_id)
+        if ticket is None:
+            self.upsert(KitchenTicket(order_id, order_time, status, items))
+        else:
+            # Status doesn't affect the sort key
+            ticket.status = OrderStatus(status)
+            self._touch(order_id)
+
+    def add_item(self, order_id: UUID, item: dict) -> None:
+        """Account for an item added to a queued order"""
+        ticket = self._tickets.get(order_id)
+        if ticket is None:
+            return
+        self.upsert(KitchenTicket(order_id, ticket.order_time, ticket.status, ticket.items + [item]))
+
+    def remove_item(self, order_id: UUID, product_id: UUID, quantity: int) -> None:
+        """Account for an item taken off a queued order"""
+        ticket = self._tickets.get(order_id)
+        if ticket is None:
+            return
+        items = list(ticket.items)
+        for index, item in enumerate(items):
+            if item["product_id"] == product_id and item["quantity"] == quantity:
+                del items[index]
+                break
+        self.upsert(KitchenTicket(order_id, ticket.order_time, ticket.status, items))
+
+    def item_changed(self, order_id: UUID) -> None:
+        """An item of a queued order changed without affecting its estimate (a modifier added)"""
+        if order_id in self._tickets:
+            self._touch(order_id)
+
+    def top(self, k: Optional[int] = None) -> List[KitchenTicket]:
+        """The first k tickets in kitchen order"""
+        keys = self._keys if k is None else self._keys[:k]
+        return [self._tickets[UUID(key[2])] for key in keys]
+
+    def order_ids(self, k: Optional[int] = None) -> List[UUID]:
+        keys = self._keys if k is None else self._keys[:k]
+        return [UUID(key[2]) for key in keys]
+
+    def reconcile(self, tickets: Iterable[KitchenTicket], since_version: int) -> dict:
+        """
+        Compare against tickets freshly read from the database and repair drift.
+
+        Orders mutated locally after `since_version` are left alone: the local
+        change is newer than what the database read could have seen.
+        """
+        expected = {ticket.order_id: ticket for ticket in tickets}
+        missing, stale, changed = [], [], []
+
+        for order_id, ticket in expected.items():
+            if self._touched.get(order_id, 0) > since_version:
+                continue
+            current = self._tickets.get(order_id)
+            if current is None:
+                missing.append(order_id)
+                self._put(ticket)
+            elif current.sort_key != ticket.sort_key or current.status != ticket.status:
+                changed.append(order_id)
+                self._put(ticket)
+
+        for order_id in list(self._tickets):
+            if order_id not in expected and self._touched.get(order_id, 0) <= since_version:
+                stale.append(order_id)
+                self._discard(order_id)
+
+        self._touched = {order_id: v for order_id, v in self._touched.items() if v > since_version}
+        self.last_reconciled_at = datetime.now(timezone.utc)
+        self.last_drift = {
+            "checked_at": self.last_reconciled_at,
+            "size": len(self._tickets),
+            "missing": [str(order_id) for order_id in missing],
+            "stale": [str(order_id) for order_id in stale],
+            "changed": [str(order_id) for order_id in changed],
+            "drift": len(missing) + len(stale) + len(changed),
+        }
+        return self.last_drift
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "size": len(self._tickets),
+            "known_products": len(self._preparation_times),
+            "reconcile_interval_seconds": KITCHEN_QUEUE_RECONCILE_SECONDS,
+            "last_reconciled_at": self.last_reconciled_at,
+            "last_drift": self.last_drift,
+        }
+
+    def _put(self, ticket: KitchenTicket) -> None:
+        self._discard(ticket.order_id)
+        self._tickets[ticket.order_id] = ticket
+        insort(self._keys, ticket.sort_key)
+
+    def _discard(self, order_id: UUID) -> None:
+        ticket = self._tickets.pop(order_id, None)
+        if ticket is None:
+            return
+        index = bisect_left(self._keys, ticket.sort_key)
+        del self._keys[index]
+
+    def _touch(self, order_id: UUID) -> None:
+        self._version += 1
+        self._touched[order_id] = self._version
+
+
+async def fetch_preparation_times(db: AsyncSession, product_ids: Iterable[UUID]) -> Dict[UUID, int]:
+    """Prep times for the given products, from the queue's cache or one IN query for the rest"""
+    product_ids = set(product_ids)
+    known = {pid: kitchen_queue.preparation_time(pid) for pid in product_ids}
+    unknown = [pid for pid, minutes in known.items() if minutes is None]
+    if unknown:
+        result = await db.execute(
+            select(MenuProduct.product_id, MenuProduct.preparation_time)
+            .where(MenuProduct.product_id.in_(unknown))
+        )
+        fetched = {pid: minutes or 0 for pid, minutes in result.all()}
+        kitchen_queue.remember_preparation_times(fetched)
+        known.update(fetched)
+    return {pid: minutes or 0 for pid, minutes in known.items()}
+
+
+async def read_kitchen_tickets(db: AsyncSession) -> Tuple[List[KitchenTicket], Dict[UUID, int]]:
+    """Kitchen tickets straight from the database (two queries: orders, then their items)"""
+    since = active_since()
+    orders = (await db.execute(
+        select(Order.order_id, Order.order_time, Order.status)
+        .where(Order.status.in_(KITCHEN_STATUSES), Order.order_time >= since)
+    )).all()
+    items: Dict[UUID, List[dict]] = {order.order_id: [] for order in orders}
+    preparation_times: Dict[UUID, int] = {}
+    if items:
+        rows = await db.execute(
+            select(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity, MenuProduct.preparation_time)
+            .join(MenuProduct, MenuProduct.product_id == OrderItem.product_id)
+            .where(OrderItem.order_id.in_(list(items)), OrderItem.order_time >= since)
+        )
+        for order_id, product_id, quantity, minutes in rows.all():
+            preparation_times[product_id] = minutes or 0
+            items[order_id].append(
+                {"product_id": product_id, "quantity": quantity, "preparation_time": minutes or 0}
+            )
+    tickets = [
+        KitchenTicket(order.order_id, order.order_time, order.status, items[order.order_id])
+        for order in orders
+    ]
+    return tickets, preparation_times
+
+
+async def load_kitchen_queue(db: AsyncSession) -> None:
+    tickets, preparation_times = await read_kitchen_tickets(db)
+    kitchen_queue.load(tickets, preparation_times)
+    logger.info("Kitchen queue loaded with %d tickets", len(kitchen_queue))
+
+
+async def reconcile_kitchen_queue(db: AsyncSession) -> dict:
+    since_version = kitchen_queue.version
+    tickets, preparation_times = await read_kitchen_tickets(db)
+    kitchen_queue.remember_preparation_times(preparation_times)
+    report = kitchen_queue.reconcile(tickets, since_version)
+    if report["drift"]:
+        logger.warning(
+            "Kitchen queue drift corrected: %d missing, %d stale, %d changed",
+            len(report["missing"]), len(report["stale"]), len(report["changed"])
+        )
+    return report
+
+
+async def run_reconciliation(session_factory, interval: float = KITCHEN_QUEUE_RECONCILE_SECONDS) -> None:
+    """Background loop: reconcile the queue against the database every `interval` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                await reconcile_kitchen_queue(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Kitchen queue reconciliation failed")
+
+
+# Process-wide queue maintained by order_service
+kitchen_queue = KitchenQueue()
@@ -0,0 +1,267 @@
+import os
+import io
+import csv
+import json
+import logging
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import func, insert, or_
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..schemas import Ingredient, MenuProduct, Modifier, ProductIngredient
+from ..models.menu import MenuImportError, MenuImportResult, MenuProductCreate
+from ..models.modifier import ModifierCreate
+from ..utils.ids import uuid7
+from ..database import run_after_commit
+from .availability import availability_engine
+from .costing import costing_engine
+from .menu_search import menu_search
+from .menu_snapshot import menu_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Rows validated and inserted per batch (one savepoint, three executemany statements)
+MENU_IMPORT_CHUNK_SIZE = int(os.getenv("MENU_IMPORT_CHUNK_SIZE", "200"))
+
+PRODUCT_FIELDS = [name for name in MenuProductCreate.model_fields if name != "ingredients"]
+
+
+class ImportRow:
+    """One validated row of an import file, ready to insert"""
+
+    __slots__ = ("row", "name", "kind", "values", "recipe")
+
+    def __init__(self, row: int, name: Optional[str], kind: str, values: dict, recipe: List[Tuple[str, float]]):
+        self.row = row
+        self.name = name
+        self.kind = kind
+        self.values = values
+        self.recipe = recipe
+
+
+def read_rows(upload: UploadFile) -> Iterator[dict]:
+    """
+    Rows of an uploaded menu file, read lazily.
+
+    - .csv: one row per product or modifier; a `type` column says which
+      (default product) and `ingredients` lists the recipe as
+      "Tomato:0.2; Mozzarella:0.125" (ingredient names or ids)
+    - .ndjson / .jsonl: one JSON object per line, same keys
+    - .json: a list of such objects, or {"modifiers": [...], "products": [...]}
+    """
+    filename = (upload.filename or "").lower()
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if filename.endswith(".csv") or upload.content_type == "text/csv":
+        for record in csv.DictReader(text):
+            # Empty cells fall back to the field defaults
+            yield {key.strip(): value.strip() for key, value in record.items()
+                   if key and value is not None and value.strip() != ""}
+        return
+    if filename.endswith((".ndjson", ".jsonl")):
+        for line in text:
+            if line.strip():
+                yield _parse_json(line)
+        return
+
+    document = _parse_json(text.read())
+    if isinstance(document, dict):
+        for kind in ("modifiers", "products"):
+            for record in document.get(kind) or []:
+                yield {"type": kind[:-1], **record} if isinstance(record, dict) else record
+    elif isinstance(document, list):
+        yield from document
+    else:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a list of rows or an object with modifiers and products")
+
+
+def _parse_json(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON: {exc}")
+
+
+def _recipe_refs(value) -> List[Tuple[str, float]]:
+    """(ingredient id or name, quantity) pairs from a CSV cell or a JSON list"""
+    if value in (None, ""):
+        return []
+    if isinstance(value, str):
+        value = [part for part in value.split(";") if part.strip()]
+    refs = []
+    for line in value:
+        if isinstance(line, dict):
+            ref = line.get("ingredient_id") or line.get("ingredient")
+            quantity = line.get("quantity_required", line.get("quantity"))
+        else:
+            ref, _, quantity = str(line).rpartition(":")
+            if not ref:
+                ref, quantity = quantity, None
+        if not ref or quantity in (None, ""):
+            raise ValueError(f"Recipe line {line!r} needs an ingredient and a quantity")
+        refs.append((str(ref).strip(), float(quantity)))
+    return refs
+
+
+def _validate(number: int, record) -> ImportRow:
+    if not isinstance(record, dict):
+        raise ValueError("Row must be an object")
+    kind = str(record.get("type") or "product").lower()
+    name = _row_name(record)
+    if kind == "modifier":
+        modifier = ModifierCreate.model_validate(record)
+        return ImportRow(number, name, kind, modifier.model_dump(), [])
+    if kind != "product":
+        raise ValueError(f"Unknown row type {kind!r}")
+    product = MenuProductCreate.model_validate({key: record[key] for key in PRODUCT_FIELDS if key in record})
+    return ImportRow(number, name, kind, product.model_dump(exclude={"ingredients"}), _recipe_refs(record.get("ingredients")))
+
+
+def _row_name(record: dict) -> Optional[str]:
+    name = record.get("name")
+    return None if name is None else str(name)
+
+
+def _error_detail(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+        )
+    if isinstance(exc, DBAPIError):
+        return str(exc.orig).splitlines()[0] if exc.orig else "Database error"
+    return str(exc)
+
+
+async def _resolve_ingredients(db: AsyncSession, rows: List[ImportRow], known: Dict[str, UUID]) -> None:
+    """Fill `known` (lowercased name or id -> ingredient_id) for every recipe ref in the chunk, in one query"""
+    missing = {ref.lower() for row in rows for ref, _ in row.recipe} - known.keys()
+    if not missing:
+        return
+    ids = []
+    for ref in missing:
+        try:
+            ids.append(UUID(ref))
+        except ValueError:
+            pass
+    result = await db.execute(
+        select(Ingredient.ingredient_id, Ingredient.name)
+        .where(or_(Ingredient.ingredient_id.in_(ids), func.lower(Ingredient.name).in_(list(missing))))
+    )
+    for ingredient_id, name in result:
+        known[str(ingredient_id)] = ingredient_id
+        known[name.lower()] = ingredient_id
+
+
+async def _insert(db: AsyncSession, rows: List[ImportRow], known: Dict[str, UUID], created: List[dict]) -> Tuple[int, int, int]:
+    products, recipe_lines, modifiers = [], [], []
+    for row in rows:
+        if row.kind == "modifier":
+            modifiers.append(row.values)
+            continue
+        product_id = uuid7()
+        products.append({"product_id": product_id, **row.values})
+        recipe_lines.extend(
+            {"product_id": product_id, "ingredient_id": known[ref.lower()], "quantity_required": quantity}
+            for ref, quantity in row.recipe
+        )
+    if modifiers:
+        await db.execute(insert(Modifier), modifiers)
+    if products:
+        await db.execute(insert(MenuProduct), products)
+    if recipe_lines:
+        await db.execute(insert(ProductIngredient), recipe_lines)
+    created.extend(products)
+    return len(products), len(recipe_lines), len(modifiers)
+
+
+async def _import_chunk(
+    db: AsyncSession,
+    chunk: List[Tuple[int, object]],
+    result: MenuImportResult,
+    known: Dict[str, UUID],
+    created: List[dict]
+) -> None:
+    valid = []
+    for number, record in chunk:
+        try:
+            valid.append(_validate(number, record))
+        except (ValidationError, ValueError, TypeError) as exc:
+            name = _row_name(record) if isinstance(record, dict) else None
+            result.errors.append(MenuImportError(row=number, name=name, detail=_error_detail(exc)))
+
+    await _resolve_ingredients(db, valid, known)
+    ready = []
+    for row in valid:
+        unknown = [ref for ref, _ in row.recipe if ref.lower() not in known]
+        if unknown:
+            result.errors.append(MenuImportError(row=row.row, name=row.name, detail=f"Unknown ingredients: {', '.join(unknown)}"))
+        else:
+            ready.append(row)
+    if not ready:
+        return
+
+    try:
+        async with db.begin_nested():
+            counts = await _insert(db, ready, known, created)
+        _count(result, counts)
+        return
+    except DBAPIError:
+        pass
+
+    # Something in the chunk was rejected (e.g. a duplicate product code): retry row by row to report it
+    for row in ready:
+        try:
+            async with db.begin_nested():
+                counts = await _insert(db, [row], known, created)
+            _count(result, counts)
+        except DBAPIError as exc:
+            result.errors.append(MenuImportError(row=row.row, name=row.name, detail=_error_detail(exc)))
+
+
+def _count(result: MenuImportResult, counts: Tuple[int, int, int]) -> None:
+    products, recipe_lines, modifiers = counts
+    result.products_created += products
+    result.recipe_lines_created += recipe_lines
+    result.modifiers_created += modifiers
+
+
+def _chunks(rows: Iterable, size: int) -> Iterator[List[Tuple[int, object]]]:
+    numbered = enumerate(rows, start=1)
+    while True:
+        chunk = list(islice(numbered, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def import_menu(db: AsyncSession, upload: UploadFile, chunk_size: int = MENU_IMPORT_CHUNK_SIZE) -> MenuImportResult:
+    """
+    Load products (with recipes) and modifiers from an uploaded file.
+
+    Rows are read and inserted chunk by chunk, each chunk in its own
+    savepoint of the request transaction. Invalid rows are reported and
+    skipped; the rest are committed together by the request.
+    """
+    result = MenuImportResult()
+    known: Dict[str, UUID] = {}
+    created: List[dict] = []
+    for chunk in _chunks(read_rows(upload), chunk_size):
+        result.rows += len(chunk)
+        await _import_chunk(db, chunk, result, known, created)
+    if created or result.modifiers_created:
+        def publish():
+            menu_search.upsert_many(created)
+            menu_snapshot.invalidate()
+            availability_engine.invalidate()
+            costing_engine.invalidate()
+        run_after_commit(db, publish)
+    logger.info(
+        "Menu import: %d rows, %d products, %d recipe lines, %d modifiers, %d errors",
+        result.rows, result.products_created, result.recipe_lines_created, result.modifiers_created, len(result.errors)
+    )
+    return result
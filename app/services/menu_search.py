@@ -0,0 +1,321 @@
+import os
+import re
+import bisect
+import heapq
+import logging
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy.future import select
+
+from ..schemas import MenuProduct
+
+logger = logging.getLogger(__name__)
+
+# Score multiplier for products that can be ordered right now
+SEARCH_AVAILABLE_BOOST = float(os.getenv("SEARCH_AVAILABLE_BOOST", "2.0"))
+# Minimum trigram similarity (Dice) for a typo-tolerant match
+SEARCH_FUZZY_THRESHOLD = float(os.getenv("SEARCH_FUZZY_THRESHOLD", "0.5"))
+# Recent results kept per query; short autocomplete prefixes ("p", "pi") repeat constantly
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+
+# Weight of a term by the field it came from; a term in several fields keeps the highest
+FIELD_WEIGHTS = {"name": 3.0, "product_code": 3.0, "category": 2.0, "description": 1.0}
+# How much each kind of match of a query token is worth
+EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.6
+
+# Product attributes the index needs
+SEARCH_FIELDS = ("product_id", "name", "description", "product_code", "category", "price", "is_available")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased, accent-free alphanumeric tokens ("Crème brûlée" -> ["creme", "brulee"])"""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().lower()
+    return _TOKEN.findall(text)
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchDoc(NamedTuple):
+    product_id: UUID
+    name: str
+    category: Optional[str]
+    product_code: Optional[str]
+    price: float
+    is_available: bool
+    terms: Dict[str, float]  # term -> field weight
+
+
+class SearchHit(NamedTuple):
+    product_id: UUID
+    name: str
+    category: Optional[str]
+    product_code: Optional[str]
+    price: float
+    is_available: bool
+    score: float
+
+
+def _category_value(category) -> Optional[str]:
+    return getattr(category, "value", category)
+
+
+def search_fields(product) -> dict:
+    """Copy of what the index needs from a product, safe to use after its session is gone"""
+    return {field: getattr(product, field, None) for field in SEARCH_FIELDS}
+
+
+def make_doc(product) -> SearchDoc:
+    """Index entry for a MenuProduct row or a dict with the same keys"""
+    get = product.get if isinstance(product, dict) else lambda key: getattr(product, key, None)
+    terms: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = get(field)
+        if field == "category":
+            value = _category_value(value)
+        for term in tokenize(value):
+            if weight > terms.get(term, 0):
+                terms[term] = weight
+    return SearchDoc(
+        product_id=get("product_id"),
+        name=get("name"),
+        category=_category_value(get("category")),
+        product_code=get("product_code"),
+        price=float(get("price") or 0),
+        is_available=bool(get("is_available")),
+        terms=terms
+    )
+
+
+class MenuSearchIndex:
+    """
+    In-process inverted index over menu products.
+
+    - postings: term -> {product_id: field weight}
+    - a sorted term list, so a prefix is a bisect plus a short scan
+    - trigram -> terms, for typo-tolerant matches of query tokens
+
+    Products are added, replaced or dropped one at a time (after the write
+    commits); only the terms of that product are touched. Any change clears
+    the small cache of recent results.
+    """
+
+    def __init__(self, cache_size: int = SEARCH_CACHE_SIZE):
+        self._docs: Dict[UUID, SearchDoc] = {}
+        self._postings: Dict[str, Dict[UUID, float]] = {}
+        self._terms: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._cache: "OrderedDict[tuple, List[SearchHit]]" = OrderedDict()
+        self.cache_size = cache_size
+        self.loaded = False
+        self.updates = 0
+        self.queries = 0
+        self.cache_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def load(self, products: Iterable) -> None:
+        self._docs, self._postings, self._terms = {}, {}, []
+        self._trigrams = defaultdict(set)
+        self._cache.clear()
+        for product in products:
+            self._add(make_doc(product))
+        self.loaded = True
+
+    def upsert(self, product) -> None:
+        doc = make_doc(product)
+        self._drop(doc.product_id)
+        self._add(doc)
+        self.updates += 1
+
+    def upsert_many(self, products: Iterable) -> None:
+        for product in products:
+            self.upsert(product)
+
+    def remove(self, product_id: UUID) -> None:
+        self._drop(product_id)
+        self.updates += 1
+
+    def _add(self, doc: SearchDoc) -> None:
+        self._cache.clear()
+        self._docs[doc.product_id] = doc
+        for term, weight in doc.terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+                for gram in trigrams(term):
+                    self._trigrams[gram].add(term)
+            postings[doc.product_id] = weight
+
+    def _drop(self, product_id: UUID) -> None:
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        self._cache.clear()
+        for term in doc.terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if postings:
+                continue
+            # Last product using the term: forget the term itself
+            del self._postings[term]
+            del self._terms[bisect.bisect_left(self._terms, term)]
+            for gram in trigrams(term):
+                terms = self._trigrams.get(gram)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._trigrams[gram]
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\x7f")
+        return self._terms[start:end]
+
+    def _fuzzy_terms(self, token: str) -> List[Tuple[str, float]]:
+        grams = trigrams(token)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] += 1
+        matches = []
+        for term, count in shared.items():
+            similarity = 2 * count / (len(grams) + len(term) + 1)  # Dice; a term has len + 1 trigrams
+            if similarity >= SEARCH_FUZZY_THRESHOLD:
+                matches.append((term, similarity))
+        return matches
+
+    def _token_terms(self, token: str, fuzzy: bool) -> Dict[str, float]:
+        """Index terms a query token matches, with the quality of each match"""
+        candidates: Dict[str, float] = {}
+        for term in self._prefix_terms(token):
+            candidates[term] = EXACT if term == token else PREFIX
+        # Typo tolerance only kicks in when the token isn't the start of any known term
+        if not candidates and fuzzy and len(token) >= 3:
+            for term, similarity in self._fuzzy_terms(token):
+                candidates[term] = FUZZY * similarity
+        return candidates
+
+    def _scores(self, candidates: Dict[str, float]) -> Dict[UUID, float]:
+        """Best score of each product matching any of the candidate terms"""
+        scores: Dict[UUID, float] = {}
+        for term, quality in candidates.items():
+            postings = self._postings[term]
+            if not scores:
+                scores = {product_id: quality * weight for product_id, weight in postings.items()}
+                continue
+            for product_id, weight in postings.items():
+                score = quality * weight
+                if score > scores.get(product_id, 0):
+                    scores[product_id] = score
+        return scores
+
+    def search(self, query: str, limit: int = 10, available_only: bool = False, fuzzy: bool = True) -> List[SearchHit]:
+        """
+        Products matching every token of `query`, best first.
+
+        Each token matches whole terms or prefixes (autocomplete); a token of
+        three letters or more that matches nothing falls back to close
+        misspellings. Available products are boosted.
+        """
+        self.queries += 1
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        key = (tuple(tokens), limit, available_only, fuzzy)
+        hits = self._cache.get(key)
+        if hits is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return hits
+        hits = self._rank(tokens, limit, available_only, fuzzy)
+        self._cache[key] = hits
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return hits
+
+    def _rank(self, tokens: List[str], limit: int, available_only: bool, fuzzy: bool) -> List[SearchHit]:
+        matches = []
+        for token in set(tokens):
+            candidates = self._token_terms(token, fuzzy)
+            if not candidates:
+                return []
+            matches.append((sum(len(self._postings[term]) for term in candidates), candidates))
+        # Most selective token first; the others only need checking against its products
+        matches.sort(key=lambda match: match[0])
+
+        totals = self._scores(matches[0][1])
+        for postings_count, candidates in matches[1:]:
+            if len(totals) * len(candidates) < postings_count:
+                totals = self._narrow(totals, candidates)
+            else:
+                scores = self._scores(candidates)
+                totals = {product_id: total + scores[product_id]
+                          for product_id, total in totals.items() if product_id in scores}
+            if not totals:
+                return []
+
+        ranked = []
+        for product_id, score in totals.items():
+            doc = self._docs[product_id]
+            if doc.is_available:
+                score *= SEARCH_AVAILABLE_BOOST
+            elif available_only:
+                continue
+            ranked.append((-score, doc.name or "", product_id))
+        return [
+            SearchHit(doc.product_id, doc.name, doc.category, doc.product_code, doc.price, doc.is_available, round(-score, 3))
+            for score, _, product_id in heapq.nsmallest(limit, ranked)
+            for doc in (self._docs[product_id],)
+        ]
+
+    def _narrow(self, totals: Dict[UUID, float], candidates: Dict[str, float]) -> Dict[UUID, float]:
+        """Add a token's best score to each product in `totals` that it matches; drop the rest"""
+        postings = [(self._postings[term], quality) for term, quality in candidates.items()]
+        narrowed = {}
+        for product_id, total in totals.items():
+            best = 0.0
+            for term_postings, quality in postings:
+                weight = term_postings.get(product_id)
+                if weight is not None and quality * weight > best:
+                    best = quality * weight
+            if best:
+                narrowed[product_id] = total + best
+        return narrowed
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "products": len(self._docs),
+            "terms": len(self._terms),
+            "trigrams": len(self._trigrams),
+            "updates": self.updates,
+            "queries": self.queries,
+            "cache_hits": self.cache_hits,
+            "cached_queries": len(self._cache),
+        }
+
+
+async def load_menu_search(db) -> int:
+    """(Re)build the index from the products table"""
+    result = await db.execute(select(*(getattr(MenuProduct, field) for field in SEARCH_FIELDS)))
+    menu_search.load(row._asdict() for row in result)
+    logger.info("Menu search index loaded with %d products", len(menu_search))
+    return len(menu_search)
+
+
+# Process-wide index used by GET /menu/search
+menu_search = MenuSearchIndex()
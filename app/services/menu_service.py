@@ -1,10 +1,49 @@
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, insert, delete
 from uuid import UUID
-from typing import List
+from typing import List, Optional, Union
 
-from ..schemas import MenuProduct, ProductIngredient
-from ..models.menu import MenuProductCreate
+from ..schemas import Ingredient, MenuProduct, Modifier, ProductIngredient
+from ..models.menu import MenuProductCreate, MenuProductUpdate, ProductIngredientCreate, RecipeComponentsUpdate
+from ..models.modifier import ModifierUpdate
+from ..models.recipe import RecipeComponent
+from ..database import run_after_commit
+from .pricing import price_cache
+from .kitchen_queue import kitchen_queue
+from .availability import availability_engine
+from .costing import costing_engine, ensure_costing
+from .menu_search import menu_search, search_fields
+from .menu_snapshot import menu_snapshot
+
+def _invalidate_menu(db: AsyncSession) -> None:
+    # The menu snapshot and the recipe matrices are rebuilt once the write is committed
+    def invalidate():
+        menu_snapshot.invalidate()
+        availability_engine.invalidate()
+        costing_engine.invalidate()
+    run_after_commit(db, invalidate)
+
+def _invalidate_product(db: AsyncSession, db_product: MenuProduct, availability_set: bool = False) -> None:
+    # Cached prices/prep times are dropped once the new values are committed
+    product_id = db_product.product_id
+    fields = search_fields(db_product)
+    def invalidate():
+        price_cache.invalidate_product(product_id)
+        kitchen_queue.forget_preparation_time(product_id)
+        menu_search.upsert(fields)
+        menu_snapshot.invalidate()
+        costing_engine.update_product(fields)
+        if availability_set:
+            # Set by hand: no longer switched back on automatically
+            availability_engine.set_available(product_id, fields["is_available"])
+    run_after_commit(db, invalidate)
+
+def _index_product(db: AsyncSession, db_product: MenuProduct) -> None:
+    # Only this product's search terms are updated, after the commit
+    fields = search_fields(db_product)
+    run_after_commit(db, lambda: menu_search.upsert(fields))
 
 async def get_product(db: AsyncSession, product_id: UUID):
     result = await db.execute(select(MenuProduct).where(MenuProduct.product_id == product_id))
@@ -14,18 +53,72 @@ async def get_products(db: AsyncSession, skip: int = 0, limit: int = 100):
     result = await db.execute(select(MenuProduct).offset(skip).limit(limit))
     return result.scalars().all()
 
+def recipe_rows(product_id: UUID, ingredients: List[Union[ProductIngredientCreate, UUID]]) -> List[dict]:
+    """ProductIngredient rows for a product's recipe lines"""
+    rows = []
+    for line in ingredients:
+        if isinstance(line, UUID):
+            line = ProductIngredientCreate(ingredient_id=line, quantity_required=0)
+        rows.append({
+            "product_id": product_id,
+            "ingredient_id": line.ingredient_id,
+            "quantity_required": line.quantity_required
+        })
+    return rows
+
 async def create_product(db: AsyncSession, product: MenuProductCreate):
-    db_product = MenuProduct(**product.dict(exclude={"ingredients"}))
+    db_product = MenuProduct(**product.model_dump(exclude={"ingredients"}))
     db.add(db_product)
-    await db.commit()
-    await db.refresh(db_product)
+    await db.flush()
     
     if product.ingredients:
-        for ingredient_id in product.ingredients:
-            await add_product_ingredient(db, db_product.product_id, ingredient_id, 0)  # Default quantity
+        # All recipe lines in one executemany, in the same transaction as the product
+        await add_product_ingredients(db, recipe_rows(db_product.product_id, product.ingredients))
     
+    _index_product(db, db_product)
+    _invalidate_menu(db)
+    return db_product
+
+async def update_product(db: AsyncSession, product_id: UUID, product: MenuProductUpdate) -> Optional[MenuProduct]:
+    """Update a menu product"""
+    update_data = product.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_product(db, product_id)
+
+    result = await db.execute(
+        update(MenuProduct)
+        .where(MenuProduct.product_id == product_id)
+        .values(**update_data)
+        .returning(MenuProduct)
+        .execution_options(populate_existing=True)
+    )
+    db_product = result.scalars().first()
+    if db_product is not None:
+        _invalidate_product(db, db_product, availability_set="is_available" in update_data)
     return db_product
 
+async def update_modifier(db: AsyncSession, modifier_id: UUID, modifier: ModifierUpdate) -> Optional[Modifier]:
+    """Rename or reprice a modifier; lines already ordered keep the price they were charged"""
+    update_data = modifier.model_dump(exclude_unset=True)
+    if not update_data:
+        return await db.get(Modifier, modifier_id)
+
+    result = await db.execute(
+        update(Modifier)
+        .where(Modifier.modifier_id == modifier_id)
+        .values(**update_data)
+        .returning(Modifier)
+        .execution_options(populate_existing=True)
+    )
+    db_modifier = result.scalars().first()
+    if db_modifier is not None:
+        def invalidate():
+            # New orders are priced from the database once the change is committed
+            price_cache.invalidate_modifier(modifier_id)
+            costing_engine.invalidate()
+        run_after_commit(db, invalidate)
+    return db_modifier
+
 async def add_product_ingredient(db: AsyncSession, product_id: UUID, ingredient_id: UUID, quantity: float):
     db_ingredient = ProductIngredient(
         product_id=product_id,
@@ -33,6 +126,68 @@ async def add_product_ingredient(db: AsyncSession, product_id: UUID, ingredient_
         quantity_required=quantity
     )
     db.add(db_ingredient)
-    await db.commit()
-    await db.refresh(db_ingredient)
-    return db_ingredient
\ No newline at end of file
+    await db.flush()
+    _invalidate_menu(db)
+    return db_ingredient
+
+async def add_product_ingredients(db: AsyncSession, rows: List[dict]) -> int:
+    """Insert many recipe lines (product_id, ingredient_id, quantity_required) with one statement"""
+    if not rows:
+        return 0
+    await db.execute(insert(ProductIngredient), rows)
+    _invalidate_menu(db)
+    return len(rows)
+
+async def set_recipe_components(db: AsyncSession, components: RecipeComponentsUpdate) -> int:
+    """Replace the sub-recipes and extra ingredients of one product or modifier"""
+    if (components.product_id is None) == (components.modifier_id is None):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Give exactly one of product_id or modifier_id")
+    for line in components.components:
+        if (line.sub_recipe_id is None) == (line.ingredient_id is None):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Each component needs exactly one of sub_recipe_id or ingredient_id"
+            )
+        if line.quantity <= 0:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Component quantities must be positive")
+
+    sub_recipe_ids = {line.sub_recipe_id for line in components.components if line.sub_recipe_id}
+    ingredient_ids = {line.ingredient_id for line in components.components if line.ingredient_id}
+    if sub_recipe_ids:
+        found = set((await db.execute(
+            select(MenuProduct.product_id).where(MenuProduct.product_id.in_(sub_recipe_ids))
+        )).scalars().all())
+        if found != sub_recipe_ids:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown sub-recipes: {sorted(map(str, sub_recipe_ids - found))}")
+    if ingredient_ids:
+        found = set((await db.execute(
+            select(Ingredient.ingredient_id).where(Ingredient.ingredient_id.in_(ingredient_ids))
+        )).scalars().all())
+        if found != ingredient_ids:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown ingredients: {sorted(map(str, ingredient_ids - found))}")
+    if components.product_id and sub_recipe_ids:
+        await ensure_costing(db)
+        if components.product_id in sub_recipe_ids or costing_engine.creates_cycle(components.product_id, sub_recipe_ids):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A sub-recipe would contain the product itself")
+
+    if components.product_id:
+        owner = RecipeComponent.product_id == components.product_id
+    else:
+        owner = RecipeComponent.modifier_id == components.modifier_id
+    await db.execute(delete(RecipeComponent).where(owner))
+    rows = [
+        {
+            "product_id": components.product_id,
+            "modifier_id": components.modifier_id,
+            "sub_recipe_id": line.sub_recipe_id,
+            "ingredient_id": line.ingredient_id,
+            "quantity": line.quantity
+        }
+        for line in components.components
+    ]
+    if rows:
+        await db.execute(insert(RecipeComponent), rows)
+    run_after_commit(db, costing_engine.invalidate)
+    if components.product_id:
+        run_after_commit(db, availability_engine.invalidate)
+    return len(rows)
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy.future import select
+
+from ..database import AsyncSessionLocal
+from ..schemas import Ingredient, MenuProduct, ProductIngredient
+from ..models.menu import FullMenuResponse, MenuCategory, MenuProductResponse, MenuSection, ProductIngredientResponse
+
+logger = logging.getLogger(__name__)
+
+# Product columns copied into the response (recipe lines are added separately)
+_PRODUCT_FIELDS = [name for name in MenuProductResponse.model_fields if name != "ingredients"]
+
+
+class Snapshot(NamedTuple):
+    body: bytes
+    etag: str
+    version: int
+    built_at: datetime
+    products: int
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers `etag` (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def build_full_menu(db) -> FullMenuResponse:
+    """The sectioned menu in two queries: products, then every recipe line with its ingredient"""
+    products = (await db.execute(
+        select(MenuProduct).order_by(MenuProduct.category, MenuProduct.name)
+    )).scalars().all()
+    recipe_rows = await db.execute(
+        select(
+            ProductIngredient.product_id,
+            ProductIngredient.ingredient_id,
+            ProductIngredient.quantity_required,
+            Ingredient.name,
+            Ingredient.unit_of_measure
+        )
+        .join(Ingredient, Ingredient.ingredient_id == ProductIngredient.ingredient_id)
+    )
+    recipes = defaultdict(list)
+    for product_id, ingredient_id, quantity, name, unit in recipe_rows:
+        recipes[product_id].append(ProductIngredientResponse(
+            product_id=product_id,
+            ingredient_id=ingredient_id,
+            quantity_required=quantity,
+            ingredient_name=name,
+            unit_of_measure=unit or ""
+        ))
+
+    by_category: Dict[MenuCategory, List[MenuProductResponse]] = defaultdict(list)
+    last_updated = None
+    for product in products:
+        changed = product.updated_at or product.created_at
+        if changed and (last_updated is None or changed > last_updated):
+            last_updated = changed
+        if product.category is None:
+            continue  # Not placed on the menu yet
+        fields = {name: getattr(product, name) for name in _PRODUCT_FIELDS}
+        by_category[MenuCategory(product.category)].append(
+            MenuProductResponse(**fields, ingredients=recipes.get(product.product_id, []))
+        )
+
+    return FullMenuResponse(
+        sections=[
+            MenuSection(category=category, products=by_category[category])
+            for category in MenuCategory if by_category.get(category)
+        ],
+        # Taken from the data rather than the clock so an unchanged menu keeps its ETag across rebuilds
+        last_updated=last_updated or datetime(1970, 1, 1)
+    )
+
+
+class MenuSnapshot:
+    """
+    The full menu, built once and kept as pre-serialized JSON with its ETag.
+
+    Menu writes bump a version (after their commit) and start a background
+    rebuild. Readers that find the snapshot missing or out of date await the
+    one in-flight build instead of starting their own, so a burst of scans
+    during a rebuild costs a single build. A write landing mid-build makes the
+    same task build again before it finishes.
+    """
+
+    def __init__(self, session_factory: Callable = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._snapshot: Optional[Snapshot] = None
+        self._version = 0
+        self._build: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.build_failures = 0
+        self.served = 0
+        self.not_modified = 0
+        self.last_build_ms: Optional[float] = None
+
+    async def current(self) -> Snapshot:
+        while self._snapshot is None or self._snapshot.version != self._version:
+            # shield: a client hanging up must not cancel the build other readers are waiting on
+            await asyncio.shield(self._start_build())
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Mark the menu changed and rebuild in the background (call after the write commits)"""
+        self._version += 1
+        task = self._start_build()
+        task.add_done_callback(_retrieve_failure)
+
+    def _start_build(self) -> asyncio.Task:
+        if self._build is None or self._build.done():
+            self._build = asyncio.create_task(self._rebuild())
+        return self._build
+
+    async def _rebuild(self) -> None:
+        while self._snapshot is None or self._snapshot.version != self._version:
+            version = self._version
+            started = datetime.now()
+            try:
+                async with self.session_factory() as db:
+                    menu = await build_full_menu(db)
+            except Exception:
+                self.build_failures += 1
+                logger.exception("Menu snapshot build failed")
+                raise
+            body = menu.model_dump_json().encode()
+            self._snapshot = Snapshot(
+                body=body,
+                etag=_etag(body),
+                version=version,
+                built_at=datetime.now(),
+                products=sum(len(section.products) for section in menu.sections)
+            )
+            self.builds += 1
+            self.last_build_ms = round((datetime.now() - started).total_seconds() * 1000, 1)
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": self._version,
+            "current": snapshot is not None and snapshot.version == self._version,
+            "etag": snapshot.etag if snapshot else None,
+            "bytes": len(snapshot.body) if snapshot else 0,
+            "products": snapshot.products if snapshot else 0,
+            "built_at": snapshot.built_at.isoformat() if snapshot else None,
+            "building": self._build is not None and not self._build.done(),
+            "builds": self.builds,
+            "build_failures": self.build_failures,
+            "last_build_ms": self.last_build_ms,
+            "served": self.served,
+            "not_modified": self.not_modified,
+        }
+
+
+def _retrieve_failure(task: asyncio.Task) -> None:
+    # Already logged by _rebuild; the next reader retries the build
+    if not task.cancelled():
+        task.exception()
+
+
+# Process-wide snapshot served by GET /menu/
+menu_snapshot = MenuSnapshot()
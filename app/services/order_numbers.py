@@ -0,0 +1,119 @@
+import os
+import asyncio
+import logging
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from ..database import engine, settings, pool_status
+from ..models.order_number import OrderNumberCounter
+from ..utils.helpers import generate_order_number
+
+logger = logging.getLogger(__name__)
+
+# Numbers a worker reserves per round trip; unused ones are skipped on restart
+ORDER_NUMBER_BLOCK_SIZE = int(os.getenv("ORDER_NUMBER_BLOCK_SIZE", "20"))
+# Short code of this site (e.g. "DT"); empty for a single-location restaurant
+ORDER_NUMBER_LOCATION = os.getenv("ORDER_NUMBER_LOCATION", "")
+# Connections kept for reserving blocks, apart from the request pool
+ORDER_NUMBER_POOL_SIZE = int(os.getenv("ORDER_NUMBER_POOL_SIZE", "2"))
+
+
+def create_counter_engine(url=None, pool_size: int = ORDER_NUMBER_POOL_SIZE):
+    """
+    Small engine of its own for counter updates.
+
+    The request asking for a number already holds a connection from the main
+    pool; taking a second one from that pool could starve it under load.
+    """
+    counter_settings = settings.model_copy(update={"pool_size": pool_size, "max_overflow": 0})
+    return create_async_engine(url or engine.url, **counter_settings.engine_kwargs())
+
+
+class OrderNumberAllocator:
+    """
+    Hands out daily order numbers from blocks reserved in the database (hi/lo).
+
+    Each worker reserves `block_size` numbers at a time by bumping the day's
+    counter row in its own short transaction, then serves them from memory.
+    Numbers are unique across workers and restart at 1 each business day;
+    numbers left in a block when a worker stops, or used by an order that
+    rolled back, are simply skipped.
+    """
+
+    def __init__(self, db_engine=None, block_size: int = ORDER_NUMBER_BLOCK_SIZE, location: str = ORDER_NUMBER_LOCATION):
+        self.engine = db_engine or create_counter_engine()
+        self.block_size = block_size
+        self.location = location
+        self.blocks_reserved = 0
+        self.numbers_issued = 0
+        self._blocks: Dict[Tuple[date, str], Tuple[int, int]] = {}
+        self._locks: Dict[Tuple[date, str], asyncio.Lock] = {}
+
+    async def next_sequence(self, business_date: Optional[date] = None, location: Optional[str] = None) -> int:
+        business_date = business_date or date.today()
+        location = self.location if location is None else location
+        key = (business_date, location)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            current, end = self._blocks.get(key, (0, 0))
+            if current >= end:
+                current, end = await self._reserve_block(business_date, location)
+                self._drop_old_days(business_date)
+            self._blocks[key] = (current + 1, end)
+        self.numbers_issued += 1
+        return current + 1
+
+    async def allocate(self, business_date: Optional[date] = None, location: Optional[str] = None) -> str:
+        """Next formatted order number, e.g. ORD-20240315-0042"""
+        business_date = business_date or date.today()
+        location = self.location if location is None else location
+        sequence = await self.next_sequence(business_date, location)
+        return generate_order_number(sequence, business_date, location)
+
+    async def allocate_many(self, count: int, business_date: Optional[date] = None, location: Optional[str] = None) -> List[str]:
+        return [await self.allocate(business_date, location) for _ in range(count)]
+
+    async def _reserve_block(self, business_date: date, location: str) -> Tuple[int, int]:
+        """Bump the counter by one block on the allocator's own engine; returns the block's [start, end)"""
+        dialect = postgresql if self.engine.dialect.name == "postgresql" else sqlite
+        table = OrderNumberCounter.__table__
+        statement = dialect.insert(table).values(
+            business_date=business_date,
+            location=location,
+            next_value=self.block_size
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.business_date, table.c.location],
+            set_={"next_value": table.c.next_value + self.block_size}
+        ).returning(table.c.next_value)
+
+        # Committed on its own so the block survives even if the order's transaction rolls back
+        async with self.engine.begin() as conn:
+            end = await conn.scalar(statement)
+        self.blocks_reserved += 1
+        return end - self.block_size, end
+
+    def _drop_old_days(self, today: date) -> None:
+        for key in [key for key in self._blocks if key[0] < today]:
+            del self._blocks[key]
+            self._locks.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "block_size": self.block_size,
+            "location": self.location,
+            "blocks_reserved": self.blocks_reserved,
+            "numbers_issued": self.numbers_issued,
+            "open_blocks": {
+                f"{day:%Y-%m-%d}/{location or '-'}": {"next": current + 1, "remaining": end - current}
+                for (day, location), (current, end) in self._blocks.items()
+            },
+            "pool": pool_status(self.engine),
+        }
+
+
+# Process-wide allocator used by order_service
+order_number_allocator = OrderNumberAllocator()
@@ -1,39 +1,366 @@
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, insert, delete
+from sqlalchemy.orm import joinedload, selectinload, with_loader_criteria
+from datetime import datetime
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 
-from ..schemas import Order, OrderItem
-from ..models.order import OrderCreate
+from ..schemas import Order, OrderItem, OrderItemModifier
+from ..models.order import OrderCreate, OrderUpdate, OrderStatus
+from ..models.order_item import OrderItemCreate
+from ..utils.ids import uuid7
+from ..utils.pagination import apply_keyset
+from ..utils.state_machine import ORDER_STATE_MACHINE
+from ..database import run_after_commit
+from .kitchen_feed import (
+    kitchen_feed, ORDER_CREATED, ORDER_ITEM_ADDED, ORDER_ITEM_REMOVED, ORDER_ITEM_UPDATED, ORDER_STATUS_CHANGED
+)
+from .kitchen_queue import kitchen_queue, KitchenTicket, KITCHEN_STATUSES, fetch_preparation_times
+from .order_numbers import order_number_allocator
+from .partitioning import active_since
+from .pricing import resolve_prices, modifier_costs, line_total, apply_total_delta
+
+# OrderResponse nests items and their modifiers, so order queries load the whole graph up front.
+# A single order joins everything in one statement; lists use one extra IN-query per level
+# (orders, items, modifiers = 3 queries regardless of page size).
+ORDER_GRAPH_JOINED = (
+    joinedload(Order.items).joinedload(OrderItem.modifiers),
+)
+ORDER_GRAPH_SELECTIN = (
+    selectinload(Order.items).selectinload(OrderItem.modifiers),
+)
+
+ACTIVE_STATUSES = (OrderStatus.PENDING, OrderStatus.PREPARING, OrderStatus.READY)
 
 async def get_order(db: AsyncSession, order_id: UUID):
-    result = await db.execute(select(Order).where(Order.order_id == order_id))
-    return result.scalars().first()
+    result = await db.execute(
+        select(Order).options(*ORDER_GRAPH_JOINED).where(Order.order_id == order_id)
+    )
+    return result.unique().scalars().first()
 
-async def get_orders(db: AsyncSession, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(Order).offset(skip).limit(limit))
+async def get_orders(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[OrderStatus] = None,
+    cursor: Optional[str] = None
+):
+    """Orders newest first, paged by (order_time, order_id)"""
+    query = select(Order).options(*ORDER_GRAPH_SELECTIN)
+    if status is not None:
+        query = query.where(Order.status == status)
+    query = apply_keyset(query, Order.order_time, Order.order_id, cursor, skip, limit, descending=True)
+    result = await db.execute(query)
     return result.scalars().all()
 
-async def create_order(db: AsyncSession, order: OrderCreate):
-    db_order = Order(**order.dict())
-    db.add(db_order)
-    await db.commit()
-    await db.refresh(db_order)
-    return db_order
+async def get_kitchen_orders(db: AsyncSession, limit: Optional[int] = None):
+    """Orders waiting on the kitchen, oldest first (then quickest to prepare)"""
+    if not kitchen_queue.loaded:
+        since = active_since()
+        query = (
+            select(Order)
+            .options(*ORDER_GRAPH_SELECTIN, with_loader_criteria(OrderItem, OrderItem.order_time >= since))
+            .where(Order.status.in_(KITCHEN_STATUSES), Order.order_time >= since)
+            .order_by(Order.order_time)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    # The queue already knows which orders and in what order; only fetch their graphs.
+    # Bounding order_time by the oldest ticket lets Postgres prune to the current partition(s).
+    tickets = kitchen_queue.top(limit)
+    if not tickets:
+        return []
+    order_ids = [ticket.order_id for ticket in tickets]
+    since = min(ticket.order_time for ticket in tickets)
+    result = await db.execute(
+        select(Order)
+        .options(*ORDER_GRAPH_SELECTIN, with_loader_criteria(OrderItem, OrderItem.order_time >= since))
+        .where(Order.order_id.in_(order_ids), Order.order_time >= since)
+    )
+    orders = {order.order_id: order for order in result.scalars().all()}
+    return [orders[order_id] for order_id in order_ids if order_id in orders]
+
+async def get_table_orders(db: AsyncSession, table_id: UUID, active_only: bool = True):
+    """Orders placed at a table, newest first"""
+    query = select(Order).options(*ORDER_GRAPH_SELECTIN).where(Order.table_id == table_id)
+    if active_only:
+        since = active_since()
+        query = query.where(Order.status.in_(ACTIVE_STATUSES), Order.order_time >= since).options(
+            with_loader_criteria(OrderItem, OrderItem.order_time >= since)
+        )
+    result = await db.execute(query.order_by(Order.order_time.desc()))
+    return result.scalars().all()
+
+def _order_event(order) -> dict:
+    """Column-only view of an order for the kitchen feed (no lazy loads)"""
+    return {
+        "order_id": order.order_id,
+        "order_number": order.order_number,
+        "table_id": order.table_id,
+        "status": order.status,
+        "order_time": order.order_time,
+        "notes": order.notes,
+    }
+
+def _item_event(item) -> dict:
+    return {
+        "item_id": item.item_id,
+        "order_id": item.order_id,
+        "product_id": item.product_id,
+        "quantity": item.quantity,
+        "notes": item.notes,
+    }
+
+def _queue_item(item, preparation_times: dict) -> dict:
+    return {
+        "product_id": item.product_id,
+        "quantity": item.quantity,
+        "preparation_time": preparation_times.get(item.product_id, 0),
+    }
+
+def _publish_after_commit(db: AsyncSession, event_type: str, data: dict) -> None:
+    # Kitchen screens only hear about changes that actually committed
+    run_after_commit(db, lambda: kitchen_feed.publish(event_type, data))
+
+def _item_rows(order_id: UUID, order_time: datetime, items: List[OrderItemCreate], products: dict, modifiers: dict):
+    """Insert rows for an order's items and their modifiers, plus the amount they add to the order"""
+    item_rows, modifier_rows, total = [], [], 0.0
+    for item in items:
+        item_id = uuid7()
+        unit_price = products[item.product_id].price
+        item_rows.append({
+            "item_id": item_id,
+            "order_id": order_id,
+            "order_time": order_time,
+            "product_id": item.product_id,
+            "quantity": item.quantity,
+            "unit_price": unit_price,
+            "notes": item.notes,
+        })
+        modifier_rows.extend(
+            {"item_id": item_id, "modifier_id": modifier_id, "additional_cost": modifiers[modifier_id]}
+            for modifier_id in item.modifiers or []
+        )
+        total += line_total(unit_price, item.quantity, (modifiers[modifier_id] for modifier_id in item.modifiers or []))
+    return item_rows, modifier_rows, round(total, 2)
+
+async def _insert_items(db: AsyncSession, item_rows: list, modifier_rows: list) -> None:
+    # Ids are generated up front, so each level is a single executemany with no RETURNING
+    if item_rows:
+        await db.execute(insert(OrderItem), item_rows)
+    if modifier_rows:
+        await db.execute(insert(OrderItemModifier), modifier_rows)
+
+async def create_orders(db: AsyncSession, orders: List[OrderCreate], server_id: UUID):
+    """
+    Persist several tickets with all their items and modifiers in the current transaction.
+
+    Prices are validated up front, then orders, items and modifiers are each
+    inserted in one batch and the finished graphs read back in one query.
+    """
+    all_items = [item for order in orders for item in (order.items or [])]
+    products, modifiers = await resolve_prices(db, all_items)
+
+    order_numbers = await order_number_allocator.allocate_many(len(orders))
+    order_rows, item_rows, modifier_rows = [], [], []
+    # Items share their order's order_time: it is the partition key of both tables
+    order_time = datetime.now()
+    for order, order_number in zip(orders, order_numbers):
+        order_id = uuid7()
+        items, item_modifiers, total = _item_rows(order_id, order_time, order.items or [], products, modifiers)
+        order_rows.append({
+            **order.dict(exclude={"items"}),
+            "order_id": order_id,
+            "order_time": order_time,
+            "order_number": order_number,
+            "server_id": server_id,
+            "total_amount": total,
+        })
+        item_rows.extend(items)
+        modifier_rows.extend(item_modifiers)
+
+    await db.execute(insert(Order), order_rows)
+    await _insert_items(db, item_rows, modifier_rows)
+
+    order_ids = [row["order_id"] for row in order_rows]
+    result = await db.execute(
+        select(Order)
+        .options(*ORDER_GRAPH_JOINED)
+        .where(Order.order_id.in_(order_ids))
+        .execution_options(populate_existing=True)
+    )
+    created = {db_order.order_id: db_order for db_order in result.unique().scalars().all()}
+    db_orders = [created[order_id] for order_id in order_ids]
+
+    preparation_times = {product_id: product.preparation_time for product_id, product in products.items()}
+    kitchen_queue.remember_preparation_times(preparation_times)
+    for db_order in db_orders:
+        if db_order.status in KITCHEN_STATUSES:
+            queued = [_queue_item(item, preparation_times) for item in db_order.items]
+            ticket = KitchenTicket(db_order.order_id, db_order.order_time, db_order.status, queued)
+            run_after_commit(db, lambda ticket=ticket: kitchen_queue.upsert(ticket))
+        _publish_after_commit(db, ORDER_CREATED, _order_event(db_order))
+    return db_orders
 
-async def add_order_item(db: AsyncSession, order_id: UUID, item: dict):
-    db_item = OrderItem(order_id=order_id, **item)
-    db.add(db_item)
-    await db.commit()
-    await db.refresh(db_item)
+async def create_order(db: AsyncSession, order: OrderCreate, server_id: UUID):
+    """Create one order with its nested items and modifiers"""
+    db_orders = await create_orders(db, [order], server_id)
+    return db_orders[0]
+
+async def add_order_item(db: AsyncSession, order_id: UUID, item: OrderItemCreate):
+    """
+    Add one item (and its modifiers) to an existing order at the current menu price.
+
+    The order total moves by the line's amount in place; it is never re-summed.
+    Returns None if the order doesn't exist.
+    """
+    products, modifiers = await resolve_prices(db, [item])
+    delta = line_total(
+        products[item.product_id].price, item.quantity,
+        (modifiers[modifier_id] for modifier_id in item.modifiers or [])
+    )
+    order = await apply_total_delta(db, order_id, delta)
+    if order is None:
+        return None
+    item_rows, modifier_rows, _ = _item_rows(order_id, order.order_time, [item], products, modifiers)
+    await _insert_items(db, item_rows, modifier_rows)
+
+    result = await db.execute(
+        select(OrderItem)
+        .options(selectinload(OrderItem.modifiers))
+        .where(OrderItem.item_id == item_rows[0]["item_id"])
+    )
+    db_item = result.scalars().first()
+    queued_item = _queue_item(db_item, {item.product_id: products[item.product_id].preparation_time})
+    run_after_commit(db, lambda: kitchen_queue.add_item(order_id, queued_item))
+    _publish_after_commit(db, ORDER_ITEM_ADDED, _item_event(db_item))
     return db_item
 
-async def update_order_status(db: AsyncSession, order_id: UUID, status: str):
-    order = await get_order(db, order_id)
-    if not order:
+async def remove_order_item(db: AsyncSession, order_id: UUID, item_id: UUID) -> bool:
+    """
+    Remove an item from an order and take its amount off the order total.
+
+    The amount is what the line was charged: its stored unit price and
+    modifier prices, not today's menu.
+    """
+    # The item is matched on both ids first, so an item_id from another order touches nothing
+    removed = (await db.execute(
+        delete(OrderItem)
+        .where(OrderItem.item_id == item_id, OrderItem.order_id == order_id)
+        .returning(OrderItem.product_id, OrderItem.unit_price, OrderItem.quantity)
+    )).first()
+    if removed is None:
+        return False
+    removed_modifiers = await db.execute(
+        delete(OrderItemModifier)
+        .where(OrderItemModifier.item_id == item_id)
+        .returning(OrderItemModifier.additional_cost)
+    )
+
+    delta = -line_total(float(removed.unit_price), removed.quantity, removed_modifiers.scalars().all())
+    await apply_total_delta(db, order_id, delta)
+
+    product_id, quantity = removed.product_id, removed.quantity
+    run_after_commit(db, lambda: kitchen_queue.remove_item(order_id, product_id, quantity))
+    _publish_after_commit(db, ORDER_ITEM_REMOVED, {"item_id": item_id, "order_id": order_id})
+    return True
+
+async def update_order_status(db: AsyncSession, order_id: UUID, new_status: OrderStatus):
+    """
+    Move an order to `new_status` if the state machine allows it from its current status.
+
+    The check and the write are one conditional UPDATE, so concurrent taps can't both
+    win. Returns None if the order doesn't exist; raises 409 on an illegal transition.
+    """
+    new_status = OrderStatus(new_status)
+    result = await db.execute(
+        update(Order)
+        .where(
+            Order.order_id == order_id,
+            Order.status.in_(ORDER_STATE_MACHINE.sources_for(new_status))
+        )
+        .values(status=new_status)
+        .returning(Order)
+        .options(*ORDER_GRAPH_SELECTIN)
+        .execution_options(populate_existing=True)
+    )
+    db_order = result.scalars().first()
+    if db_order is None:
+        # Only the failure path pays for a second round trip, to tell 404 from 409
+        current = await db.scalar(select(Order.status).where(Order.order_id == order_id))
+        if current is None:
+            return None
+        raise ORDER_STATE_MACHINE.conflict(OrderStatus(current), new_status)
+    items = []
+    if db_order.status in KITCHEN_STATUSES:
+        preparation_times = await fetch_preparation_times(db, [item.product_id for item in db_order.items])
+        items = [_queue_item(item, preparation_times) for item in db_order.items]
+    order_id, order_time, new_status = db_order.order_id, db_order.order_time, db_order.status
+    run_after_commit(db, lambda: kitchen_queue.set_status(order_id, new_status, order_time, items))
+    _publish_after_commit(db, ORDER_STATUS_CHANGED, _order_event(db_order))
+    return db_order
+
+async def update_order(db: AsyncSession, order_id: UUID, order: OrderUpdate):
+    update_data = order.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_order(db, order_id)
+
+    result = await db.execute(
+        update(Order)
+        .where(Order.order_id == order_id)
+        .values(**update_data)
+        .returning(Order)
+        .options(*ORDER_GRAPH_SELECTIN)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def delete_order(db: AsyncSession, order_id: UUID) -> bool:
+    """Cancel an order; the row is kept. Raises 409 if it is already delivered or cancelled"""
+    return await update_order_status(db, order_id, OrderStatus.CANCELLED) is not None
+
+async def add_modifier_to_item(db: AsyncSession, item_id: UUID, modifier_id: UUID):
+    """
+    Add one modifier to an existing order item and its cost to the order total.
+
+    Returns None if the item doesn't exist; 422 for an unknown modifier,
+    409 if the item already has it.
+    """
+    db_item = await db.scalar(select(OrderItem).where(OrderItem.item_id == item_id))
+    if db_item is None:
         return None
-    
-    order.status = status
-    await db.commit()
-    await db.refresh(order)
-    return order
\ No newline at end of file
+    costs = await modifier_costs(db, [modifier_id])
+    if modifier_id not in costs:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown modifier {modifier_id}")
+    existing = await db.scalar(
+        select(OrderItemModifier.modifier_id)
+        .where(OrderItemModifier.item_id == item_id, OrderItemModifier.modifier_id == modifier_id)
+    )
+    if existing is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Modifier already on this item")
+
+    await db.execute(
+        insert(OrderItemModifier),
+        [{"item_id": item_id, "modifier_id": modifier_id, "additional_cost": costs[modifier_id]}]
+    )
+    await apply_total_delta(db, db_item.order_id, round(costs[modifier_id] * db_item.quantity, 2))
+
+    result = await db.execute(
+        select(OrderItem)
+        .options(selectinload(OrderItem.modifiers))
+        .where(OrderItem.item_id == item_id)
+        .execution_options(populate_existing=True)
+    )
+    db_item = result.scalars().first()
+    order_id = db_item.order_id
+    run_after_commit(db, lambda: kitchen_queue.item_changed(order_id))
+    _publish_after_commit(db, ORDER_ITEM_UPDATED, {
+        **_item_event(db_item),
+        "modifiers": [modifier.modifier_id for modifier in db_item.modifiers],
+    })
+    return db_item
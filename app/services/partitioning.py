@@ -0,0 +1,221 @@
+import os
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger(__name__)
+
+# Partitions to keep ready ahead of the current month
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# Closed orders older than this many months are moved to the archive
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", "12"))
+# Optional tablespace (e.g. on cheaper, compressed storage) for archived partitions
+ARCHIVE_TABLESPACE = os.getenv("ARCHIVE_TABLESPACE")
+# Orders older than this are never considered active by the hot queries
+ACTIVE_ORDER_LOOKBACK_HOURS = float(os.getenv("ACTIVE_ORDER_LOOKBACK_HOURS", "48"))
+
+# Monthly RANGE partitioned tables and their partition key (Postgres only).
+# order_items carries its order's order_time so items live in the same month as their order.
+PARTITIONED_TABLES: Dict[str, str] = {
+    "orders": "order_time",
+    "order_items": "order_time",
+    "payments": "transaction_time",
+}
+CLOSED_ORDER_STATUSES = ("delivered", "cancelled")
+
+
+def active_since(now: Optional[datetime] = None) -> datetime:
+    """Lower bound on order_time for queries over open orders, so Postgres prunes old partitions"""
+    now = now or datetime.now()
+    return now - timedelta(hours=ACTIVE_ORDER_LOOKBACK_HOURS)
+
+
+def day_bounds(day: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """[start, end) of a calendar day, as a range predicate partition pruning can use"""
+    day = day or date.today()
+    start = datetime(day.year, day.month, day.day)
+    return start, start + timedelta(days=1)
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(table: str, start: date) -> str:
+    return f"{table}_p{start:%Y_%m}"
+
+
+def _is_postgres(conn) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+async def ensure_partitions(conn, months_ahead: int = PARTITION_MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """
+    Create the monthly partitions from the current month to `months_ahead` months out.
+
+    Idempotent; returns the partitions it created. Each partitioned table also
+    gets a DEFAULT partition so a late or mis-dated row is never rejected.
+    """
+    if not _is_postgres(conn):
+        logger.info("Table partitioning needs Postgres; skipping on %s", conn.dialect.name)
+        return []
+
+    created = []
+    first = month_start(today or date.today())
+    for table in PARTITIONED_TABLES:
+        if not await _is_partitioned(conn, table):
+            logger.warning("%s is not a partitioned table; skipping", table)
+            continue
+        for offset in range(months_ahead + 1):
+            start = add_months(first, offset)
+            name = partition_name(table, start)
+            if await _exists(conn, name):
+                continue
+            await conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+            ))
+            created.append(name)
+        default = f"{table}_default"
+        if not await _exists(conn, default):
+            await conn.execute(text(f"CREATE TABLE {default} PARTITION OF {table} DEFAULT"))
+            created.append(default)
+    if created:
+        logger.info("Created partitions: %s", ", ".join(created))
+    return created
+
+
+async def archive_partitions(conn, older_than_months: int = ARCHIVE_AFTER_MONTHS, today: Optional[date] = None) -> dict:
+    """
+    Move whole months of closed orders (with their items and payments) to the archive.
+
+    Months go oldest first and archiving stops at the first month with an open
+    order. Payments are partitioned by transaction_time, not by their order's
+    month, so an order paid after midnight on the last day of a month has its
+    payment in the next month's partition. A month whose orders still have
+    payments in later months is held back and archived together with the month
+    those payments fall in; no live payment ever points at an archived order.
+
+    The partitions are detached from the live tables and attached to the
+    <table>_archive parents, so live queries no longer plan or scan them while
+    reports can still read the archive. With ARCHIVE_TABLESPACE set they are
+    also moved there.
+    """
+    if not _is_postgres(conn):
+        return {"archived": [], "skipped": [], "detail": "Table partitioning needs Postgres"}
+
+    cutoff = add_months(month_start(today or date.today()), -older_than_months)
+    archived, skipped = [], []
+    # Closed months waiting for the month that holds their last payments
+    held = []
+    for start in await _live_months(conn, "orders"):
+        if start >= cutoff:
+            break
+        open_orders = await conn.scalar(
+            text(f"SELECT count(*) FROM {partition_name('orders', start)} WHERE status NOT IN :closed")
+            .bindparams(bindparam("closed", expanding=True)),
+            {"closed": list(CLOSED_ORDER_STATUSES)}
+        )
+        if open_orders:
+            skipped.append({"month": f"{start:%Y-%m}", "open_orders": open_orders})
+            break
+        held.append(start)
+        end = datetime.combine(add_months(start, 1), datetime.min.time())
+        # Live orders before `end` are exactly the held months: earlier ones are archived already
+        later_payments = await conn.scalar(
+            text("SELECT count(*) FROM payments WHERE transaction_time >= :end "
+                 "AND order_id IN (SELECT order_id FROM orders WHERE order_time < :end)"),
+            {"end": end}
+        )
+        if later_payments:
+            continue
+        for month in held:
+            archived.extend(await _archive_month(conn, month))
+        held = []
+    skipped.extend({"month": f"{month:%Y-%m}", "paid_in_later_month": True} for month in held)
+    if archived:
+        logger.info("Archived partitions: %s", ", ".join(archived))
+    return {"cutoff": cutoff.isoformat(), "archived": archived, "skipped": skipped}
+
+
+async def _archive_month(conn, start: date) -> List[str]:
+    """Detach one month from the live tables and attach it to the archive"""
+    archived = []
+    # Referencing tables first: payments and items, then the orders they point at
+    for table in reversed(list(PARTITIONED_TABLES)):
+        name = partition_name(table, start)
+        if not await _exists(conn, name):
+            continue
+        await _ensure_archive_parent(conn, table)
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if ARCHIVE_TABLESPACE:
+            await conn.execute(text(f"ALTER TABLE {name} SET TABLESPACE {ARCHIVE_TABLESPACE}"))
+        await conn.execute(text(
+            f"ALTER TABLE {table}_archive ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+        ))
+        archived.append(name)
+    return archived
+
+
+async def partition_report(conn) -> dict:
+    """Live and archived partitions per table, with estimated row counts"""
+    if not _is_postgres(conn):
+        return {"partitioned": False, "dialect": conn.dialect.name}
+    report = {"partitioned": True, "tables": {}}
+    for table in PARTITIONED_TABLES:
+        report["tables"][table] = {
+            "live": await _partitions(conn, table),
+            "archive": await _partitions(conn, f"{table}_archive"),
+        }
+    return report
+
+
+async def _exists(conn, name: str) -> bool:
+    return await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+
+
+async def _is_partitioned(conn, table: str) -> bool:
+    return bool(await conn.scalar(
+        text("SELECT count(*) FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"),
+        {"name": table}
+    ))
+
+
+async def _partitions(conn, parent: str) -> List[dict]:
+    if not await _exists(conn, parent):
+        return []
+    rows = await conn.execute(text(
+        "SELECT c.relname, c.reltuples::bigint, pg_total_relation_size(c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:parent) ORDER BY c.relname"
+    ), {"parent": parent})
+    return [{"name": name, "estimated_rows": max(rows_, 0), "bytes": size} for name, rows_, size in rows]
+
+
+async def _live_months(conn, table: str) -> List[date]:
+    months = []
+    prefix = f"{table}_p"
+    for partition in await _partitions(conn, table):
+        suffix = partition["name"][len(prefix):]
+        if partition["name"].startswith(prefix) and len(suffix) == 7:
+            months.append(date(int(suffix[:4]), int(suffix[5:]), 1))
+    return sorted(months)
+
+
+async def _ensure_archive_parent(conn, table: str) -> None:
+    archive = f"{table}_archive"
+    if await _exists(conn, archive):
+        return
+    key = PARTITIONED_TABLES[table]
+    await conn.execute(text(
+        f"CREATE TABLE {archive} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({key})"
+    ))
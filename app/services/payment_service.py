@@ -0,0 +1,129 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import update, func
+from uuid import UUID
+from datetime import datetime
+from typing import List, Optional
+
+from ..schemas import Order, Payment
+from ..models.payment import PaymentCreate, PaymentUpdate, RefundRequest
+from .partitioning import day_bounds
+
+async def get_payment(db: AsyncSession, payment_id: UUID) -> Optional[Payment]:
+    result = await db.execute(select(Payment).where(Payment.payment_id == payment_id))
+    return result.scalars().first()
+
+async def get_order_payments(db: AsyncSession, order_id: UUID) -> List[Payment]:
+    result = await db.execute(
+        select(Payment).where(Payment.order_id == order_id).order_by(Payment.transaction_time)
+    )
+    return result.scalars().all()
+
+async def _update_payment_status(db: AsyncSession, order_id: UUID, total_amount: float) -> None:
+    """Mark the order paid once its payments, net of refunds, cover the total"""
+    paid = await db.scalar(
+        select(func.coalesce(func.sum(Payment.amount - Payment.refunded_amount), 0))
+        .where(Payment.order_id == order_id)
+    )
+    if paid >= total_amount:
+        payment_status = "paid"
+    elif paid > 0:
+        payment_status = "partially_paid"
+    else:
+        payment_status = "unpaid"
+    await db.execute(
+        update(Order)
+        .where(Order.order_id == order_id)
+        .values(payment_status=payment_status)
+        .execution_options(synchronize_session=False)
+    )
+
+async def create_payment(db: AsyncSession, payment: PaymentCreate, staff_id: UUID) -> Payment:
+    """Record a payment against an order; 404 if the order doesn't exist"""
+    if payment.amount <= 0:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Payment amount must be positive")
+    total_amount = await db.scalar(select(Order.total_amount).where(Order.order_id == payment.order_id))
+    if total_amount is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+
+    db_payment = Payment(**payment.model_dump(), staff_id=staff_id)
+    db.add(db_payment)
+    await db.flush()
+    await _update_payment_status(db, payment.order_id, total_amount)
+    return db_payment
+
+async def update_payment(db: AsyncSession, payment_id: UUID, payment: PaymentUpdate) -> Optional[Payment]:
+    update_data = payment.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_payment(db, payment_id)
+
+    result = await db.execute(
+        update(Payment)
+        .where(Payment.payment_id == payment_id)
+        .values(**update_data)
+        .returning(Payment)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def process_refund(db: AsyncSession, payment_id: UUID, refund: RefundRequest, staff_id: UUID) -> Optional[Payment]:
+    """
+    Refund part or all of a payment.
+
+    The refunded amount grows in place and can never exceed the payment;
+    returns None if the payment doesn't exist, 422 if the refund is too large.
+    """
+    if refund.amount <= 0:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Refund amount must be positive")
+    note = f"Refund {refund.amount:.2f} by {staff_id}: {refund.reason}"
+    result = await db.execute(
+        update(Payment)
+        .where(
+            Payment.payment_id == payment_id,
+            Payment.refunded_amount + refund.amount <= Payment.amount
+        )
+        .values(
+            refunded_amount=Payment.refunded_amount + refund.amount,
+            is_refunded=True,
+            notes=func.coalesce(Payment.notes + "\n", "") + note
+        )
+        .returning(Payment)
+        .execution_options(populate_existing=True)
+    )
+    db_payment = result.scalars().first()
+    if db_payment is None:
+        if await get_payment(db, payment_id) is None:
+            return None
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Refund exceeds the amount paid")
+
+    total_amount = await db.scalar(select(Order.total_amount).where(Order.order_id == db_payment.order_id))
+    if total_amount is not None:
+        await _update_payment_status(db, db_payment.order_id, total_amount)
+    return db_payment
+
+async def get_daily_sales_summary(db: AsyncSession, date: Optional[datetime] = None) -> List[dict]:
+    """Payments, takings and refunds per payment method for one day"""
+    # A range on transaction_time (not a date() cast) so only that month's partition is read
+    start, end = day_bounds(date)
+    result = await db.execute(
+        select(
+            Payment.payment_method,
+            func.count(Payment.payment_id),
+            func.coalesce(func.sum(Payment.amount), 0),
+            func.coalesce(func.sum(Payment.refunded_amount), 0)
+        )
+        .where(Payment.transaction_time >= start, Payment.transaction_time < end)
+        .group_by(Payment.payment_method)
+        .order_by(Payment.payment_method)
+    )
+    return [
+        {
+            "date": start.date().isoformat(),
+            "payment_method": method,
+            "payments": count,
+            "total": round(float(total), 2),
+            "refunded": round(float(refunded), 2),
+        }
+        for method, count, total, refunded in result
+    ]
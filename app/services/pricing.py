@@ -0,0 +1,198 @@
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Numeric, cast, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..schemas import Order, OrderItem, OrderItemModifier, MenuProduct, Modifier
+from ..models.order_item import OrderItemCreate
+
+# Invalidation only reaches this process; the TTL bounds how long other workers serve old prices
+PRICE_CACHE_TTL_SECONDS = float(os.getenv("PRICE_CACHE_TTL_SECONDS", "300"))
+
+
+class ProductPrice(NamedTuple):
+    price: float
+    is_available: bool
+    preparation_time: int
+
+
+class PriceCache:
+    """Product and modifier prices keyed by id, dropped on menu writes or after a TTL"""
+
+    def __init__(self, ttl: float = PRICE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._products: Dict[UUID, Tuple[ProductPrice, float]] = {}
+        self._modifiers: Dict[UUID, Tuple[float, float]] = {}
+
+    def products(self, product_ids: Iterable[UUID]) -> Tuple[Dict[UUID, ProductPrice], List[UUID]]:
+        """Cached prices and the ids that need a lookup"""
+        return self._lookup(self._products, product_ids)
+
+    def modifiers(self, modifier_ids: Iterable[UUID]) -> Tuple[Dict[UUID, float], List[UUID]]:
+        return self._lookup(self._modifiers, modifier_ids)
+
+    def set_products(self, prices: Dict[UUID, ProductPrice]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        self._products.update((pid, (price, expires_at)) for pid, price in prices.items())
+
+    def set_modifiers(self, costs: Dict[UUID, float]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        self._modifiers.update((mid, (cost, expires_at)) for mid, cost in costs.items())
+
+    def invalidate_product(self, product_id: UUID) -> None:
+        self._products.pop(product_id, None)
+
+    def invalidate_modifier(self, modifier_id: UUID) -> None:
+        self._modifiers.pop(modifier_id, None)
+
+    def clear(self) -> None:
+        self._products.clear()
+        self._modifiers.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "products": len(self._products),
+            "modifiers": len(self._modifiers),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _lookup(self, entries: dict, ids: Iterable[UUID]):
+        now = time.monotonic()
+        found, missing = {}, []
+        for key in set(ids):
+            entry = entries.get(key)
+            if entry is not None and entry[1] > now:
+                found[key] = entry[0]
+                self.hits += 1
+            else:
+                missing.append(key)
+                self.misses += 1
+        return found, missing
+
+
+async def resolve_prices(
+    db: AsyncSession,
+    items: List[OrderItemCreate]
+) -> Tuple[Dict[UUID, ProductPrice], Dict[UUID, float]]:
+    """
+    Authoritative prices for every product and modifier referenced by `items`.
+
+    Served from the price cache; misses cost one IN query for products and one
+    for modifiers. Raises 422 listing every unknown or unavailable id.
+    """
+    products, missing_products = price_cache.products(item.product_id for item in items)
+    modifiers = await modifier_costs(db, (modifier_id for item in items for modifier_id in (item.modifiers or [])))
+
+    if missing_products:
+        rows = await db.execute(
+            select(MenuProduct.product_id, MenuProduct.price, MenuProduct.is_available, MenuProduct.preparation_time)
+            .where(MenuProduct.product_id.in_(missing_products))
+        )
+        fetched = {
+            row.product_id: ProductPrice(float(row.price), row.is_available, row.preparation_time or 0)
+            for row in rows
+        }
+        price_cache.set_products(fetched)
+        products.update(fetched)
+
+    errors = []
+    for item in items:
+        product = products.get(item.product_id)
+        if product is None:
+            errors.append(f"Unknown product {item.product_id}")
+        elif not product.is_available:
+            errors.append(f"Product {item.product_id} is not available")
+        errors.extend(
+            f"Unknown modifier {modifier_id}" for modifier_id in (item.modifiers or []) if modifier_id not in modifiers
+        )
+        if len(set(item.modifiers or [])) != len(item.modifiers or []):
+            errors.append(f"Modifiers repeated on product {item.product_id}")
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=sorted(set(errors)))
+    return products, modifiers
+
+
+async def modifier_costs(db: AsyncSession, modifier_ids: Iterable[UUID]) -> Dict[UUID, float]:
+    """Current cost of each modifier; unknown ids are left out"""
+    costs, missing = price_cache.modifiers(modifier_ids)
+    if missing:
+        rows = await db.execute(
+            select(Modifier.modifier_id, Modifier.additional_cost).where(Modifier.modifier_id.in_(missing))
+        )
+        fetched = {row.modifier_id: float(row.additional_cost or 0.0) for row in rows}
+        price_cache.set_modifiers(fetched)
+        costs.update(fetched)
+    return costs
+
+
+def line_total(unit_price: float, quantity: int, modifier_costs: Iterable[float] = ()) -> float:
+    """What one order line adds to the order total"""
+    return round((unit_price + sum(modifier_costs)) * quantity, 2)
+
+
+async def apply_total_delta(db: AsyncSession, order_id: UUID, delta: float):
+    """Shift an order's total in place; returns (total_amount, order_time), or None if the order is gone"""
+    result = await db.execute(
+        update(Order)
+        .where(Order.order_id == order_id)
+        .values(total_amount=Order.total_amount + delta)
+        .returning(Order.total_amount, Order.order_time)
+    )
+    return result.first()
+
+
+def _computed_total():
+    """Correlated SQL expression re-summing an order from the prices stored on its lines"""
+    modifier_costs = (
+        select(func.coalesce(func.sum(OrderItemModifier.additional_cost), 0))
+        .where(OrderItemModifier.item_id == OrderItem.item_id)
+        .scalar_subquery()
+    )
+    return (
+        select(func.coalesce(func.sum((OrderItem.unit_price + modifier_costs) * OrderItem.quantity), 0))
+        .where(OrderItem.order_id == Order.order_id)
+        .correlate(Order)
+        .scalar_subquery()
+    )
+
+
+async def recompute_order_totals(
+    db: AsyncSession,
+    order_ids: Optional[List[UUID]] = None,
+    since=None
+) -> int:
+    """
+    Repair stored totals from the line items in one set-based UPDATE.
+
+    The whole batch is summed by the database in a single statement instead of
+    loading orders into Python; only orders whose total actually differs are
+    written. Returns the number of orders corrected.
+    """
+    computed = func.round(cast(_computed_total(), Numeric), 2)
+    query = (
+        update(Order)
+        .values(total_amount=computed)
+        .where(Order.total_amount.is_distinct_from(computed))
+        .execution_options(synchronize_session=False)
+    )
+    if order_ids is not None:
+        query = query.where(Order.order_id.in_(order_ids))
+    if since is not None:
+        query = query.where(Order.order_time >= since)
+    result = await db.execute(query)
+    return result.rowcount
+
+
+# Process-wide cache used by order_service; menu writes invalidate it
+price_cache = PriceCache()
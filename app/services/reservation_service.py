@@ -1,26 +1,101 @@
+import os
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, delete
 from uuid import UUID
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 from ..schemas import Reservation
+from ..models.reservation import ReservationQuery, ReservationUpdate
+from ..utils.pagination import apply_keyset
+
+# Bookable window and slot size for GET /reservations/available-times
+RESERVATION_OPEN_HOUR = int(os.getenv("RESERVATION_OPEN_HOUR", "11"))
+RESERVATION_CLOSE_HOUR = int(os.getenv("RESERVATION_CLOSE_HOUR", "23"))
+RESERVATION_SLOT_MINUTES = int(os.getenv("RESERVATION_SLOT_MINUTES", "15"))
 
 async def get_reservation(db: AsyncSession, reservation_id: UUID):
     result = await db.execute(select(Reservation).where(Reservation.reservation_id == reservation_id))
     return result.scalars().first()
 
-async def get_reservations(db: AsyncSession, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(Reservation).offset(skip).limit(limit))
+async def get_reservations(db: AsyncSession, query: ReservationQuery):
+    """Reservations in time order, paged by (reservation_time, reservation_id)"""
+    statement = select(Reservation)
+    if query.date is not None:
+        day = query.date.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        statement = statement.where(
+            Reservation.reservation_time >= day,
+            Reservation.reservation_time < day + timedelta(days=1)
+        )
+    if query.client_id is not None:
+        statement = statement.where(Reservation.client_id == query.client_id)
+    if query.table_id is not None:
+        statement = statement.where(Reservation.table_id == query.table_id)
+    statement = apply_keyset(
+        statement, Reservation.reservation_time, Reservation.reservation_id,
+        query.cursor, query.skip, query.limit
+    )
+    result = await db.execute(statement)
     return result.scalars().all()
 
 async def create_reservation(db: AsyncSession, reservation: dict):
     db_reservation = Reservation(**reservation)
     db.add(db_reservation)
-    await db.commit()
-    await db.refresh(db_reservation)
+    await db.flush()
     return db_reservation
 
+async def update_reservation(db: AsyncSession, reservation_id: UUID, reservation: ReservationUpdate) -> Optional[Reservation]:
+    update_data = reservation.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_reservation(db, reservation_id)
+
+    result = await db.execute(
+        update(Reservation)
+        .where(Reservation.reservation_id == reservation_id)
+        .values(**update_data)
+        .returning(Reservation)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def delete_reservation(db: AsyncSession, reservation_id: UUID) -> bool:
+    result = await db.execute(
+        delete(Reservation).where(Reservation.reservation_id == reservation_id).returning(Reservation.reservation_id)
+    )
+    return result.scalar() is not None
+
+async def _bookings(db: AsyncSession, table_id: UUID, start: datetime, end: datetime):
+    """(start, end) of the table's reservations that may overlap [start, end)"""
+    # A booking can't overlap the window if it started more than a day before it
+    result = await db.execute(
+        select(Reservation.reservation_time, Reservation.duration_minutes)
+        .where(
+            Reservation.table_id == table_id,
+            Reservation.reservation_time >= start - timedelta(days=1),
+            Reservation.reservation_time < end
+        )
+    )
+    return [(booked, booked + timedelta(minutes=minutes or 0)) for booked, minutes in result]
+
+async def get_available_times(db: AsyncSession, table_id: UUID, date: datetime, duration: int) -> List[datetime]:
+    """Start times on `date` at which the table is free for `duration` minutes"""
+    # A bare date in the query string parses as UTC midnight; reservation times are naive
+    day = date.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    opens = day + timedelta(hours=RESERVATION_OPEN_HOUR)
+    closes = day + timedelta(hours=RESERVATION_CLOSE_HOUR)
+    bookings = await _bookings(db, table_id, opens, closes)
+
+    slots = []
+    slot = opens
+    length = timedelta(minutes=duration)
+    while slot + length <= closes:
+        if all(slot + length <= booked or slot >= ends for booked, ends in bookings):
+            slots.append(slot)
+        slot += timedelta(minutes=RESERVATION_SLOT_MINUTES)
+    return slots
+
 async def check_table_availability(db: AsyncSession, table_id: UUID, start_time: datetime, duration: int):
-    # Implementation would check for overlapping reservations
-    return True
\ No newline at end of file
+    end_time = start_time + timedelta(minutes=duration)
+    bookings = await _bookings(db, table_id, start_time, end_time)
+    return all(end_time <= booked or start_time >= ends for booked, ends in bookings)
\ No newline at end of file
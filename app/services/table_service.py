@@ -1,31 +1,68 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, delete
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 
 from ..schemas import Table
+from ..models.table import TableStatus, TableUpdate
+from ..utils.state_machine import TABLE_STATE_MACHINE
 
 async def get_table(db: AsyncSession, table_id: UUID):
     result = await db.execute(select(Table).where(Table.table_id == table_id))
     return result.scalars().first()
 
-async def get_tables(db: AsyncSession, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(Table).offset(skip).limit(limit))
+async def get_tables(db: AsyncSession, status: Optional[TableStatus] = None, skip: int = 0, limit: int = 100):
+    query = select(Table)
+    if status is not None:
+        query = query.where(Table.status == status)
+    result = await db.execute(query.order_by(Table.table_number).offset(skip).limit(limit))
     return result.scalars().all()
 
 async def create_table(db: AsyncSession, table: dict):
     db_table = Table(**table)
     db.add(db_table)
-    await db.commit()
-    await db.refresh(db_table)
+    await db.flush()
     return db_table
 
-async def update_table_status(db: AsyncSession, table_id: UUID, status: str):
-    table = await get_table(db, table_id)
-    if not table:
-        return None
-    
-    table.status = status
-    await db.commit()
-    await db.refresh(table)
-    return table
\ No newline at end of file
+async def update_table(db: AsyncSession, table_id: UUID, table: TableUpdate) -> Optional[Table]:
+    """Update a table's capacity or location"""
+    update_data = table.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_table(db, table_id)
+
+    result = await db.execute(
+        update(Table)
+        .where(Table.table_id == table_id)
+        .values(**update_data)
+        .returning(Table)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def delete_table(db: AsyncSession, table_id: UUID) -> bool:
+    result = await db.execute(
+        delete(Table).where(Table.table_id == table_id).returning(Table.table_id)
+    )
+    return result.scalar() is not None
+
+async def update_table_status(db: AsyncSession, table_id: UUID, new_status: TableStatus):
+    """Conditional status change; None if the table is missing, 409 if the transition isn't allowed"""
+    new_status = TableStatus(new_status)
+    result = await db.execute(
+        update(Table)
+        .where(
+            Table.table_id == table_id,
+            Table.status.in_(TABLE_STATE_MACHINE.sources_for(new_status))
+        )
+        .values(status=new_status)
+        .returning(Table)
+        .execution_options(populate_existing=True)
+    )
+    db_table = result.scalars().first()
+    if db_table is None:
+        current = await db.scalar(select(Table.status).where(Table.table_id == table_id))
+        if current is None:
+            return None
+        raise TABLE_STATE_MACHINE.conflict(TableStatus(current), new_status)
+    return db_table
\ No newline at end of file
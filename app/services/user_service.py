@@ -1,67 +1,92 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, delete
 from fastapi import HTTPException, status
 from typing import Optional
 
 from ..models.user import User
-from ..schemas import UserUpdate, UserRole
+from ..schemas import UserCreate, UserUpdate, UserRole
+from ..utils.pagination import apply_keyset
+from ..utils.principal_cache import principal_cache
+from ..utils.security import get_password_hash_async, verify_password_async
+from ..database import run_after_commit
+
+def _invalidate_principals(db: AsyncSession, user_id: str) -> None:
+    # Dropped only once the change is committed: evicting earlier would let a concurrent
+    # request re-cache the old row before the commit lands
+    run_after_commit(db, lambda: principal_cache.invalidate_user(user_id))
 
 async def get_user(db: AsyncSession, user_id: str) -> Optional[User]:
     """Get a single user by ID"""
     result = await db.execute(select(User).where(User.user_id == user_id))
     return result.scalars().first()
 
-async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
     """Get multiple users with pagination"""
-    result = await db.execute(select(User).offset(skip).limit(limit))
+    query = apply_keyset(select(User), User.created_at, User.user_id, cursor, skip, limit)
+    result = await db.execute(query)
     return result.scalars().all()
 
-async def create_user(db: AsyncSession, user_data: dict) -> User:
-    """Create a new user"""
-    db_user = User(**user_data)
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
+    """Create a new user; the password is hashed on the hashing pool, off the event loop"""
+    db_user = User(
+        **user.model_dump(exclude={"password"}),
+        hashed_password=await get_password_hash_async(user.password)
+    )
     db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
+    await db.flush()
     return db_user
 
 async def update_user(db: AsyncSession, user_id: str, user_data: UserUpdate) -> Optional[User]:
     """Update an existing user"""
-    result = await db.execute(select(User).where(User.user_id == user_id))
-    db_user = result.scalars().first()
-    
-    if not db_user:
-        return None
-    
     update_data = user_data.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_user(db, user_id)
     
-    for field, value in update_data.items():
-        setattr(db_user, field, value)
-    
-    await db.commit()
-    await db.refresh(db_user)
-    return db_user
+    result = await db.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values(**update_data)
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    _invalidate_principals(db, user_id)
+    return result.scalars().first()
 
 async def delete_user(db: AsyncSession, user_id: str) -> bool:
     """Delete a user"""
-    result = await db.execute(select(User).where(User.user_id == user_id))
-    db_user = result.scalars().first()
-    
-    if not db_user:
-        return False
-    
-    await db.delete(db_user)
-    await db.commit()
-    return True
+    result = await db.execute(
+        delete(User).where(User.user_id == user_id).returning(User.user_id)
+    )
+    _invalidate_principals(db, user_id)
+    return result.scalar() is not None
 
 async def change_user_role(db: AsyncSession, user_id: str, new_role: UserRole) -> Optional[User]:
     """Change a user's role"""
-    result = await db.execute(select(User).where(User.user_id == user_id))
-    db_user = result.scalars().first()
-    
-    if not db_user:
+    result = await db.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values(role=new_role)
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    _invalidate_principals(db, user_id)
+    return result.scalars().first()
+
+async def change_password(db: AsyncSession, user_id: str, current_password: str, new_password: str) -> Optional[User]:
+    """Replace a user's password after checking the current one; None if the user doesn't exist"""
+    db_user = await get_user(db, user_id)
+    if db_user is None:
         return None
-    
-    db_user.role = new_role
-    await db.commit()
-    await db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    if not await verify_password_async(current_password, db_user.hashed_password):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
+
+    result = await db.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values(hashed_password=await get_password_hash_async(new_password))
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    _invalidate_principals(db, user_id)
+    return result.scalars().first()
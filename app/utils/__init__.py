@@ -5,7 +5,7 @@ Exports the FastAPI application and shared components
 """
 
 from fastapi import FastAPI
-from .database import Base, engine, get_db
+from ..database import Base, engine, get_db
 
 # Initialize database tables (in production, use migrations instead)
 async def create_tables():
@@ -0,0 +1,188 @@
+import os
+import re
+import time
+import heapq
+import logging
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Instrumentation settings
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development").lower()
+SQL_DEBUG_HEADERS = os.getenv("SQL_DEBUG_HEADERS", str(ENVIRONMENT != "production")).lower() == "true"
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+SQL_SLOWEST_PER_REQUEST = int(os.getenv("SQL_SLOWEST_PER_REQUEST", "3"))
+SQL_ROUTE_WINDOW = int(os.getenv("SQL_ROUTE_WINDOW", "500"))
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|\?|:\w+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in parameters compare equal"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _LITERAL.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(?, ...)", shape)
+
+
+class RequestDBStats:
+    """Database round trips issued while serving one request"""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.db_time = 0.0
+        self.shapes: Counter = Counter()
+        self._slowest: List[Tuple[float, str]] = []
+
+    @property
+    def round_trips(self) -> int:
+        return self.statements + self.commits + self.rollbacks
+
+    def record_statement(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.db_time += duration
+        self.shapes[statement_shape(statement)] += 1
+        entry = (duration, statement)
+        if len(self._slowest) < SQL_SLOWEST_PER_REQUEST:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        return sorted(self._slowest, reverse=True)
+
+    def repeated_shapes(self, threshold: int = SQL_N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        """Statement shapes run more than `threshold` times (the N+1 signature)"""
+        return {shape: count for shape, count in self.shapes.items() if count > threshold}
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-DB-Round-Trips": str(self.round_trips),
+            "X-DB-Statements": str(self.statements),
+            "X-DB-Time-Ms": f"{self.db_time * 1000:.2f}",
+            "X-DB-N-Plus-One": str(len(self.repeated_shapes())),
+        }
+
+
+_current_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+def start_request_stats() -> RequestDBStats:
+    """Begin counting round trips for the current request"""
+    stats = RequestDBStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def current_request_stats() -> Optional[RequestDBStats]:
+    return _current_stats.get()
+
+
+def instrument_engine(async_engine) -> None:
+    """Attach statement counters and timers to an engine's connection events"""
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["statement_started"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record_statement(statement, time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _abandon_statement(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("statement_started"):
+            connection.info["statement_started"].pop()
+
+    # Autocommit connections still fire commit/rollback events, but nothing is sent
+    @event.listens_for(sync_engine, "commit")
+    def _count_commit(conn):
+        stats = _current_stats.get()
+        if stats is not None and not _is_autocommit(conn):
+            stats.commits += 1
+
+    @event.listens_for(sync_engine, "rollback")
+    def _count_rollback(conn):
+        stats = _current_stats.get()
+        if stats is not None and not _is_autocommit(conn):
+            stats.rollbacks += 1
+
+
+def _is_autocommit(conn) -> bool:
+    return conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+class RouteSQLSummary:
+    """Rolling per-route summary of SQL usage over the last SQL_ROUTE_WINDOW requests"""
+
+    def __init__(self, window: int = SQL_ROUTE_WINDOW):
+        self.window = window
+        self._routes: Dict[str, deque] = {}
+        self._slowest: Dict[str, Tuple[float, str]] = {}
+        self._repeated: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, stats: RequestDBStats) -> None:
+        repeated = stats.repeated_shapes()
+        with self._lock:
+            samples = self._routes.setdefault(route, deque(maxlen=self.window))
+            samples.append((stats.statements, stats.db_time, stats.round_trips, bool(repeated)))
+            slowest = stats.slowest
+            if slowest and slowest[0][0] > self._slowest.get(route, (0.0, ""))[0]:
+                self._slowest[route] = slowest[0]
+            if repeated:
+                self._repeated.setdefault(route, Counter()).update(repeated.keys())
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            report = {}
+            for route, samples in self._routes.items():
+                statements = sorted(sample[0] for sample in samples)
+                db_times = sorted(sample[1] for sample in samples)
+                p95 = max(0, int(len(samples) * 0.95) - 1)
+                slowest = self._slowest.get(route)
+                report[route] = {
+                    "requests": len(samples),
+                    "avg_statements": round(sum(statements) / len(samples), 2),
+                    "p95_statements": statements[p95],
+                    "avg_round_trips": round(sum(sample[2] for sample in samples) / len(samples), 2),
+                    "avg_db_time_ms": round(sum(db_times) * 1000 / len(samples), 3),
+                    "p95_db_time_ms": round(db_times[p95] * 1000, 3),
+                    "n_plus_one_requests": sum(1 for sample in samples if sample[3]),
+                    "n_plus_one_shapes": [shape for shape, _ in self._repeated.get(route, Counter()).most_common(5)],
+                    "slowest_statement_ms": round(slowest[0] * 1000, 3) if slowest else None,
+                    "slowest_statement": slowest[1] if slowest else None,
+                }
+            return report
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._slowest.clear()
+            self._repeated.clear()
+
+
+route_sql_summary = RouteSQLSummary()
+
+
+def finish_request_stats(route: str, stats: RequestDBStats) -> None:
+    """Record a finished request and warn about N+1 query patterns"""
+    route_sql_summary.record(route, stats)
+    for shape, count in stats.repeated_shapes().items():
+        logger.warning("Possible N+1 on %s: %d executions of %s", route, count, shape)
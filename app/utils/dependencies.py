@@ -5,7 +5,7 @@ from uuid import UUID
 
 from ..database import get_db
 from ..schemas import UserResponse  
-from ..utils.security import get_current_active_user
+from ..services.auth import get_current_active_user
 
 async def get_current_staff_user(
     current_user: Annotated[UserResponse, Depends(get_current_active_user)]
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any, Dict, Optional
 from uuid import UUID
 import json
@@ -15,10 +15,13 @@ def serialize_json(data: Any) -> str:
         raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
     return json.dumps(data, default=default_serializer)
 
-def generate_order_number() -> str:
-    """Generate a human-readable order number"""
-    now = datetime.now()
-    return f"ORD-{now.year}{now.month:02d}{now.day:02d}-{now.hour:02d}{now.minute:02d}"
+def generate_order_number(sequence: int, business_date: Optional[date] = None, location: Optional[str] = None) -> str:
+    """Format a human-readable order number, e.g. ORD-20240315-0042 or ORD-20240315-DT-0042"""
+    business_date = business_date or date.today()
+    prefix = f"ORD-{business_date:%Y%m%d}"
+    if location:
+        prefix = f"{prefix}-{location.upper()}"
+    return f"{prefix}-{sequence:04d}"
 
 def calculate_estimated_wait_time(order_items: list) -> int:
     """Calculate estimated preparation time in minutes"""
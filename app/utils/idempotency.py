@@ -0,0 +1,255 @@
+import os
+import time
+import asyncio
+import json
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import run_after_commit, run_after_rollback
+from ..models.idempotency import IdempotencyRecord
+
+# Idempotency configuration
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_MAX_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_MAX_SIZE", "10000"))
+# How long a duplicate waits for the in-flight original before trying itself
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class StoredResponse(NamedTuple):
+    """The response first produced for an idempotency key"""
+    fingerprint: str
+    status_code: int
+    body: object
+
+
+class IdempotencyStore:
+    """
+    Bounded LRU of completed responses, plus futures for requests still in flight.
+
+    Completed responses are also written to the idempotency_keys table in the
+    same transaction as the work itself, so other workers (and this one, after
+    eviction or a restart) can replay them.
+    """
+
+    def __init__(self, max_size: int = IDEMPOTENCY_CACHE_MAX_SIZE, ttl: float = IDEMPOTENCY_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.requests = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.collapsed = 0
+        self.executed = 0
+        self.mismatches = 0
+        self.in_progress_conflicts = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[StoredResponse, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return stored
+
+    def set(self, key: str, stored: StoredResponse) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (stored, time.monotonic() + self.ttl)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def inflight(self, key: str) -> Optional[asyncio.Future]:
+        return self._inflight.get(key)
+
+    def begin(self, key: str) -> None:
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+
+    def finish(self, key: str, stored: Optional[StoredResponse]) -> None:
+        """Release waiting duplicates; None tells them the original didn't complete"""
+        if stored is not None:
+            self.set(key, stored)
+        future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(stored)
+
+    def stats(self) -> dict:
+        replays = self.memory_hits + self.db_hits + self.collapsed
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "in_flight": len(self._inflight),
+            "requests": self.requests,
+            "executed": self.executed,
+            "replay_hits": replays,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "collapsed_in_flight": self.collapsed,
+            "replay_ratio": round(replays / self.requests, 4) if self.requests else 0.0,
+            "key_reuse_mismatches": self.mismatches,
+            "in_progress_conflicts": self.in_progress_conflicts,
+            "evictions": self.evictions,
+        }
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _fingerprint(payload) -> str:
+    if isinstance(payload, BaseModel):
+        return _digest(payload.model_dump_json())
+    # A batch: a list of request models
+    return _digest(json.dumps(jsonable_encoder(payload), sort_keys=True))
+
+
+def _replay(stored: StoredResponse, fingerprint: str) -> JSONResponse:
+    if stored.fingerprint != fingerprint:
+        idempotency_store.mismatches += 1
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    return JSONResponse(
+        status_code=stored.status_code,
+        content=stored.body,
+        headers={IDEMPOTENCY_REPLAYED_HEADER: "true"}
+    )
+
+
+def _is_live(record: IdempotencyRecord, now: datetime) -> bool:
+    expires_at = record.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at > now
+
+
+async def idempotent(
+    db: AsyncSession,
+    idempotency_key: Optional[str],
+    endpoint: str,
+    user_id,
+    payload,
+    run: Callable[[], Awaitable],
+    response_model,  # a model class, or a type such as List[Model] for batches
+    status_code: int = status.HTTP_200_OK
+):
+    """
+    Run `run()` at most once per (endpoint, caller, Idempotency-Key).
+
+    Without a key the call simply runs. With one, a stored response is replayed
+    as-is; a duplicate arriving while the original is still running waits for
+    it instead of repeating the work. The key is claimed in the request's
+    transaction, so if the work rolls back the key is free to retry.
+    """
+    if not idempotency_key:
+        return await run()
+    if len(idempotency_key) > 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+    store = idempotency_store
+    store.requests += 1
+    key = _digest(endpoint, user_id, idempotency_key)
+    fingerprint = _fingerprint(payload)
+
+    stored = store.get(key)
+    if stored is not None:
+        store.memory_hits += 1
+        return _replay(stored, fingerprint)
+
+    pending = store.inflight(key)
+    if pending is not None:
+        try:
+            stored = await asyncio.wait_for(asyncio.shield(pending), IDEMPOTENCY_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            stored = None
+        if stored is not None:
+            store.collapsed += 1
+            return _replay(stored, fingerprint)
+        if store.inflight(key) is not None:
+            # Another duplicate took over after the original failed
+            store.in_progress_conflicts += 1
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A request with this Idempotency-Key is in progress")
+
+    store.begin(key)
+    try:
+        now = datetime.now(timezone.utc)
+        record = await db.get(IdempotencyRecord, key)
+        if record is not None and _is_live(record, now):
+            stored = StoredResponse(record.fingerprint, record.status_code, record.response_body)
+            store.db_hits += 1
+            store.finish(key, stored)
+            return _replay(stored, fingerprint)
+        if record is not None:
+            await db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.key == key))
+
+        # Claim the key; a concurrent claim from another worker fails here (on Postgres
+        # it waits for that worker's transaction and fails only if it committed)
+        record = IdempotencyRecord(
+            key=key,
+            endpoint=endpoint,
+            user_id=user_id,
+            fingerprint=fingerprint,
+            expires_at=now + timedelta(seconds=store.ttl)
+        )
+        db.add(record)
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        store.finish(key, None)
+        record = await db.get(IdempotencyRecord, key, populate_existing=True)
+        if record is not None and record.status_code is not None:
+            store.db_hits += 1
+            return _replay(StoredResponse(record.fingerprint, record.status_code, record.response_body), fingerprint)
+        store.in_progress_conflicts += 1
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A request with this Idempotency-Key is in progress")
+    except BaseException:
+        store.finish(key, None)
+        raise
+
+    try:
+        result = await run()
+    except BaseException:
+        store.finish(key, None)
+        raise
+    store.executed += 1
+
+    body = jsonable_encoder(TypeAdapter(response_model).validate_python(result, from_attributes=True))
+    record.status_code = status_code
+    record.response_body = body
+    stored = StoredResponse(fingerprint, status_code, body)
+    run_after_commit(db, lambda: store.finish(key, stored))
+    run_after_rollback(db, lambda: store.finish(key, None))
+    return result
+
+
+async def purge_expired_keys(db: AsyncSession) -> int:
+    """Delete idempotency records past their expiry"""
+    result = await db.execute(
+        delete(IdempotencyRecord)
+        .where(IdempotencyRecord.expires_at <= datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+# Process-wide store used by the order and payment routes
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,76 @@
+import os
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+# Time-ordered primary keys (UUID version 7, RFC 9562).
+#
+#   48 bits  unix time in milliseconds
+#    4 bits  version (7)
+#   12 bits  sequence within the millisecond
+#    2 bits  variant
+#   62 bits  random
+#
+# New keys sort by creation time, so inserts append to the right edge of the
+# primary key index instead of landing on random pages. They are ordinary
+# UUIDs: existing uuid4 keys stay valid in the same columns.
+
+_SEQUENCE_MAX = 0xFFF
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def _pack(unix_ms: int, sequence: int, random_bits: int) -> UUID:
+    value = (
+        (unix_ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | (sequence & _SEQUENCE_MAX) << 64
+        | 0b10 << 62
+        | (random_bits & 0x3FFFFFFFFFFFFFFF)
+    )
+    return UUID(int=value)
+
+
+def uuid7() -> UUID:
+    """
+    New time-ordered UUID, strictly increasing within this process.
+
+    Keys from the same millisecond take the next sequence number; if the
+    sequence runs out (or the clock steps back) the timestamp is carried
+    forward rather than going backwards.
+    """
+    global _last_ms, _sequence
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Start low in the range, leaving room to count up within the millisecond
+            _sequence = int.from_bytes(os.urandom(2), "big") & 0x1FF
+        else:
+            _sequence += 1
+            if _sequence > _SEQUENCE_MAX:
+                _last_ms += 1
+                _sequence = 0
+        unix_ms, sequence = _last_ms, _sequence
+    return _pack(unix_ms, sequence, int.from_bytes(os.urandom(8), "big"))
+
+
+def uuid7_at(moment: datetime, random_bits: Optional[int] = None) -> UUID:
+    """UUIDv7 for a given time (backfills, synthetic data); not part of the monotonic sequence"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    if random_bits is None:
+        random_bits = int.from_bytes(os.urandom(10), "big")
+    unix_ms = int(moment.timestamp() * 1000)
+    return _pack(unix_ms, random_bits >> 62, random_bits)
+
+
+def uuid7_time(value: UUID) -> Optional[datetime]:
+    """Creation time embedded in a UUIDv7, or None for other versions (e.g. legacy uuid4 keys)"""
+    if value.version != 7:
+        return None
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=timezone.utc)
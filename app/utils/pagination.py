@@ -0,0 +1,63 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    """Encode a (sort key, id) position as an opaque cursor"""
+    payload = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def apply_keyset(query, sort_column, id_column, cursor: Optional[str], skip: int, limit: int, descending: bool = False):
+    """
+    Page a query by (sort_column, id_column).
+
+    With a cursor the page starts right after that position (keyset pagination),
+    which stays fast however deep the page is. Without one the legacy skip offset
+    is used, but over the same stable ordering.
+    """
+    key = tuple_(sort_column, id_column)
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        query = query.where(key < position if descending else key > position)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def next_cursor(rows: Sequence, sort_attr: str, id_attr: str, limit: int) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+
+def set_next_cursor(response: Response, rows: Sequence, sort_attr: str, id_attr: str, limit: int) -> None:
+    """Expose the next page's cursor on the response"""
+    cursor = next_cursor(rows, sort_attr, id_attr, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
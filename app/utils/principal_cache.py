@@ -0,0 +1,133 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from ..schemas import UserRole
+
+# Cache configuration
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+
+class Principal(NamedTuple):
+    """Immutable snapshot of an authenticated user"""
+    user_id: UUID
+    username: str
+    role: UserRole
+    is_active: bool
+
+
+class PrincipalCache:
+    """
+    Bounded, TTL-based cache of authenticated principals.
+
+    Entries are keyed by (user_id, token) so a revoked or replaced token never
+    resolves to another token's snapshot. A secondary index by user_id lets
+    user writes drop every cached token of that user at once.
+    """
+
+    def __init__(self, max_size: int = PRINCIPAL_CACHE_MAX_SIZE, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Bumped by every invalidation; a principal read from the database before
+        # an invalidation is not cached after it
+        self.generation = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Principal, float]]" = OrderedDict()
+        self._by_user: Dict[str, Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, token: str) -> Optional[Principal]:
+        """Return the cached principal for a token, or None on miss/expiry"""
+        key = (str(user_id), token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def set(
+        self,
+        token: str,
+        principal: Principal,
+        token_expires_at: Optional[float] = None,
+        generation: Optional[int] = None
+    ) -> None:
+        """
+        Cache a principal, never beyond the token's own expiry (epoch seconds).
+
+        `generation` is the value of `self.generation` taken before the user row
+        was read; the entry is dropped if any invalidation happened since.
+        """
+        ttl = self.ttl
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        key = (str(principal.user_id), token)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._discard(key)
+            self._entries[key] = (principal, time.monotonic() + ttl)
+            self._by_user.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id) -> None:
+        """Drop every cached token of a user"""
+        with self._lock:
+            for key in list(self._by_user.get(str(user_id), ())):
+                self._discard(key)
+            self.invalidations += 1
+            self.generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _discard(self, key: Tuple[str, str]) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[0]]
+
+
+# Process-wide cache used by the auth dependencies
+principal_cache = PrincipalCache()
@@ -1,10 +1,11 @@
 import os
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from jose import jwt
 from passlib.context import CryptContext
-from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException, status
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,8 +19,19 @@ REFRESH_TOKEN_EXPIRE_DAYS = 7
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# OAuth2 scheme
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+# bcrypt runs on its own bounded pool so logins never block the event loop
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_CONCURRENCY = int(os.getenv("HASH_MAX_CONCURRENCY", str(HASH_WORKERS * 8)))
+
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(HASH_MAX_CONCURRENCY)
+_hash_stats = {
+    "in_flight": 0,
+    "max_in_flight": 0,
+    "completed": 0,
+    "total_wait_seconds": 0.0,
+    "total_run_seconds": 0.0,
+}
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -29,6 +41,50 @@ def get_password_hash(password: str) -> str:
     """Generate a password hash"""
     return pwd_context.hash(password)
 
+async def _run_hash_job(fn, *args):
+    """Run a bcrypt call on the hashing pool, tracking queue depth and latency"""
+    enqueued = time.perf_counter()
+    _hash_stats["in_flight"] += 1
+    _hash_stats["max_in_flight"] = max(_hash_stats["max_in_flight"], _hash_stats["in_flight"])
+
+    def job():
+        started = time.perf_counter()
+        return fn(*args), started - enqueued, time.perf_counter() - started
+
+    try:
+        async with _hash_slots:
+            result, waited, ran = await asyncio.get_running_loop().run_in_executor(_hash_executor, job)
+    finally:
+        _hash_stats["in_flight"] -= 1
+
+    _hash_stats["completed"] += 1
+    _hash_stats["total_wait_seconds"] += waited
+    _hash_stats["total_run_seconds"] += ran
+    return result
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    return await _run_hash_job(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a password hash without blocking the event loop"""
+    return await _run_hash_job(pwd_context.hash, password)
+
+def hashing_stats() -> dict:
+    """Queue depth and latency counters of the hashing pool"""
+    completed = _hash_stats["completed"]
+    in_flight = _hash_stats["in_flight"]
+    return {
+        "workers": HASH_WORKERS,
+        "max_concurrency": HASH_MAX_CONCURRENCY,
+        "in_flight": in_flight,
+        "queue_depth": max(0, in_flight - HASH_WORKERS),
+        "max_queue_depth": max(0, _hash_stats["max_in_flight"] - HASH_WORKERS),
+        "completed": completed,
+        "avg_wait_ms": round(_hash_stats["total_wait_seconds"] * 1000 / completed, 3) if completed else 0.0,
+        "avg_run_ms": round(_hash_stats["total_run_seconds"] * 1000 / completed, 3) if completed else 0.0,
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -38,31 +94,3 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
-    """Dependency to get current user from JWT"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        return {"username": username, "role": payload.get("role")}
-    except JWTError:
-        raise credentials_exception
-
-async def get_current_active_user(
-    current_user: dict = Depends(get_current_user)
-):
-    """Dependency to verify user is active"""
-    # In a real app, you'd check against database
-    if current_user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User is not authenticated"
-        )
-    return current_user
\ No newline at end of file
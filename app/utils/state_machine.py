@@ -0,0 +1,63 @@
+from enum import Enum
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+from fastapi import HTTPException, status
+
+from ..models.order import OrderStatus
+from ..models.table import TableStatus
+
+
+class StateMachine:
+    """
+    Declarative transition map for a status enum.
+
+    Services apply a transition as one conditional UPDATE whose WHERE clause
+    only matches rows in one of `sources_for(target)`, so the check and the
+    write happen atomically in the database.
+    """
+
+    def __init__(self, name: str, transitions: Dict[Enum, Iterable[Enum]]):
+        self.name = name
+        self.transitions: Dict[Enum, FrozenSet[Enum]] = {
+            state: frozenset(targets) for state, targets in transitions.items()
+        }
+        self._sources: Dict[Enum, Tuple[Enum, ...]] = {}
+        for state, targets in self.transitions.items():
+            for target in targets:
+                self._sources.setdefault(target, ())
+                self._sources[target] += (state,)
+
+    def can_transition(self, current: Enum, target: Enum) -> bool:
+        return target in self.transitions.get(current, frozenset())
+
+    def sources_for(self, target: Enum) -> Tuple[Enum, ...]:
+        """States from which `target` may be entered"""
+        return self._sources.get(target, ())
+
+    def conflict(self, current: Enum, target: Enum) -> HTTPException:
+        """409 describing a rejected transition"""
+        allowed = sorted(state.value for state in self.transitions.get(current, ()))
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": f"Cannot change {self.name} status from {current.value} to {target.value}",
+                "current_status": current.value,
+                "allowed": allowed,
+            }
+        )
+
+
+ORDER_STATE_MACHINE = StateMachine("order", {
+    OrderStatus.PENDING: [OrderStatus.PREPARING, OrderStatus.CANCELLED],
+    OrderStatus.PREPARING: [OrderStatus.READY, OrderStatus.CANCELLED],
+    OrderStatus.READY: [OrderStatus.DELIVERED],
+    OrderStatus.DELIVERED: [],
+    OrderStatus.CANCELLED: [],
+})
+
+TABLE_STATE_MACHINE = StateMachine("table", {
+    TableStatus.AVAILABLE: [TableStatus.OCCUPIED, TableStatus.RESERVED, TableStatus.MAINTENANCE],
+    TableStatus.RESERVED: [TableStatus.OCCUPIED, TableStatus.AVAILABLE, TableStatus.MAINTENANCE],
+    TableStatus.OCCUPIED: [TableStatus.AVAILABLE],
+    TableStatus.MAINTENANCE: [TableStatus.AVAILABLE],
+})
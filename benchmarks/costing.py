@@ -0,0 +1,147 @@
+"""
+Recipe costing engine latency
+
+Loads app.services.costing's engine from a synthetic menu (products with
+ingredient lines, shared sub-recipes such as doughs and sauces, modifiers
+and their attach rates) and times the margin report and ingredient cost
+changes:
+
+    python -m benchmarks.costing --products 5000 --reports 2000
+
+No database is involved; only the in-process engine is measured. The menu
+is fixed by --seed.
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import uuid
+
+import numpy as np
+
+from .harness import default_database_url, prepare_environment
+from .stats import percentile
+
+CATEGORIES = ["appetizer", "main", "dessert", "beverage", "side", "alcohol"]
+
+
+def _catalog(products: int, ingredients: int, modifiers: int, rng: random.Random):
+    """(products, modifiers, ingredients, lines, components, attachments, units_sold) for CostingEngine.load"""
+    product_ids = [uuid.uuid4() for _ in range(products)]
+    modifier_ids = [uuid.uuid4() for _ in range(modifiers)]
+    ingredient_ids = [uuid.uuid4() for _ in range(ingredients)]
+    # The first 5% are preparations (doughs, sauces, stocks) used by other dishes; not on the menu
+    preparations = product_ids[:max(1, products // 20)]
+
+    product_rows = [
+        (product_id, f"Dish {index}", None if product_id in preparations else rng.choice(CATEGORIES),
+         round(rng.uniform(3, 45), 2))
+        for index, product_id in enumerate(product_ids)
+    ]
+    modifier_rows = [(modifier_id, f"Extra {index}", round(rng.uniform(0.5, 4), 2))
+                     for index, modifier_id in enumerate(modifier_ids)]
+    # A few ingredients have no known cost, as in a real stock list
+    ingredient_rows = [(ingredient_id, None if rng.random() < 0.01 else round(rng.uniform(0.002, 0.08), 4))
+                       for ingredient_id in ingredient_ids]
+
+    lines = [
+        (product_id, ingredient_id, round(rng.uniform(5, 250), 1))
+        for product_id in product_ids
+        for ingredient_id in rng.sample(ingredient_ids, rng.randint(3, 9))
+    ]
+    components = []
+    for position, product_id in enumerate(product_ids):
+        # Preparations may build on earlier ones (a sauce on a stock); dishes use up to two
+        earlier = preparations[:position] if product_id in preparations else preparations
+        for sub_recipe_id in rng.sample(earlier, min(len(earlier), rng.randint(0, 2))):
+            components.append((product_id, None, sub_recipe_id, None, round(rng.uniform(0.1, 0.5), 2)))
+    for modifier_id in modifier_ids:
+        for ingredient_id in rng.sample(ingredient_ids, rng.randint(1, 3)):
+            components.append((None, modifier_id, None, ingredient_id, round(rng.uniform(5, 60), 1)))
+
+    units_sold = [(product_id, rng.randint(10, 500)) for product_id in product_ids]
+    sold = dict(units_sold)
+    attachments = [
+        (product_id, modifier_id, rng.randint(1, sold[product_id] // 2 + 1))
+        for product_id in rng.sample(product_ids, products // 2)
+        for modifier_id in rng.sample(modifier_ids, rng.randint(1, 4))
+    ]
+    return product_rows, modifier_rows, ingredient_rows, lines, components, attachments, units_sold
+
+
+def _timed(fn, samples):
+    started = time.perf_counter()
+    result = fn()
+    samples.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def _summary(samples) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50), 4),
+        "p99_ms": round(percentile(samples, 99), 4),
+        "max_ms": round(max(samples), 4) if samples else 0.0,
+    }
+
+
+def run(products: int, ingredients: int, modifiers: int, reports: int, page_size: int, seed: int) -> dict:
+    from app.services.costing import CostingEngine, SORT_KEYS
+
+    rng = random.Random(seed)
+    catalog = _catalog(products, ingredients, modifiers, rng)
+    engine = CostingEngine()
+    started = time.perf_counter()
+    engine.load(*catalog)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    timings = {"report": [], "cost_change": []}
+    pages = max(1, products // page_size)
+    for _ in range(reports):
+        _timed(lambda: engine.report(
+            sort=rng.choice(SORT_KEYS),
+            descending=rng.random() < 0.5,
+            offset=rng.randrange(pages) * page_size,
+            limit=page_size
+        ), timings["report"])
+
+    ingredient_ids = engine.ingredient_ids
+    recomputed = []
+    for _ in range(min(reports, 500)):
+        ingredient_id = rng.choice(ingredient_ids)
+        recomputed.append(_timed(
+            lambda: engine.set_ingredient_cost(ingredient_id, round(rng.uniform(0.002, 0.08), 4)),
+            timings["cost_change"]
+        ))
+
+    return {
+        "products": products,
+        "page_size": page_size,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "load_ms": round(load_ms, 1),
+        "engine": engine.stats(),
+        "owners_per_cost_change": round(sum(recomputed) / len(recomputed), 1) if recomputed else 0,
+        "latency": {kind: _summary(samples) for kind, samples in timings.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--ingredients", type=int, default=400)
+    parser.add_argument("--modifiers", type=int, default=200)
+    parser.add_argument("--reports", type=int, default=2000, help="margin report pages requested")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Importing app builds the database engine, even though the costing engine never uses it
+    prepare_environment(default_database_url())
+    print(json.dumps(run(args.products, args.ingredients, args.modifiers, args.reports, args.page_size, args.seed),
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
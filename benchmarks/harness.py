@@ -0,0 +1,164 @@
+"""
+In-process benchmark harness
+
+Drives the real FastAPI ``app`` through httpx's ASGI transport, so no server
+or network is involved. The database is a local stand-in: a throwaway
+Postgres when ``--database-url``/``BENCH_DATABASE_URL`` points at one,
+otherwise a SQLite file through aiosqlite.
+
+The environment has to be prepared before ``app`` is imported, because
+app.database builds its engine at import time.
+"""
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import List
+from uuid import UUID
+
+from .stats import LatencyRecorder
+
+
+def default_database_url() -> str:
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url:
+        return url
+    path = os.path.join(tempfile.mkdtemp(prefix="restaurant-bench-"), "bench.db")
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def prepare_environment(database_url: str) -> None:
+    """Point the app at the benchmark database; must run before importing app"""
+    os.environ.pop("TESTING", None)
+    os.environ.pop("DATABASE_REPLICA_URL", None)
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SQL_DEBUG_HEADERS", "false")
+
+
+@dataclass
+class BenchContext:
+    """Fixture ids and credentials shared by the scenarios"""
+    token: str
+    staff_id: UUID
+    table_ids: List[UUID] = field(default_factory=list)
+    client_ids: List[UUID] = field(default_factory=list)
+    product_ids: List[UUID] = field(default_factory=list)
+    order_ids: List[UUID] = field(default_factory=list)
+    rng: random.Random = field(default_factory=lambda: random.Random(42))
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def create_schema(reset: bool = True) -> None:
+    from app.database import init_db, drop_db
+    import app.main  # noqa: F401  registers every mapped class on Base.metadata
+
+    if reset:
+        await drop_db()
+    await init_db()
+
+
+async def seed_fixtures(tables: int = 30, clients: int = 200, products: int = 60) -> BenchContext:
+    """Create the staff user, tables, clients and menu the scenarios need"""
+    from app.database import AsyncSessionLocal
+    from app.models.user import User, UserRole
+    from app.models.menu import MenuProductCreate, MenuCategory
+    from app.schemas import ClientCreate
+    from app.services.auth import create_access_token
+    from app.services.client_service import create_client
+    from app.services.menu_service import create_product
+    from app.services.table_service import create_table
+    from app.utils.security import get_password_hash
+
+    rng = random.Random(7)
+    async with AsyncSessionLocal() as db:
+        staff = User(
+            username="bench-admin",
+            email="bench-admin@example.com",
+            hashed_password=get_password_hash("bench"),
+            role=UserRole.ADMIN,
+            is_active=True
+        )
+        db.add(staff)
+        await db.flush()
+
+        table_ids = []
+        for number in range(1, tables + 1):
+            table = await create_table(db, {"table_number": str(number), "capacity": rng.choice([2, 4, 6])})
+            table_ids.append(table.table_id)
+
+        client_ids = []
+        for index in range(clients):
+            client = await create_client(db, ClientCreate(name=f"Guest {index}", phone=f"555-{index:04d}"))
+            client_ids.append(client.client_id)
+
+        product_ids = []
+        categories = list(MenuCategory)
+        for index in range(products):
+            product = await create_product(db, MenuProductCreate(
+                name=f"Dish {index}",
+                price=round(rng.uniform(4, 38), 2),
+                category=rng.choice(categories),
+                preparation_time=rng.choice([5, 10, 15, 20, 25]),
+            ))
+            product_ids.append(product.product_id)
+
+        await db.commit()
+        staff_id = staff.user_id
+
+    token = create_access_token({"sub": "bench-admin", "user_id": str(staff_id), "role": UserRole.ADMIN.value})
+    return BenchContext(
+        token=token,
+        staff_id=staff_id,
+        table_ids=table_ids,
+        client_ids=client_ids,
+        product_ids=product_ids
+    )
+
+
+class TimedClient:
+    """httpx client wrapper that records latency per route label"""
+
+    def __init__(self, client, recorder: LatencyRecorder, headers: dict):
+        self.client = client
+        self.recorder = recorder
+        self.headers = headers
+
+    async def request(self, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        self.recorder.record(label, (time.perf_counter() - started) * 1000, response.status_code < 400)
+        return response
+
+
+async def run_scenario(scenario, ctx: BenchContext, users: int, duration: float, warmup: float = 1.0) -> dict:
+    """Run `users` virtual users through a scenario for `duration` seconds"""
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            if warmup > 0:
+                warm = LatencyRecorder()
+                await _drive(scenario, TimedClient(client, warm, ctx.headers), ctx, users, warmup)
+
+            recorder = LatencyRecorder()
+            await _drive(scenario, TimedClient(client, recorder, ctx.headers), ctx, users, duration)
+            recorder.stop()
+    return recorder.summary()
+
+
+async def _drive(scenario, timed: TimedClient, ctx: BenchContext, users: int, duration: float) -> None:
+    import asyncio
+
+    deadline = time.perf_counter() + duration
+
+    async def virtual_user():
+        while time.perf_counter() < deadline:
+            await scenario(timed, ctx)
+
+    await asyncio.gather(*(virtual_user() for _ in range(users)))
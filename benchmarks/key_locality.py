@@ -0,0 +1,150 @@
+"""
+Primary key locality benchmark: uuid4 vs time-ordered UUIDv7
+
+    python -m benchmarks.key_locality --rows 500000
+    python -m benchmarks.key_locality --database-url postgresql+asyncpg://localhost/bench --rows 2000000
+
+Inserts the same order-shaped rows into two identical tables, one keyed by
+uuid4 and one by app.utils.ids.uuid7, in small committed batches like the
+live order workload. Reports insert throughput, the size of each primary key
+index and, on Postgres, the WAL written per table. Random keys split pages
+all over the index; time-ordered keys fill the rightmost page.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, Uuid, text
+
+from .harness import default_database_url, prepare_environment
+
+metadata = MetaData()
+
+
+def _order_table(name: str) -> Table:
+    return Table(
+        name, metadata,
+        Column("order_id", Uuid(as_uuid=True), primary_key=True),
+        Column("table_id", Integer, nullable=False),
+        Column("status", String(20), nullable=False),
+        Column("total_amount", Float, nullable=False),
+        Column("order_time", DateTime, nullable=False),
+    )
+
+
+TABLES = {
+    "uuid4": _order_table("bench_keys_uuid4"),
+    "uuid7": _order_table("bench_keys_uuid7"),
+}
+
+
+def _rows(count: int, seed: int):
+    rng = random.Random(seed)
+    moment = datetime(2024, 1, 1, 11)
+    for _ in range(count):
+        moment += timedelta(milliseconds=rng.randint(1, 400))
+        yield {
+            "table_id": rng.randint(1, 40),
+            "status": "delivered",
+            "total_amount": round(rng.uniform(8, 180), 2),
+            "order_time": moment,
+        }
+
+
+async def _index_bytes(conn, table: Table):
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        return await conn.scalar(text(f"SELECT pg_relation_size('{table.name}_pkey')"))
+    if dialect == "sqlite":
+        try:
+            return await conn.scalar(
+                text("SELECT SUM(pgsize) FROM dbstat WHERE name = :name"),
+                {"name": f"sqlite_autoindex_{table.name}_1"}
+            )
+        except Exception:
+            return None  # SQLite built without the dbstat table
+    return None
+
+
+async def _wal_position(conn):
+    if conn.dialect.name != "postgresql":
+        return None
+    return await conn.scalar(text("SELECT pg_current_wal_insert_lsn()"))
+
+
+async def _load(engine, scheme: str, rows: int, batch: int, seed: int) -> dict:
+    from app.utils.ids import uuid7
+
+    table = TABLES[scheme]
+    new_id = uuid7 if scheme == "uuid7" else uuid.uuid4
+
+    async with engine.connect() as conn:
+        wal_start = await _wal_position(conn)
+
+    started = time.perf_counter()
+    pending = []
+    for row in _rows(rows, seed):
+        pending.append({**row, "order_id": new_id()})
+        if len(pending) >= batch:
+            async with engine.begin() as conn:
+                await conn.execute(table.insert(), pending)
+            pending = []
+    if pending:
+        async with engine.begin() as conn:
+            await conn.execute(table.insert(), pending)
+    elapsed = time.perf_counter() - started
+
+    async with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text(f"ANALYZE {table.name}"))
+        index_bytes = await _index_bytes(conn, table)
+        wal_end = await _wal_position(conn)
+        wal_bytes = None
+        if wal_start is not None:
+            wal_bytes = await conn.scalar(text("SELECT pg_wal_lsn_diff(:end, :start)"),
+                                          {"end": wal_end, "start": wal_start})
+
+    return {
+        "rows": rows,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(rows / elapsed),
+        "pk_index_mb": round(index_bytes / 1024 / 1024, 2) if index_bytes is not None else None,
+        "wal_mb": round(float(wal_bytes) / 1024 / 1024, 2) if wal_bytes is not None else None,
+    }
+
+
+async def run(rows: int, batch: int, seed: int) -> dict:
+    from app.database import engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+
+    results = {}
+    for scheme in TABLES:
+        results[scheme] = await _load(engine, scheme, rows, batch, seed)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+    await engine.dispose()
+    return {"database": engine.dialect.name, "batch": batch, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=50, help="rows per committed transaction")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", default=None, help="defaults to BENCH_DATABASE_URL or a temporary SQLite file")
+    args = parser.parse_args()
+
+    prepare_environment(args.database_url or default_database_url())
+    print(json.dumps(asyncio.run(run(args.rows, args.batch, args.seed)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Login throughput benchmark
+
+Runs a burst of bcrypt password checks (a shift of staff logging in at once)
+while a steady stream of non-auth requests hits the in-process app, and
+reports the latency percentiles of those non-auth requests.
+
+    python -m benchmarks.login_throughput --logins 200 --mode both
+
+``inline`` verifies passwords on the event loop (the old behaviour),
+``executor`` goes through the bounded hashing pool in app.utils.security.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.main import app
+from app.utils import security
+
+from .stats import percentile
+
+
+async def _login_burst(mode: str, logins: int, concurrency: int, hashed: str):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_login():
+        async with semaphore:
+            if mode == "inline":
+                security.verify_password("correct horse", hashed)
+                await asyncio.sleep(0)
+            else:
+                await security.verify_password_async("correct horse", hashed)
+
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list, interval: float):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def run(mode: str, logins: int, concurrency: int, interval: float) -> dict:
+    hashed = security.get_password_hash("correct horse")
+    latencies = []
+    stop = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        probe = asyncio.create_task(_probe(client, stop, latencies, interval))
+        started = time.perf_counter()
+        await _login_burst(mode, logins, concurrency, hashed)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    return {
+        "mode": mode,
+        "logins": logins,
+        "logins_per_sec": round(logins / elapsed, 2),
+        "probe_requests": len(latencies),
+        "probe_p50_ms": round(percentile(latencies, 50), 3),
+        "probe_p99_ms": round(percentile(latencies, 99), 3),
+        "probe_max_ms": round(max(latencies, default=0.0), 3),
+        "hashing": security.hashing_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between probe requests")
+    parser.add_argument("--mode", choices=["inline", "executor", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["inline", "executor"] if args.mode == "both" else [args.mode]
+    results = [asyncio.run(run(mode, args.logins, args.concurrency, args.interval)) for mode in modes]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Menu search index latency
+
+Builds app.services.menu_search's index over a synthetic menu and times
+autocomplete-style lookups (every prefix of a dish name as it is typed),
+multi-word queries and misspellings, plus single-product updates:
+
+    python -m benchmarks.menu_search --products 3000 --queries 20000
+
+No database is involved; only the in-process index is measured. The menu and
+queries are fixed by --seed; "uncached_latency" leaves out the repeated
+queries answered from the index's result cache.
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+
+from .harness import default_database_url, prepare_environment
+from .stats import percentile
+
+DISHES = (
+    "pizza margherita pepperoni burger cheeseburger salad caesar soup minestrone chowder wings fries "
+    "bread focaccia bruschetta pasta carbonara bolognese lasagna risotto gnocchi ravioli tiramisu "
+    "cheesecake brownie sundae lemonade coffee espresso cappuccino latte tea beer lager stout wine "
+    "mojito negroni spritz steak ribeye sirloin salmon tuna sushi sashimi ramen udon curry korma "
+    "tacos burrito quesadilla nachos falafel hummus shawarma kebab gyro paella tapas omelette pancakes "
+    "waffles bagel croissant muffin scone brisket pulled pork meatballs calamari oysters mussels lobster"
+).split()
+WORDS = (
+    "grilled roasted smoked crispy spicy fresh house classic vegan garlic lemon herb truffle basil "
+    "tomato mushroom onion pepper chili honey mustard parmesan mozzarella cheddar feta avocado bacon "
+    "chicken beef lamb shrimp tofu spinach rocket olive sesame ginger coconut mango berry chocolate "
+    "vanilla caramel almond pistachio hazelnut sourdough seasonal homemade slow braised charred"
+).split()
+CATEGORIES = ["appetizer", "main", "dessert", "beverage", "side", "alcohol", "breakfast", "lunch", "dinner"]
+
+
+def _menu(count: int, rng: random.Random):
+    for index in range(count):
+        name = " ".join(rng.sample(WORDS, rng.randint(0, 2)) + [rng.choice(DISHES)]).title()
+        yield {
+            "product_id": uuid.uuid4(),
+            "name": name,
+            "description": " ".join(rng.sample(WORDS, rng.randint(4, 10))),
+            "product_code": f"M{index:05d}",
+            "category": rng.choice(CATEGORIES),
+            "price": round(rng.uniform(3, 45), 2),
+            "is_available": rng.random() < 0.85,
+        }
+
+
+def _misspell(word: str, rng: random.Random) -> str:
+    if len(word) < 5:
+        return word
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1:]
+
+
+def _timed(fn, samples):
+    started = time.perf_counter()
+    result = fn()
+    samples.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def _summary(samples) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50), 4),
+        "p99_ms": round(percentile(samples, 99), 4),
+        "max_ms": round(max(samples), 4) if samples else 0.0,
+    }
+
+
+def run(products: int, queries: int, seed: int) -> dict:
+    from app.services.menu_search import MenuSearchIndex
+
+    rng = random.Random(seed)
+    menu = list(_menu(products, rng))
+    index = MenuSearchIndex()
+    started = time.perf_counter()
+    index.load(menu)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    timings = {"prefix": [], "multi_word": [], "misspelled": [], "update": []}
+    # Repeated queries are answered from the result cache; these are the ones that weren't
+    uncached = {"prefix": [], "multi_word": [], "misspelled": []}
+    empty = 0
+    for _ in range(queries):
+        product = rng.choice(menu)
+        words = product["name"].lower().split()
+        kind = rng.choice(("prefix", "multi_word", "misspelled"))
+        if kind == "prefix":
+            word = words[-1]
+            query = word[:rng.randint(1, len(word))]
+        elif kind == "multi_word":
+            query = " ".join(word[:rng.randint(2, len(word))] for word in words)
+        else:
+            query = _misspell(words[-1], rng)
+        cache_hits = index.cache_hits
+        if not _timed(lambda: index.search(query, limit=10), timings[kind]):
+            empty += 1
+        if index.cache_hits == cache_hits:
+            uncached[kind].append(timings[kind][-1])
+
+    for product in rng.sample(menu, min(products, 500)):
+        changed = {**product, "is_available": not product["is_available"], "name": product["name"] + " Special"}
+        _timed(lambda: index.upsert(changed), timings["update"])
+
+    return {
+        "products": products,
+        "load_ms": round(load_ms, 1),
+        "index": index.stats(),
+        "queries_without_results": empty,
+        "latency": {kind: _summary(samples) for kind, samples in timings.items()},
+        "uncached_latency": {kind: _summary(samples) for kind, samples in uncached.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Importing app builds the database engine, even though the index never uses it
+    prepare_environment(default_database_url())
+    print(json.dumps(run(args.products, args.queries, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Parallel order number allocation check
+
+Simulates several API workers (separate allocators sharing one database),
+each serving many concurrent order creations, and verifies that every
+number handed out is unique and that each day starts again from 1:
+
+    python -m benchmarks.order_numbers --workers 8 --concurrency 50 --per-task 40
+    python -m benchmarks.order_numbers --database-url postgresql+asyncpg://localhost/bench --block-size 100
+
+Reports allocation throughput, database round trips (blocks reserved) and
+the numbers skipped at the end of partly used blocks. Exits non-zero on a
+duplicate or a day that doesn't restart at 1.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from .harness import default_database_url, prepare_environment
+
+
+async def _prepare(db_engine, days):
+    from sqlalchemy import delete
+    from app.models.order_number import OrderNumberCounter
+
+    table = OrderNumberCounter.__table__
+    async with db_engine.begin() as conn:
+        await conn.run_sync(table.create, checkfirst=True)
+        await conn.execute(delete(table).where(table.c.business_date.in_(days)))
+
+
+async def run(workers: int, concurrency: int, per_task: int, block_size: int, days: int) -> dict:
+    from app.database import engine
+    from app.services.order_numbers import OrderNumberAllocator
+
+    business_days = [date.today() + timedelta(days=offset) for offset in range(days)]
+    await _prepare(engine, business_days)
+    allocators = [OrderNumberAllocator(engine, block_size=block_size, location="") for _ in range(workers)]
+    issued = {day: [] for day in business_days}
+
+    async def task(allocator, day):
+        for _ in range(per_task):
+            issued[day].append(await allocator.next_sequence(day))
+
+    started = time.perf_counter()
+    for day in business_days:
+        await asyncio.gather(*(
+            task(allocator, day) for allocator in allocators for _ in range(concurrency)
+        ))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    anomalies = []
+    per_day = {}
+    for day, numbers in issued.items():
+        duplicates = [number for number, count in Counter(numbers).items() if count > 1]
+        if duplicates:
+            anomalies.append(f"{day}: {len(duplicates)} duplicate numbers, e.g. {sorted(duplicates)[:5]}")
+        if min(numbers) != 1:
+            anomalies.append(f"{day}: first number is {min(numbers)}, expected 1")
+        per_day[str(day)] = {
+            "issued": len(numbers),
+            "highest": max(numbers),
+            "skipped": max(numbers) - len(set(numbers)),
+        }
+
+    total = sum(len(numbers) for numbers in issued.values())
+    blocks = sum(allocator.blocks_reserved for allocator in allocators)
+    return {
+        "workers": workers,
+        "concurrency_per_worker": concurrency,
+        "block_size": block_size,
+        "numbers_issued": total,
+        "numbers_per_sec": round(total / elapsed),
+        "blocks_reserved": blocks,
+        "numbers_per_round_trip": round(total / blocks, 1) if blocks else None,
+        "days": per_day,
+        "anomalies": anomalies,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8, help="simulated API processes")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent requests per worker")
+    parser.add_argument("--per-task", type=int, default=40, help="numbers each request allocates")
+    parser.add_argument("--block-size", type=int, default=20)
+    parser.add_argument("--days", type=int, default=2, help="consecutive business days, to check the daily reset")
+    parser.add_argument("--database-url", default=None, help="defaults to BENCH_DATABASE_URL or a temporary SQLite file")
+    args = parser.parse_args()
+
+    prepare_environment(args.database_url or default_database_url())
+    report = asyncio.run(run(args.workers, args.concurrency, args.per_task, args.block_size, args.days))
+    print(json.dumps(report, indent=2))
+    if report["anomalies"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
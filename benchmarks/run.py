@@ -0,0 +1,106 @@
+"""
+Run the offline benchmark suite
+
+    python -m benchmarks.run                              # all scenarios, SQLite stand-in
+    python -m benchmarks.run dinner_rush --users 20 --duration 30
+    python -m benchmarks.run --database-url postgresql+asyncpg://localhost/bench
+    python -m benchmarks.run --compare benchmarks/results/previous.json
+
+Results (requests/sec and latency percentiles per route) are written as JSON
+to benchmarks/results/ so runs can be compared over time.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+from .harness import default_database_url, prepare_environment
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def _run(args, database_url: str) -> dict:
+    from .harness import create_schema, seed_fixtures, run_scenario
+    from .scenarios import SCENARIOS
+
+    await create_schema(reset=True)
+    ctx = await seed_fixtures()
+
+    names = args.scenarios or list(SCENARIOS)
+    results = {}
+    for name in names:
+        results[name] = await run_scenario(SCENARIOS[name], ctx, users=args.users, duration=args.duration,
+                                           warmup=args.warmup)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "database": database_url.split("://", 1)[0],
+            "python": platform.python_version(),
+            "users": args.users,
+            "duration_seconds": args.duration,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(previous: dict, current: dict) -> None:
+    """Print per-route throughput and p99 changes against an earlier run"""
+    for name, scenario in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        print(f"\n{name}")
+        for route, stats in scenario["routes"].items():
+            old = before["routes"].get(route)
+            if not old:
+                continue
+            rps_change = (stats["requests_per_sec"] / old["requests_per_sec"] - 1) * 100 if old["requests_per_sec"] else 0.0
+            print(f"  {route:<40} rps {old['requests_per_sec']:>9} -> {stats['requests_per_sec']:<9} ({rps_change:+.1f}%)"
+                  f"  p99 {old['p99_ms']:>8} -> {stats['p99_ms']} ms")
+
+
+def main():
+    from .scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds per scenario")
+    parser.add_argument("--database-url", default=None, help="defaults to BENCH_DATABASE_URL or a temporary SQLite file")
+    parser.add_argument("--output", default=None, help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result file to compare against")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    database_url = args.database_url or default_database_url()
+    prepare_environment(database_url)
+    report = asyncio.run(_run(args, database_url))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(json.dumps(report["scenarios"], indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(json.load(handle), report)
+
+
+if __name__ == "__main__":
+    main()
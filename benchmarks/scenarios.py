@@ -0,0 +1,80 @@
+"""
+Scripted benchmark scenarios
+
+Each scenario is one iteration of a realistic interaction, issued through a
+TimedClient so every request is recorded under a stable route label.
+"""
+
+
+async def dinner_rush(http, ctx):
+    """A server opens a ticket and adds a few items to it"""
+    rng = ctx.rng
+    response = await http.request("POST /orders/", "POST", "/orders/", json={
+        "table_id": str(rng.choice(ctx.table_ids)),
+        "client_id": str(rng.choice(ctx.client_ids)) if rng.random() < 0.3 else None,
+        "items": [],
+    })
+    if response.status_code >= 400:
+        return
+    order_id = response.json()["order_id"]
+    ctx.order_ids.append(order_id)
+    for _ in range(rng.randint(1, 4)):
+        await http.request("POST /orders/{order_id}/items", "POST", f"/orders/{order_id}/items", json={
+            "product_id": str(rng.choice(ctx.product_ids)),
+            "quantity": rng.randint(1, 3),
+        })
+
+
+async def kitchen_polling(http, ctx):
+    """A kitchen screen refreshes its queue and bumps a ticket now and then"""
+    response = await http.request("GET /orders/kitchen", "GET", "/orders/kitchen")
+    if response.status_code >= 400 or ctx.rng.random() > 0.2:
+        return
+    orders = response.json()
+    if orders:
+        ticket = ctx.rng.choice(orders)
+        next_status = "preparing" if ticket["status"] == "pending" else "ready"
+        await http.request("PUT /orders/{order_id}/status", "PUT", f"/orders/{ticket['order_id']}/status",
+                           params={"new_status": next_status})
+
+
+async def payment_closeout(http, ctx):
+    """A table pays, then a manager glances at the daily report"""
+    if not ctx.order_ids:
+        await dinner_rush(http, ctx)
+        return
+    order_id = ctx.rng.choice(ctx.order_ids)
+    await http.request("GET /orders/{order_id}", "GET", f"/orders/{order_id}")
+    await http.request("POST /payments/", "POST", "/payments/", json={
+        "order_id": str(order_id),
+        "amount": round(ctx.rng.uniform(15, 180), 2),
+        "payment_method": ctx.rng.choice(["cash", "card", "card", "online"]),
+    })
+    if ctx.rng.random() < 0.1:
+        await http.request("GET /payments/reports/daily", "GET", "/payments/reports/daily")
+
+
+async def reservation_booking(http, ctx):
+    """A host checks availability for a table and books a slot"""
+    from datetime import datetime, timedelta
+
+    rng = ctx.rng
+    table_id = str(rng.choice(ctx.table_ids))
+    day = datetime.now() + timedelta(days=rng.randint(1, 21))
+    await http.request("GET /reservations/available-times", "GET", "/reservations/available-times",
+                       params={"table_id": table_id, "date": day.date().isoformat(), "duration": 90})
+    start = day.replace(hour=rng.randint(12, 21), minute=rng.choice([0, 15, 30, 45]), second=0, microsecond=0)
+    await http.request("POST /reservations/", "POST", "/reservations/", json={
+        "client_id": str(rng.choice(ctx.client_ids)),
+        "table_id": table_id,
+        "reservation_time": start.isoformat(),
+        "duration_minutes": 90,
+    })
+
+
+SCENARIOS = {
+    "dinner_rush": dinner_rush,
+    "kitchen_polling": kitchen_polling,
+    "payment_closeout": payment_closeout,
+    "reservation_booking": reservation_booking,
+}
@@ -0,0 +1,435 @@
+"""
+Synthetic data generator for production-scale volumes
+
+    python -m benchmarks.seed_data --database-url postgresql+asyncpg://localhost/bench --orders 10000000
+    python -m benchmarks.seed_data --orders 200000 --days 90 --seed 7
+
+Rows are generated from the mapped tables in app.schemas and written in
+chunks: COPY (asyncpg copy_records_to_table) on Postgres, executemany
+INSERTs elsewhere. The per-row create_* services are deliberately bypassed.
+
+The data is reproducible for a given --seed and shaped like a real
+restaurant: lunch and dinner peaks, busier weekends, a mild summer high,
+Zipf-skewed dish popularity and denser reservations on Fridays/Saturdays.
+Activity rows get time-ordered (UUIDv7) keys stamped with their own time, as
+the app generates them; pass --id-scheme uuid4 to reproduce random keys.
+"""
+import argparse
+import asyncio
+import bisect
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Relative order volume by weekday (Monday first) and by hour of day
+WEEKDAY_WEIGHTS = [0.80, 0.85, 0.95, 1.05, 1.35, 1.45, 1.10]
+HOUR_WEIGHTS = {
+    11: 0.6, 12: 1.6, 13: 1.5, 14: 0.7, 15: 0.3, 16: 0.3,
+    17: 0.8, 18: 1.5, 19: 2.0, 20: 1.8, 21: 1.0, 22: 0.4,
+}
+ITEMS_PER_ORDER = ([1, 2, 3, 4, 5, 6], [0.18, 0.30, 0.24, 0.15, 0.08, 0.05])
+PAYMENT_METHODS = (["card", "cash", "online", "voucher"], [0.68, 0.18, 0.12, 0.02])
+CATEGORIES = ["appetizer", "main", "dessert", "beverage", "side", "alcohol"]
+UNITS = ["g", "kg", "ml", "l", "unit"]
+
+
+class BulkWriter:
+    """Buffers rows for one table and writes them in chunks"""
+
+    def __init__(self, conn, table, chunk_size: int, use_copy: bool):
+        self.conn = conn
+        self.table = table
+        self.chunk_size = chunk_size
+        self.use_copy = use_copy
+        self.columns = None
+        self.processors = None
+        self.rows = []
+        self.written = 0
+
+    async def add(self, row: dict):
+        if self.columns is None:
+            self.columns = [name for name in row if name in self.table.c]
+        self.rows.append(row)
+        if len(self.rows) >= self.chunk_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.rows:
+            return
+        if self.use_copy:
+            # COPY bypasses SQLAlchemy, so apply the column types' bind processing (enums, JSON) here
+            if self.processors is None:
+                dialect = self.conn.dialect
+                self.processors = [self.table.c[name].type.bind_processor(dialect) for name in self.columns]
+            raw = await self.conn.get_raw_connection()
+            records = [
+                tuple(
+                    process(row.get(name)) if process else row.get(name)
+                    for name, process in zip(self.columns, self.processors)
+                )
+                for row in self.rows
+            ]
+            await raw.driver_connection.copy_records_to_table(
+                self.table.name, records=records, columns=self.columns
+            )
+        else:
+            rows = [{name: row.get(name) for name in self.columns} for row in self.rows]
+            await self.conn.execute(self.table.insert(), rows)
+        self.written += len(self.rows)
+        self.rows = []
+
+
+class SyntheticRestaurant:
+    """Reproducible generator of restaurant activity"""
+
+    def __init__(self, seed: int, products: int, ingredients: int, clients: int, tables: int, staff: int,
+                 id_scheme: str = "uuid7"):
+        # app is imported here, not at module level: prepare_environment has to set DATABASE_URL first
+        from app.utils.helpers import generate_order_number
+        from app.utils.ids import uuid7_at
+
+        self._uuid7_at = uuid7_at
+        self._order_number = generate_order_number
+        self.rng = random.Random(seed)
+        self.id_scheme = id_scheme
+        self.product_count = products
+        self.ingredient_count = ingredients
+        self.client_count = clients
+        self.table_count = tables
+        self.staff_count = staff
+        self.products = []
+        self.ingredients = []
+        self.client_ids = []
+        self.table_ids = []
+        self.staff_ids = []
+        self._popularity = []
+
+    def new_id(self, moment: datetime = None) -> uuid.UUID:
+        if moment is not None and self.id_scheme == "uuid7":
+            return self._uuid7_at(moment, self.rng.getrandbits(74))
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    # Reference data
+
+    def staff_rows(self):
+        from app.models.user import UserRole
+
+        for index in range(self.staff_count):
+            user_id = self.new_id()
+            self.staff_ids.append(user_id)
+            yield {
+                "user_id": user_id,
+                "username": f"staff{index:03d}",
+                "email": f"staff{index:03d}@example.com",
+                "hashed_password": "!",  # cannot log in
+                "role": UserRole.MANAGER if index < 3 else UserRole.STAFF,
+                "is_active": True,
+            }
+
+    def table_rows(self):
+        for number in range(1, self.table_count + 1):
+            table_id = self.new_id()
+            self.table_ids.append(table_id)
+            yield {
+                "table_id": table_id,
+                "table_number": str(number),
+                "capacity": self.rng.choice([2, 2, 4, 4, 4, 6, 8]),
+                "status": "available",
+                "is_reserved": False,
+            }
+
+    def client_rows(self, start: datetime):
+        for index in range(self.client_count):
+            client_id = self.new_id()
+            self.client_ids.append(client_id)
+            joined = start + timedelta(minutes=self.rng.randint(0, 525600))
+            yield {
+                "client_id": client_id,
+                "name": f"Guest {index}",
+                "phone": f"+1555{index:07d}",
+                "email": f"guest{index}@example.com",
+                "loyalty_points": self.rng.randint(0, 500),
+                "marketing_opt_in": self.rng.random() < 0.35,
+                "created_at": joined,
+                "updated_at": joined,
+            }
+
+    def ingredient_rows(self):
+        for index in range(self.ingredient_count):
+            ingredient_id = self.new_id()
+            row = {
+                "ingredient_id": ingredient_id,
+                "name": f"Ingredient {index}",
+                "unit_of_measure": self.rng.choice(UNITS),
+                "current_stock": round(self.rng.uniform(50, 5000), 2),
+                "minimum_stock": round(self.rng.uniform(10, 200), 2),
+                "cost_per_unit": round(self.rng.uniform(0.01, 12), 4),
+                "is_active": True,
+            }
+            self.ingredients.append(row)
+            yield row
+
+    def product_rows(self, created: datetime):
+        for index in range(self.product_count):
+            product_id = self.new_id()
+            row = {
+                "product_id": product_id,
+                "name": f"Dish {index}",
+                "description": f"House dish number {index}",
+                "price": round(self.rng.uniform(3.5, 42), 2),
+                "category": self.rng.choice(CATEGORIES),
+                "preparation_time": self.rng.choice([3, 5, 10, 15, 20, 25, 30]),
+                "is_available": self.rng.random() > 0.03,
+                "is_made_in_house": True,
+                "product_code": f"P{index:05d}",
+                "created_at": created,
+                "updated_at": created,
+            }
+            self.products.append(row)
+            yield row
+
+        # Zipf-like popularity: a handful of dishes dominate the tickets
+        weights = [1 / (rank ** 1.1) for rank in range(1, self.product_count + 1)]
+        self.rng.shuffle(weights)
+        total = 0.0
+        self._popularity = []
+        for weight in weights:
+            total += weight
+            self._popularity.append(total)
+
+    def recipe_rows(self):
+        for product in self.products:
+            for ingredient in self.rng.sample(self.ingredients, k=min(len(self.ingredients), self.rng.randint(2, 8))):
+                yield {
+                    "product_id": product["product_id"],
+                    "ingredient_id": ingredient["ingredient_id"],
+                    "quantity_required": round(self.rng.uniform(0.01, 0.4), 3),
+                }
+
+    # Activity
+
+    def pick_product(self) -> dict:
+        point = self.rng.random() * self._popularity[-1]
+        return self.products[bisect.bisect_left(self._popularity, point)]
+
+    def daily_order_counts(self, start: datetime, days: int, total_orders: int):
+        weights = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            seasonal = 1 + 0.1 * math.sin(2 * math.pi * (day.timetuple().tm_yday - 80) / 365)
+            weights.append(WEEKDAY_WEIGHTS[day.weekday()] * seasonal)
+        scale = total_orders / sum(weights)
+        counts = [int(weight * scale) for weight in weights]
+        counts[-1] += total_orders - sum(counts)
+        return counts
+
+    def order_time(self, day: datetime) -> datetime:
+        hours = list(HOUR_WEIGHTS)
+        hour = self.rng.choices(hours, weights=list(HOUR_WEIGHTS.values()))[0]
+        return day.replace(hour=hour, minute=self.rng.randint(0, 59), second=self.rng.randint(0, 59))
+
+    def orders_for_day(self, day: datetime, count: int, is_today: bool):
+        """Yield (order, items, payment) tuples for one business day"""
+        for sequence in range(1, count + 1):
+            placed = self.order_time(day)
+            order_id = self.new_id(placed)
+            items = []
+            total = 0.0
+            item_count = self.rng.choices(*ITEMS_PER_ORDER)[0]
+            for _ in range(item_count):
+                product = self.pick_product()
+                quantity = 1 if self.rng.random() < 0.85 else self.rng.randint(2, 4)
+                total += product["price"] * quantity
+                items.append({
+                    "item_id": self.new_id(placed),
+                    "order_id": order_id,
+                    "product_id": product["product_id"],
+                    "quantity": quantity,
+                    "unit_price": product["price"],
+                    "order_time": placed,
+                })
+
+            if is_today:
+                status = self.rng.choice(["pending", "preparing", "ready", "delivered"])
+            else:
+                status = "cancelled" if self.rng.random() < 0.04 else "delivered"
+            paid = status == "delivered"
+            order = {
+                "order_id": order_id,
+                "order_number": self._order_number(sequence, day.date()),
+                "table_id": self.rng.choice(self.table_ids),
+                "client_id": self.rng.choice(self.client_ids) if self.client_ids and self.rng.random() < 0.3 else None,
+                "server_id": self.rng.choice(self.staff_ids),
+                "order_time": placed,
+                "status": status,
+                "total_amount": round(total, 2),
+                "payment_status": "paid" if paid else "unpaid",
+                "created_at": placed,
+                "updated_at": placed,
+            }
+            payment = None
+            if paid:
+                paid_at = placed + timedelta(minutes=self.rng.randint(35, 140))
+                payment = {
+                    "payment_id": self.new_id(paid_at),
+                    "order_id": order_id,
+                    "amount": round(total, 2),
+                    "payment_method": self.rng.choices(*PAYMENT_METHODS)[0],
+                    "staff_id": order["server_id"],
+                    "transaction_time": paid_at,
+                    "is_refunded": self.rng.random() < 0.004,
+                }
+                payment["refunded_amount"] = payment["amount"] if payment["is_refunded"] else 0.0
+            yield order, items, payment
+
+    def reservations_for_day(self, day: datetime, per_day: int):
+        density = WEEKDAY_WEIGHTS[day.weekday()] ** 2
+        count = max(0, int(self.rng.gauss(per_day * density, per_day * 0.15)))
+        for _ in range(count):
+            slot = day.replace(hour=self.rng.choice([12, 13, 18, 19, 19, 20, 20, 21]),
+                               minute=self.rng.choice([0, 15, 30, 45]), second=0)
+            booked = slot - timedelta(days=self.rng.randint(0, 14), hours=self.rng.randint(0, 12))
+            yield {
+                "reservation_id": self.new_id(booked),
+                "client_id": self.rng.choice(self.client_ids),
+                "table_id": self.rng.choice(self.table_ids),
+                "reservation_time": slot,
+                "duration_minutes": self.rng.choice([60, 90, 90, 120]),
+                "created_at": booked,
+            }
+
+    def inventory_for_day(self, day: datetime):
+        for ingredient in self.ingredients:
+            used_at = day.replace(hour=23, minute=30)
+            yield {
+                "transaction_id": self.new_id(used_at),
+                "ingredient_id": ingredient["ingredient_id"],
+                "quantity": round(self.rng.uniform(1, 40), 2),
+                "transaction_type": "use",
+                "transaction_time": used_at,
+                "reference": "daily usage",
+                "staff_id": self.rng.choice(self.staff_ids),
+            }
+            if self.rng.random() < 0.3:
+                delivered_at = day.replace(hour=8, minute=self.rng.randint(0, 59))
+                yield {
+                    "transaction_id": self.new_id(delivered_at),
+                    "ingredient_id": ingredient["ingredient_id"],
+                    "quantity": round(self.rng.uniform(50, 400), 2),
+                    "transaction_type": "add",
+                    "transaction_time": delivered_at,
+                    "reference": "delivery",
+                    "staff_id": self.rng.choice(self.staff_ids),
+                }
+
+
+async def seed(args) -> dict:
+    from app.database import engine
+    from app.models.user import User
+    from app.models.client import Client
+    from app.models.order_number import OrderNumberCounter
+    from app.schemas import (
+        Table, MenuProduct, Ingredient, ProductIngredient, Order, OrderItem,
+        Payment, Reservation, InventoryTransaction
+    )
+
+    generator = SyntheticRestaurant(args.seed, args.products, args.ingredients, args.clients, args.tables, args.staff,
+                                    id_scheme=args.id_scheme)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=args.days - 1)
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "asyncpg" and not args.no_copy
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        writers = {
+            table.name: BulkWriter(conn, table, args.chunk_size, use_copy)
+            for table in (
+                User.__table__, Table.__table__, Client.__table__, Ingredient.__table__,
+                MenuProduct.__table__, ProductIngredient.__table__, Order.__table__,
+                OrderItem.__table__, Payment.__table__, Reservation.__table__,
+                InventoryTransaction.__table__, OrderNumberCounter.__table__,
+            )
+        }
+
+        async def write(table, rows):
+            writer = writers[table.__table__.name]
+            for row in rows:
+                await writer.add(row)
+            await writer.flush()
+
+        await write(User, generator.staff_rows())
+        await write(Table, generator.table_rows())
+        await write(Client, generator.client_rows(start - timedelta(days=365)))
+        await write(Ingredient, generator.ingredient_rows())
+        await write(MenuProduct, generator.product_rows(start))
+        await write(ProductIngredient, generator.recipe_rows())
+
+        orders = writers[Order.__table__.name]
+        items = writers[OrderItem.__table__.name]
+        payments = writers[Payment.__table__.name]
+        reservations = writers[Reservation.__table__.name]
+        inventory = writers[InventoryTransaction.__table__.name]
+        counters = writers[OrderNumberCounter.__table__.name]
+
+        for offset, count in enumerate(generator.daily_order_counts(start, args.days, args.orders)):
+            day = start + timedelta(days=offset)
+            for order, order_items, payment in generator.orders_for_day(day, count, day == today):
+                await orders.add(order)
+                for item in order_items:
+                    await items.add(item)
+                if payment is not None:
+                    await payments.add(payment)
+            # Today's live orders continue numbering after the seeded ones
+            await counters.add({"business_date": day.date(), "location": "", "next_value": count})
+            for reservation in generator.reservations_for_day(day, args.reservations_per_day):
+                await reservations.add(reservation)
+            for transaction in generator.inventory_for_day(day):
+                await inventory.add(transaction)
+            if offset % 30 == 29:
+                print(f"  {day:%Y-%m-%d}: {orders.written + len(orders.rows):,} orders "
+                      f"({time.perf_counter() - started:.0f}s)")
+
+        for writer in writers.values():
+            await writer.flush()
+
+    elapsed = time.perf_counter() - started
+    rows = {name: writer.written for name, writer in writers.items()}
+    return {"seconds": round(elapsed, 1), "rows": rows, "rows_per_sec": round(sum(rows.values()) / elapsed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to BENCH_DATABASE_URL or a temporary SQLite file")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--ingredients", type=int, default=150)
+    parser.add_argument("--clients", type=int, default=50_000)
+    parser.add_argument("--tables", type=int, default=40)
+    parser.add_argument("--staff", type=int, default=25)
+    parser.add_argument("--reservations-per-day", type=int, default=60)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-copy", action="store_true", help="use executemany even on Postgres")
+    parser.add_argument("--id-scheme", choices=["uuid7", "uuid4"], default="uuid7", help="primary keys of activity rows")
+    parser.add_argument("--keep-schema", action="store_true", help="append to existing tables instead of recreating them")
+    args = parser.parse_args()
+
+    from .harness import create_schema, default_database_url, prepare_environment
+
+    prepare_environment(args.database_url or default_database_url())
+
+    async def run():
+        await create_schema(reset=not args.keep_schema)
+        return await seed(args)
+
+    report = asyncio.run(run())
+    print(f"Loaded {sum(report['rows'].values()):,} rows in {report['seconds']}s ({report['rows_per_sec']:,} rows/s)")
+    for table, count in report["rows"].items():
+        print(f"  {table:<28} {count:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Latency bookkeeping shared by the benchmark scripts"""
+import time
+from collections import defaultdict
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LatencyRecorder:
+    """Collects per-route latencies (ms) and error counts"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, route: str, elapsed_ms: float, ok: bool = True):
+        self.latencies[route].append(elapsed_ms)
+        if not ok:
+            self.errors[route] += 1
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def summary(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors[route],
+                "requests_per_sec": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(samples, 50), 3),
+                "p90_ms": round(percentile(samples, 90), 3),
+                "p99_ms": round(percentile(samples, 99), 3),
+                "max_ms": round(max(samples), 3),
+            }
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "total_requests": total,
+            "requests_per_sec": round(total / elapsed, 2) if elapsed else 0.0,
+            "routes": routes,
+        }
@@ -0,0 +1,140 @@
+"""
+Concurrent status transition stress check
+
+Fires hundreds of parallel status changes at a handful of orders (several
+kitchen screens and servers tapping the same tickets at once) and checks the
+results against the order state machine:
+
+    python -m benchmarks.status_transitions --orders 20 --taps 600
+
+Every target status can be entered at most once per order (the order
+machine has no cycles), so for each order the successful transitions must
+form exactly one legal path from ``pending``, and the order's final status in
+the database must be the end of that path. Anything else - a status entered
+twice, a path that skips a step, a 5xx, a final status that disagrees - is
+reported as an anomaly and the script exits non-zero.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+from .harness import default_database_url, prepare_environment
+
+
+def _path_ends(machine, current, remaining: frozenset) -> list:
+    """Ends of every legal path from `current` that enters each status in `remaining` once"""
+    if not remaining:
+        return [current]
+    return [
+        end
+        for status in remaining if machine.can_transition(current, status)
+        for end in _path_ends(machine, status, remaining - {status})
+    ]
+
+
+def _check_path(machine, start, entered: list):
+    """Problems with the statuses an order successfully entered, and where its path ends"""
+    problems = []
+    duplicates = [status for status, count in Counter(entered).items() if count > 1]
+    if duplicates:
+        problems.append(f"entered more than once: {sorted(duplicates)}")
+
+    # pending -> preparing -> cancelled and pending -> cancelled are both legal, so
+    # the check is that exactly one ordering of the entered statuses is a path
+    ends = _path_ends(machine, start, frozenset(entered))
+    if len(ends) != 1:
+        problems.append(f"{sorted(status.value for status in set(entered))} is not one legal path from {start.value}")
+        return problems, start
+    return problems, ends[0]
+
+
+async def run(orders: int, taps: int, concurrency: int, seed: int) -> dict:
+    import httpx
+    from app.main import app
+    from app.models.order import OrderStatus
+    from app.utils.state_machine import ORDER_STATE_MACHINE
+
+    from .harness import create_schema, seed_fixtures
+
+    await create_schema(reset=True)
+    ctx = await seed_fixtures(tables=orders, clients=0, products=5)
+    rng = random.Random(seed)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=ctx.headers) as client:
+            order_ids = []
+            for table_id in ctx.table_ids:
+                response = await client.post("/orders/", json={"table_id": str(table_id), "items": []})
+                response.raise_for_status()
+                order_ids.append(response.json()["order_id"])
+
+            targets = [status for status in OrderStatus if status != OrderStatus.PENDING]
+            plan = [(rng.choice(order_ids), rng.choice(targets)) for _ in range(taps)]
+            semaphore = asyncio.Semaphore(concurrency)
+            outcomes = []
+
+            async def tap(order_id, target):
+                async with semaphore:
+                    response = await client.put(f"/orders/{order_id}/status", params={"new_status": target.value})
+                    outcomes.append((order_id, target, response.status_code))
+
+            started = time.perf_counter()
+            await asyncio.gather(*(tap(order_id, target) for order_id, target in plan))
+            elapsed = time.perf_counter() - started
+
+            final = {}
+            for order_id in order_ids:
+                response = await client.get(f"/orders/{order_id}")
+                final[order_id] = OrderStatus(response.json()["status"])
+
+    entered = defaultdict(list)
+    codes = Counter()
+    for order_id, target, code in outcomes:
+        codes[code] += 1
+        if code == 200:
+            entered[order_id].append(target)
+
+    anomalies = []
+    for code, count in codes.items():
+        if code not in (200, 409):
+            anomalies.append(f"{count} responses with status {code}")
+    for order_id in order_ids:
+        problems, end = _check_path(ORDER_STATE_MACHINE, OrderStatus.PENDING, entered[order_id])
+        if final[order_id] != end:
+            problems.append(f"final status {final[order_id].value} but last successful transition was {end.value}")
+        anomalies.extend(f"order {order_id}: {problem}" for problem in problems)
+
+    return {
+        "orders": orders,
+        "taps": taps,
+        "concurrency": concurrency,
+        "taps_per_sec": round(taps / elapsed, 2),
+        "responses": {str(code): count for code, count in sorted(codes.items())},
+        "final_statuses": dict(Counter(status.value for status in final.values())),
+        "anomalies": anomalies,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--taps", type=int, default=600, help="total status change requests")
+    parser.add_argument("--concurrency", type=int, default=200, help="requests in flight at once")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="defaults to BENCH_DATABASE_URL or a temporary SQLite file")
+    args = parser.parse_args()
+
+    prepare_environment(args.database_url or default_database_url())
+    report = asyncio.run(run(args.orders, args.taps, args.concurrency, args.seed))
+    print(json.dumps(report, indent=2))
+    if report["anomalies"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Shared fixtures: the app runs in-process against a throwaway SQLite file.
+
+The environment is set before anything under app is imported, since the
+engine is created from DATABASE_URL at import time.
+"""
+import os
+import tempfile
+
+os.environ["TESTING"] = "true"
+os.environ["TEST_DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="restaurant-tests-"), "test.db"
+)
+os.environ.pop("DATABASE_REPLICA_URL", None)
+
+import httpx
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database import AsyncSessionLocal, drop_db, init_db
+from app.main import app
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+from app.services.table_service import create_table
+
+
+@event.listens_for(Engine, "connect")
+def _wait_for_sqlite_lock(dbapi_connection, connection_record):
+    # SQLite has one writer at a time; concurrent tests queue on the lock instead of failing after 5s
+    dbapi_connection.execute("PRAGMA busy_timeout = 60000")
+
+
+@pytest_asyncio.fixture
+async def staff_user():
+    """A fresh schema and a manager account"""
+    await drop_db()
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        user = User(
+            username="manager",
+            email="manager@example.com",
+            hashed_password="!",
+            role=UserRole.MANAGER,
+            is_active=True
+        )
+        db.add(user)
+        await db.commit()
+        return user
+
+
+@pytest_asyncio.fixture
+async def client(staff_user):
+    """httpx client authenticated as the manager, with the app's startup hooks run"""
+    token = create_access_token({
+        "sub": staff_user.username,
+        "user_id": str(staff_user.user_id),
+        "role": staff_user.role.value
+    })
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://test",
+            headers={"Authorization": f"Bearer {token}"}
+        ) as http:
+            yield http
+
+
+@pytest_asyncio.fixture
+async def table_ids(staff_user):
+    async with AsyncSessionLocal() as db:
+        tables = [await create_table(db, {"table_number": str(number), "capacity": 4}) for number in range(1, 21)]
+        await db.commit()
+        return [table.table_id for table in tables]
@@ -0,0 +1,58 @@
+import random
+import uuid
+
+from app.services.availability import AvailabilityEngine
+
+
+def test_sub_recipes_limit_the_dishes_that_use_them():
+    """A pizza using half a dough portion is limited by the flour in the dough"""
+    pizza, dough, salad = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    flour, cheese, lettuce = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    engine = AvailabilityEngine()
+    engine.load(
+        products=[(pizza, "Pizza", True), (dough, "Dough", True), (salad, "Salad", True)],
+        ingredients=[(flour, "Flour", 1000.0), (cheese, "Cheese", 5000.0), (lettuce, "Lettuce", 300.0)],
+        lines=[(pizza, cheese, 100.0), (dough, flour, 200.0), (salad, lettuce, 100.0)],
+        components=[(pizza, None, dough, None, 0.5), (None, uuid.uuid4(), None, lettuce, 50.0)]
+    )
+
+    portions = dict(zip(engine.product_ids, engine.portions.tolist()))
+    assert portions == {pizza: 10, dough: 5, salad: 3}
+    assert set(engine.affected_rows([flour]).tolist()) == {engine.product_ids.index(pizza), engine.product_ids.index(dough)}
+    limiting = {item["product_id"]: item["limiting_ingredient"] for item in engine.report()}
+    assert limiting[pizza] == "Flour"
+
+
+def test_broken_sub_recipes_do_not_limit():
+    pizza, dough = uuid.uuid4(), uuid.uuid4()
+    flour = uuid.uuid4()
+    engine = AvailabilityEngine()
+    engine.load(
+        products=[(pizza, "Pizza", True), (dough, "Dough", True)],
+        ingredients=[(flour, "Flour", 0.0)],
+        lines=[(dough, flour, 200.0)],
+        components=[(pizza, None, dough, None, 0.5), (dough, None, pizza, None, 1.0)]
+    )
+    assert engine.report()[0]["portions"] is None
+
+
+def test_a_stock_change_recomputes_only_the_dishes_using_it():
+    rng = random.Random(3)
+    products = [(uuid.uuid4(), f"Dish {index}", True) for index in range(60)]
+    ingredients = [(uuid.uuid4(), f"Ingredient {index}", rng.uniform(0, 2000)) for index in range(25)]
+    lines = [
+        (product_id, ingredient_id, rng.uniform(10, 300))
+        for product_id, _, _ in products[:50]  # the last ten have no recipe
+        for ingredient_id, _, _ in rng.sample(ingredients, rng.randint(1, 5))
+    ]
+    engine = AvailabilityEngine()
+    engine.load(products, ingredients, lines)
+
+    changes = {ingredients[index][0]: rng.uniform(0, 500) for index in (2, 7, 19)}
+    rows, portions = engine.preview(changes)
+    expected = AvailabilityEngine()
+    expected.load(products, [(i, name, changes.get(i, stock)) for i, name, stock in ingredients], lines)
+
+    using = {engine.product_ids.index(product_id) for product_id, ingredient_id, _ in lines if ingredient_id in changes}
+    assert set(rows.tolist()) == using
+    assert portions.tolist() == expected.portions[rows].tolist()
@@ -0,0 +1,37 @@
+import asyncio
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+from app.database import engine
+from app.services.order_numbers import OrderNumberAllocator, create_counter_engine
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_parallel_workers_never_share_a_number(staff_user):
+    """8 workers (allocators sharing the counter table), 50 requests each, over two business days"""
+    counter_engine = create_counter_engine(engine.url)
+    allocators = [OrderNumberAllocator(counter_engine, block_size=20, location="") for _ in range(8)]
+    days = [date.today(), date.today() + timedelta(days=1)]
+    issued = {day: [] for day in days}
+
+    async def request(allocator, day):
+        for _ in range(10):
+            issued[day].append(await allocator.next_sequence(day))
+
+    try:
+        for day in days:
+            await asyncio.gather(*(request(allocator, day) for allocator in allocators for _ in range(50)))
+    finally:
+        await counter_engine.dispose()
+
+    for day, numbers in issued.items():
+        assert len(numbers) == 4000
+        assert [number for number, count in Counter(numbers).items() if count > 1] == []
+        # Each day restarts at 1; only the tails of partly used blocks are skipped
+        assert min(numbers) == 1
+        assert max(numbers) - len(numbers) < 8 * 20
+    assert sum(allocator.blocks_reserved for allocator in allocators) <= 2 * (4000 // 20 + 8)
+
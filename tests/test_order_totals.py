@@ -0,0 +1,105 @@
+import pytest
+import pytest_asyncio
+
+from app.database import AsyncSessionLocal
+from app.models.menu import MenuCategory, MenuProductCreate
+from app.schemas import Modifier
+from app.services.menu_service import create_product
+from app.services.kitchen_feed import ORDER_ITEM_UPDATED, kitchen_feed
+from app.services.pricing import recompute_order_totals
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def menu(staff_user):
+    """A 10.00 burger and a 2.50 extra-cheese modifier"""
+    async with AsyncSessionLocal() as db:
+        product = await create_product(db, MenuProductCreate(name="Burger", price=10.0, category=MenuCategory.MAIN))
+        modifier = Modifier(name="Extra cheese", additional_cost=2.5)
+        db.add(modifier)
+        await db.commit()
+        return product.product_id, modifier.modifier_id
+
+
+async def _reprice_modifier(client, modifier_id, cost):
+    response = await client.put(f"/menu/modifiers/{modifier_id}", json={"additional_cost": cost})
+    assert response.status_code == 200, response.text
+
+
+async def _order(client, table_ids, product_id, modifier_id):
+    response = await client.post("/orders/", json={
+        "table_id": str(table_ids[0]),
+        "items": [{"product_id": str(product_id), "quantity": 2, "modifiers": [str(modifier_id)]}],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def test_repricing_a_modifier_keeps_past_totals(client, table_ids, menu):
+    product_id, modifier_id = menu
+    order = await _order(client, table_ids, product_id, modifier_id)
+    assert order["total_amount"] == 25.0
+
+    await _reprice_modifier(client, modifier_id, 4.0)
+    async with AsyncSessionLocal() as db:
+        assert await recompute_order_totals(db) == 0
+        await db.commit()
+
+    response = await client.get(f"/orders/{order['order_id']}")
+    assert response.json()["total_amount"] == 25.0
+
+
+async def test_removing_an_item_deducts_what_it_was_charged(client, table_ids, menu):
+    product_id, modifier_id = menu
+    order = await _order(client, table_ids, product_id, modifier_id)
+    await _reprice_modifier(client, modifier_id, 4.0)
+
+    item_id = order["items"][0]["item_id"]
+    response = await client.delete(f"/orders/{order['order_id']}/items/{item_id}")
+    assert response.status_code == 204
+
+    response = await client.get(f"/orders/{order['order_id']}")
+    assert response.json()["total_amount"] == 0.0
+    assert response.json()["items"] == []
+
+
+async def test_removing_an_item_through_another_order_touches_nothing(client, table_ids, menu):
+    product_id, modifier_id = menu
+    order = await _order(client, table_ids, product_id, modifier_id)
+    other = await _order(client, table_ids, product_id, modifier_id)
+
+    item_id = order["items"][0]["item_id"]
+    response = await client.delete(f"/orders/{other['order_id']}/items/{item_id}")
+    assert response.status_code == 404
+
+    response = await client.get(f"/orders/{order['order_id']}")
+    assert response.json()["total_amount"] == 25.0
+    assert [modifier["modifier_id"] for modifier in response.json()["items"][0]["modifiers"]] == [str(modifier_id)]
+
+
+async def test_new_orders_pick_up_a_repriced_modifier(client, table_ids, menu):
+    product_id, modifier_id = menu
+    # The first order caches the modifier at 2.50
+    assert (await _order(client, table_ids, product_id, modifier_id))["total_amount"] == 25.0
+    await _reprice_modifier(client, modifier_id, 4.0)
+    assert (await _order(client, table_ids, product_id, modifier_id))["total_amount"] == 28.0
+
+
+async def test_adding_a_modifier_reaches_the_kitchen_feed(client, table_ids, menu):
+    product_id, modifier_id = menu
+    response = await client.post("/orders/", json={
+        "table_id": str(table_ids[0]),
+        "items": [{"product_id": str(product_id), "quantity": 1}],
+    })
+    item_id = response.json()["items"][0]["item_id"]
+
+    subscriber = kitchen_feed.subscribe()
+    try:
+        response = await client.post(f"/orders/items/{item_id}/modifiers", json={"modifier_id": str(modifier_id)})
+        assert response.status_code == 200, response.text
+        message = subscriber.queue.get_nowait()
+    finally:
+        kitchen_feed.unsubscribe(subscriber)
+    assert f"event: {ORDER_ITEM_UPDATED}" in message
+    assert item_id in message and str(modifier_id) in message
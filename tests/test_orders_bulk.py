@@ -0,0 +1,26 @@
+import pytest
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_a_retried_batch_creates_its_orders_once(client, table_ids):
+    batch = [{"table_id": str(table_id), "items": []} for table_id in table_ids[:3]]
+    headers = {"Idempotency-Key": "pos-7-flush-42"}
+
+    first = await client.post("/orders/bulk", json=batch, headers=headers)
+    assert first.status_code == 201, first.text
+    retry = await client.post("/orders/bulk", json=batch, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    orders = (await client.get("/orders/", params={"limit": 100})).json()
+    assert len(orders) == 3
+
+
+async def test_a_reused_key_with_another_batch_is_rejected(client, table_ids):
+    headers = {"Idempotency-Key": "pos-7-flush-43"}
+    response = await client.post("/orders/bulk", json=[{"table_id": str(table_ids[0])}], headers=headers)
+    assert response.status_code == 201
+    response = await client.post("/orders/bulk", json=[{"table_id": str(table_ids[1])}], headers=headers)
+    assert response.status_code == 422
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.schemas import ClientCreate
+from app.services.client_service import create_client
+from app.services.reservation_service import create_reservation
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_cursor_walks_every_reservation_once(client, table_ids):
+    """Pages of 3 over 8 bookings, several sharing a start time"""
+    start = datetime(2030, 5, 17, 19, 0)
+    async with AsyncSessionLocal() as db:
+        guest = await create_client(db, ClientCreate(name="Guest"))
+        created = []
+        for index in range(8):
+            reservation = await create_reservation(db, {
+                "client_id": guest.client_id,
+                "table_id": table_ids[index],
+                "reservation_time": start + timedelta(minutes=30 * (index // 3)),
+            })
+            created.append(str(reservation.reservation_id))
+        await db.commit()
+
+    seen, params = [], {"limit": 3}
+    while True:
+        response = await client.get("/reservations/", params=params)
+        assert response.status_code == 200
+        seen.extend(row["reservation_id"] for row in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+        params = {"limit": 3, "cursor": cursor}
+
+    assert seen == created
+
+
+async def test_browsers_may_read_the_cursor_header(client):
+    response = await client.get("/reservations/", headers={"Origin": "https://pos.example.com"})
+    assert NEXT_CURSOR_HEADER.lower() in response.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,33 @@
+import uuid
+from datetime import timedelta
+
+from starlette.requests import Request
+
+from app.database import RecentWriters
+from app.services.auth import create_access_token
+
+
+def _request(token=None) -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def _token(user_id, minutes: int) -> str:
+    return create_access_token({"sub": "alice", "user_id": str(user_id), "role": "staff"}, timedelta(minutes=minutes))
+
+
+def test_a_new_token_for_the_same_user_keeps_the_pin():
+    writers = RecentWriters(window=60)
+    user_id = uuid.uuid4()
+    writers.mark(_request(_token(user_id, 30)))
+
+    assert writers.is_pinned(_request(_token(user_id, 45)))
+    assert not writers.is_pinned(_request(_token(uuid.uuid4(), 30)))
+
+
+def test_unauthenticated_or_forged_callers_are_not_pinned():
+    writers = RecentWriters(window=60)
+    writers.mark(_request())
+    writers.mark(_request("not-a-jwt"))
+    assert len(writers._entries) == 0
+    assert not writers.is_pinned(_request("not-a-jwt"))
@@ -0,0 +1,19 @@
+import pytest
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_reads_send_only_their_queries(client, table_ids):
+    """Read sessions are autocommit: no BEGIN/ROLLBACK around the SELECTs"""
+    # The first request loads the caller's principal through get_db, which commits
+    await client.get("/tables/")
+    response = await client.get("/tables/")
+    assert response.status_code == 200
+    assert response.headers["X-DB-Round-Trips"] == response.headers["X-DB-Statements"]
+
+
+async def test_writes_commit_once(client):
+    await client.get("/tables/")
+    response = await client.post("/clients/", json={"name": "Walk-in"})
+    assert response.status_code in (200, 201)
+    assert int(response.headers["X-DB-Round-Trips"]) == int(response.headers["X-DB-Statements"]) + 1
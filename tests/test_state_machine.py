@@ -0,0 +1,104 @@
+import asyncio
+import random
+from collections import Counter, defaultdict
+
+import pytest
+
+from app.models.order import OrderStatus
+from app.utils.state_machine import ORDER_STATE_MACHINE
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _open_orders(client, table_ids):
+    order_ids = []
+    for table_id in table_ids:
+        response = await client.post("/orders/", json={"table_id": str(table_id), "items": []})
+        assert response.status_code == 201, response.text
+        order_ids.append(response.json()["order_id"])
+    return order_ids
+
+
+def _path_ends(current, remaining):
+    """Ends of every legal path from `current` that visits each status in `remaining` once"""
+    if not remaining:
+        return [current]
+    return [
+        end
+        for status in remaining if ORDER_STATE_MACHINE.can_transition(current, status)
+        for end in _path_ends(status, remaining - {status})
+    ]
+
+
+def _walk(entered):
+    """Check the statuses an order entered form one legal path from pending; returns its end"""
+    assert len(entered) == len(set(entered)), f"status entered twice: {entered}"
+    ends = _path_ends(OrderStatus.PENDING, frozenset(entered))
+    assert len(ends) == 1, f"{sorted(s.value for s in entered)} is not one legal path from pending"
+    return ends[0]
+
+
+@pytest.mark.parametrize("current, target", [
+    (OrderStatus.PENDING, OrderStatus.READY),
+    (OrderStatus.PENDING, OrderStatus.DELIVERED),
+    (OrderStatus.PENDING, OrderStatus.PENDING),
+])
+async def test_illegal_transition_is_409(client, table_ids, current, target):
+    order_id, = await _open_orders(client, table_ids[:1])
+
+    response = await client.put(f"/orders/{order_id}/status", params={"new_status": target.value})
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["current_status"] == current.value
+    response = await client.get(f"/orders/{order_id}")
+    assert response.json()["status"] == current.value
+
+
+async def test_finished_orders_cannot_move(client, table_ids):
+    order_id, = await _open_orders(client, table_ids[:1])
+    for status in (OrderStatus.PREPARING, OrderStatus.READY, OrderStatus.DELIVERED):
+        response = await client.put(f"/orders/{order_id}/status", params={"new_status": status.value})
+        assert response.status_code == 200
+
+    for status in OrderStatus:
+        response = await client.put(f"/orders/{order_id}/status", params={"new_status": status.value})
+        assert response.status_code == 409
+        assert response.json()["detail"]["allowed"] == []
+
+
+async def test_unknown_order_is_404(client, staff_user):
+    response = await client.put(
+        "/orders/00000000-0000-0000-0000-000000000000/status", params={"new_status": "preparing"}
+    )
+    assert response.status_code == 404
+
+
+async def test_parallel_transitions_lose_no_updates(client, table_ids):
+    """
+    Hundreds of concurrent taps on the same tickets: each status is entered
+    at most once per order, the successful moves form one legal path, and
+    the stored status is the end of that path.
+    """
+    order_ids = await _open_orders(client, table_ids)
+    rng = random.Random(42)
+    targets = [status for status in OrderStatus if status != OrderStatus.PENDING]
+    plan = [(rng.choice(order_ids), rng.choice(targets)) for _ in range(400)]
+
+    async def tap(order_id, target):
+        response = await client.put(f"/orders/{order_id}/status", params={"new_status": target.value})
+        return order_id, target, response.status_code
+
+    outcomes = await asyncio.gather(*(tap(order_id, target) for order_id, target in plan))
+
+    codes = Counter(code for _, _, code in outcomes)
+    assert set(codes) <= {200, 409}, codes
+    assert codes[200] and codes[409]
+
+    entered = defaultdict(list)
+    for order_id, target, code in outcomes:
+        if code == 200:
+            entered[order_id].append(target)
+    for order_id in order_ids:
+        end = _walk(entered[order_id])
+        response = await client.get(f"/orders/{order_id}")
+        assert OrderStatus(response.json()["status"]) == end
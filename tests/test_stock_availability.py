@@ -0,0 +1,86 @@
+import pytest
+import pytest_asyncio
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def pizza(client):
+    """A margherita needing 200 g of flour, with 400 g in stock"""
+    response = await client.post("/inventory/ingredients", json={"name": "Flour", "unit_of_measure": "g", "current_stock": 400})
+    assert response.status_code == 201, response.text
+    flour_id = response.json()["ingredient_id"]
+    response = await client.post("/menu/products", json={
+        "name": "Margherita",
+        "price": 9.5,
+        "category": "main",
+        "ingredients": [{"ingredient_id": flour_id, "quantity_required": 200}],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["product_id"], flour_id
+
+
+async def _move_stock(client, flour_id, transaction_type, quantity):
+    response = await client.post(f"/inventory/ingredients/{flour_id}/stock", json={
+        "quantity": quantity, "transaction_type": transaction_type, "notes": "test"
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _order(client, table_id, product_id):
+    return await client.post("/orders/", json={
+        "table_id": str(table_id), "items": [{"product_id": product_id, "quantity": 1}]
+    })
+
+
+async def _seen_as_available(client, product_id):
+    """is_available as reported by the product, search, the menu snapshot and the availability report"""
+    product = (await client.get(f"/menu/products/{product_id}")).json()
+    hits = (await client.get("/menu/search", params={"q": "margherita", "available_only": True})).json()
+    menu = (await client.get("/menu/")).json()
+    listed = [item for section in menu["sections"] for item in section["products"] if item["product_id"] == product_id]
+    report = [row for row in (await client.get("/menu/availability")).json() if row["product_id"] == product_id]
+    return (
+        product["is_available"],
+        any(hit["product_id"] == product_id for hit in hits),
+        listed[0]["is_available"],
+        report[0]["is_available"],
+    )
+
+
+async def test_running_out_switches_a_dish_off_and_restocking_back_on(client, table_ids, pizza):
+    product_id, flour_id = pizza
+    # Warms the price cache with the product as available
+    assert (await _order(client, table_ids[0], product_id)).status_code == 201
+    assert await _seen_as_available(client, product_id) == (True, True, True, True)
+
+    ingredient = await _move_stock(client, flour_id, "use", 300)
+    assert ingredient["current_stock"] == 100
+    assert await _seen_as_available(client, product_id) == (False, False, False, False)
+    assert (await _order(client, table_ids[1], product_id)).status_code == 422
+
+    await _move_stock(client, flour_id, "add", 100)
+    assert await _seen_as_available(client, product_id) == (True, True, True, True)
+    assert (await _order(client, table_ids[1], product_id)).status_code == 201
+
+
+async def test_a_dish_switched_off_by_hand_stays_off_after_restock(client, pizza):
+    product_id, flour_id = pizza
+    response = await client.put(f"/menu/products/{product_id}", json={"is_available": False})
+    assert response.status_code == 200, response.text
+
+    await _move_stock(client, flour_id, "spoil", 400)
+    await _move_stock(client, flour_id, "add", 1000)
+    assert (await client.get(f"/menu/products/{product_id}")).json()["is_available"] is False
+
+
+async def test_stock_movements_are_recorded_and_validated(client, pizza):
+    _, flour_id = pizza
+    response = await client.post(f"/inventory/ingredients/{flour_id}/stock", json={"quantity": 0, "transaction_type": "use"})
+    assert response.status_code == 422
+    response = await client.post(
+        "/inventory/ingredients/00000000-0000-0000-0000-000000000000/stock",
+        json={"quantity": 1, "transaction_type": "use"}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,36 @@
+import httpx
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.schemas import UserCreate, UserRole
+from app.services.user_service import create_user
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _login(http, password):
+    return await http.post("/auth/token", data={"username": "server", "password": password})
+
+
+async def test_password_change(client):
+    async with AsyncSessionLocal() as db:
+        user = await create_user(db, UserCreate(username="server", role=UserRole.STAFF, password="first-pass"))
+        await db.commit()
+    assert user.hashed_password.startswith("$2")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        response = await _login(http, "first-pass")
+        assert response.status_code == 200
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = await http.put("/users/me/password", headers=headers,
+                                  json={"current_password": "wrong", "new_password": "second-pass"})
+        assert response.status_code == 400
+
+        response = await http.put("/users/me/password", headers=headers,
+                                  json={"current_password": "first-pass", "new_password": "second-pass"})
+        assert response.status_code == 200
+
+        assert (await _login(http, "first-pass")).status_code == 401
+        assert (await _login(http, "second-pass")).status_code == 200